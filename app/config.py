@@ -5,6 +5,7 @@ API ayarları, metadata ve Swagger UI konfigürasyonu için merkezi yapılandır
 """
 
 from typing import Dict, List
+import os
 
 # API Metadata
 API_TITLE = "Mock Online Store API"
@@ -38,6 +39,12 @@ Seller operations (create, update, delete products) require the `X-API-Key` head
 List endpoints support `page` and `page_size` parameters.
 Default values: `page=1`, `page_size=10`
 
+### Conditional Requests
+
+Product, list, review, category and recommendation GETs return an `ETag`.
+Send it back in `If-None-Match` to get `304 Not Modified` (empty body)
+while the data is unchanged.
+
 ### MCP Integration
 
 This API is designed to be ready for Model Context Protocol (MCP) conversion.
@@ -60,8 +67,13 @@ Endpoints for product listing, search, filtering, and CRUD operations.
 | `/products` | GET | List all products (filtering, sorting, pagination) |
 | `/products/{id}` | GET | Single product detail |
 | `/products/search` | GET | Search products |
+| `/products/facets` | GET | Filter match counts per value |
+| `/products/autocomplete` | GET | Search box name completions |
+| `/products/export` | GET | Stream the catalog as NDJSON |
+| `/products/batch` | GET, POST | Many products by ID in one call |
 | `/products/category/{category_id}` | GET | Products by category |
 | `/products` | POST | Add new product (API Key required) |
+| `/products/bulk` | POST | Import products from NDJSON (API Key required) |
 | `/products/{id}` | PUT | Update product (API Key required) |
 | `/products/{id}` | DELETE | Delete product (API Key required) |
 """,
@@ -103,7 +115,7 @@ Product category management.
 
 | Endpoint | Method | Description |
 |----------|--------|-------------|
-| `/categories` | GET | List all categories |
+| `/categories` | GET | Category tree with product counts |
 | `/categories/{id}` | GET | Category detail |
 """,
     },
@@ -151,5 +163,28 @@ OPENAPI_EXAMPLES = {
 DEFAULT_PAGE_SIZE = 10
 MAX_PAGE_SIZE = 100
 
+# Response Cache (total size of cached GET response bodies)
+RESPONSE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Multi-get (GET/POST /products/batch): most IDs per request
+MAX_BATCH_IDS = 200
+
+# Bulk Import (POST /products/bulk): valid rows inserted per lock acquisition
+BULK_IMPORT_CHUNK_SIZE = 1000
+
+# Database Snapshot (binary file, see database/snapshot.py). When set, the
+# snapshot is loaded on startup instead of the seed data (if the file exists)
+# and written back on shutdown. Unset: seed data on every start, nothing saved.
+SNAPSHOT_PATH = os.environ.get("STORE_SNAPSHOT_PATH") or None
+
+# Write-Ahead Log (see database/wal.py). When set, every write is appended
+# to the log, which is replayed on startup and folded into the snapshot
+# (if SNAPSHOT_PATH is set) on startup and shutdown.
+# Sync interval: 0 = a write returns once it is on disk (fsyncs are shared
+# by concurrent writes); > 0 = fsync at most every N ms, writes never wait
+# (a crash can lose the last interval).
+WAL_PATH = os.environ.get("STORE_WAL_PATH") or None
+WAL_SYNC_INTERVAL_MS = float(os.environ.get("STORE_WAL_SYNC_INTERVAL_MS", "10"))
+
 # API Key Settings
 API_KEY_HEADER = "X-API-Key"
@@ -0,0 +1,189 @@
+"""
+Autocomplete Index
+==================
+Sorted-prefix array for typeahead suggestions over product and category names.
+
+Each name is stored once per word it contains, as the lowercased suffix that
+starts at that word. "MacBook Pro 14" is stored as "macbook pro 14",
+"pro 14" and "14", so typing "pro" suggests it as well as typing "mac".
+
+A lookup bisects to the first entry >= prefix and walks forward while
+entries still start with it: O(log n + matches).
+
+Items also carry a weight (review count for products), and top() returns
+the heaviest matches. Short prefixes match a large part of the catalog, so
+the best TOP_SIZE ranks of every prefix that matches more items than that
+are kept once it has been looked up, and served without a walk. Writes keep
+them current: a new, renamed or heavier item is merged into the cached
+prefixes of its name, and a cached prefix that loses one of its items
+(delete, rename, lighter weight) is dropped and walked again on next use.
+Prefixes matching at most TOP_SIZE items are cheap to walk and never cached.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+# Entry kinds
+KIND_CATEGORY = "category"
+KIND_PRODUCT = "product"
+
+# Ranks cached per prefix (the autocomplete endpoint's largest limit)
+TOP_SIZE = 20
+
+
+def name_suffixes(text: str) -> List[str]:
+    """Returns the lowercased suffixes of text that start at each word."""
+    words = text.lower().split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def normalize_prefix(prefix: str) -> str:
+    """Returns a typed prefix in the form of the stored suffixes."""
+    return " ".join(prefix.lower().split())
+
+
+class PrefixIndex:
+    """Sorted array of (name suffix, kind, id) entries with weighted top-N lookups."""
+
+    def __init__(self):
+        self._entries: List[Tuple[str, str, int]] = []
+        self._keys: Dict[Tuple[str, int], List[str]] = {}
+        self._weights: Dict[Tuple[str, int], float] = {}
+        # prefix -> best TOP_SIZE ranks, for prefixes matching more items
+        self._top: Dict[str, List[Tuple[float, str, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self):
+        """Removes all entries."""
+        self._entries.clear()
+        self._keys.clear()
+        self._weights.clear()
+        self._top.clear()
+
+    def _rank(self, key: Tuple[str, int]) -> Tuple[float, str, int]:
+        """Sort key of an item in top(): heaviest first, ties by kind and id."""
+        kind, item_id = key
+        return -self._weights[key], kind, item_id
+
+    def _cached(self, key: Tuple[str, int]) -> List[str]:
+        """Returns the cached prefixes an item's name matches."""
+        if not self._top:
+            return []
+        prefixes = {suffix[:end] for suffix in self._keys[key] for end in range(1, len(suffix) + 1)}
+        return [prefix for prefix in prefixes if prefix in self._top]
+
+    def _offer(self, key: Tuple[str, int]):
+        """Merges an item into the cached prefixes it now ranks in."""
+        rank = self._rank(key)
+        for prefix in self._cached(key):
+            top = self._top[prefix]
+            if rank < top[-1]:
+                insort(top, rank)
+                top.pop()
+
+    def add(self, kind: str, item_id: int, text: str, weight: float = 0):
+        """Indexes a name. Re-adding an existing item replaces it."""
+        self.remove(kind, item_id)
+        suffixes = name_suffixes(text)
+        for suffix in suffixes:
+            insort(self._entries, (suffix, kind, item_id))
+        self._keys[(kind, item_id)] = suffixes
+        self._weights[(kind, item_id)] = weight
+        self._offer((kind, item_id))
+
+    def update(self, items: Iterable[Tuple[str, int, str, float]]):
+        """Indexes many (kind, id, name, weight) items with a single sort. Items must be distinct."""
+        items = list(items)
+        for kind, item_id, _, _ in items:
+            self.remove(kind, item_id)
+        for kind, item_id, text, weight in items:
+            suffixes = name_suffixes(text)
+            self._entries.extend((suffix, kind, item_id) for suffix in suffixes)
+            self._keys[(kind, item_id)] = suffixes
+            self._weights[(kind, item_id)] = weight
+        self._entries.sort()
+        if self._top:
+            for kind, item_id, _, _ in items:
+                self._offer((kind, item_id))
+
+    def remove(self, kind: str, item_id: int):
+        """Removes an item if it is indexed."""
+        key = (kind, item_id)
+        if key not in self._keys:
+            return
+        rank = self._rank(key)
+        for prefix in self._cached(key):
+            top = self._top[prefix]
+            if rank <= top[-1]:
+                del self._top[prefix]
+
+        entries = self._entries
+        for suffix in self._keys.pop(key):
+            index = bisect_left(entries, (suffix, kind, item_id))
+            if index < len(entries) and entries[index] == (suffix, kind, item_id):
+                del entries[index]
+        del self._weights[key]
+
+    def set_weight(self, kind: str, item_id: int, weight: float):
+        """Changes an indexed item's weight."""
+        key = (kind, item_id)
+        previous = self._weights.get(key)
+        if previous is None or weight == previous:
+            return
+        if weight < previous:
+            # Its place may belong to an item outside the cached ranks
+            rank = self._rank(key)
+            for prefix in self._cached(key):
+                if rank <= self._top[prefix][-1]:
+                    del self._top[prefix]
+            self._weights[key] = weight
+            return
+
+        old_rank = self._rank(key)
+        self._weights[key] = weight
+        rank = self._rank(key)
+        for prefix in self._cached(key):
+            top = self._top[prefix]
+            if old_rank <= top[-1]:
+                del top[bisect_left(top, old_rank)]
+                insort(top, rank)
+            elif rank < top[-1]:
+                insort(top, rank)
+                top.pop()
+
+    def _walk(self, prefix: str) -> Iterator[Tuple[str, int]]:
+        """Yields (kind, id) of each entry starting with a normalized prefix."""
+        entries = self._entries
+        for position in range(bisect_left(entries, (prefix,)), len(entries)):
+            suffix, kind, item_id = entries[position]
+            if not suffix.startswith(prefix):
+                break
+            yield kind, item_id
+
+    def matches(self, prefix: str) -> Set[Tuple[str, int]]:
+        """Returns (kind, id) of every item with a word sequence starting with prefix."""
+        prefix = normalize_prefix(prefix)
+        if not prefix:
+            return set()
+        return set(self._walk(prefix))
+
+    def top(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        """
+        Returns (kind, id) of the `limit` heaviest items matching prefix
+        (ties by kind, then id).
+        """
+        prefix = normalize_prefix(prefix)
+        if not prefix or limit <= 0:
+            return []
+
+        best = self._top.get(prefix) if limit <= TOP_SIZE else None
+        if best is None:
+            found = set(self._walk(prefix))
+            best = heapq.nsmallest(max(limit, TOP_SIZE), map(self._rank, found))
+            if len(found) > TOP_SIZE:
+                self._top[prefix] = best[:TOP_SIZE]
+        return [(kind, item_id) for _, kind, item_id in best[:limit]]
@@ -0,0 +1,105 @@
+"""
+Bitmap Index
+============
+Bitset indexes for low-cardinality product attributes.
+
+For every value of category_id, seller_id, stock_status and has_discount
+the index keeps a Python int used as a bitset: bit N is set when product N
+has that value. Python ints are arbitrary-precision and their &, |, ~ and
+bit_count() run in C over machine words, so:
+
+- a combined equality filter is one AND per filter
+      category_id=1 & stock_status=in_stock & has_discount=true
+- a facet count is one AND plus a popcount per value
+
+Bits are addressed by product id, the same rows the column store uses, so
+a bitmap converts to a NumPy mask (to_mask) and back (from_mask) without
+any id lookups.
+"""
+
+from typing import Any, Callable, Dict
+import numpy as np
+
+
+# Field -> value extractor
+BITMAP_FIELDS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "category_id": lambda p: p.get("category_id"),
+    "seller_id": lambda p: p.get("seller_id"),
+    "stock_status": lambda p: p.get("stock_status"),
+    "has_discount": lambda p: p.get("discount_percentage", 0) > 0,
+}
+
+
+def to_mask(bitmap: int, length: int) -> np.ndarray:
+    """Returns a bitmap as a boolean array of the given length."""
+    data = np.frombuffer(bitmap.to_bytes((length + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(data, count=length, bitorder="little").astype(bool)
+
+
+def from_mask(mask: np.ndarray) -> int:
+    """Returns a boolean array as a bitmap."""
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def from_ids(ids: np.ndarray) -> int:
+    """Returns the bitmap with the bits of the given ids set."""
+    if len(ids) == 0:
+        return 0
+    mask = np.zeros(int(ids.max()) + 1, dtype=bool)
+    mask[ids] = True
+    return from_mask(mask)
+
+
+class BitmapIndex:
+    """Per-value bitsets of product ids for BITMAP_FIELDS."""
+
+    def __init__(self):
+        self._bitmaps: Dict[str, Dict[Any, int]] = {field: {} for field in BITMAP_FIELDS}
+        self._all = 0
+
+    def clear(self):
+        """Removes all products."""
+        for bitmaps in self._bitmaps.values():
+            bitmaps.clear()
+        self._all = 0
+
+    @property
+    def all(self) -> int:
+        """Bitmap of every indexed product."""
+        return self._all
+
+    def add(self, product: Dict[str, Any]):
+        """Sets the product's bit under each of its values."""
+        bit = 1 << product["id"]
+        for field, value_of in BITMAP_FIELDS.items():
+            bitmaps = self._bitmaps[field]
+            value = value_of(product)
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+        self._all |= bit
+
+    def put(self, field: str, value: Any, bitmap: int):
+        """Adds a whole bitmap of products under a value (bulk loading)."""
+        bitmaps = self._bitmaps[field]
+        bitmaps[value] = bitmaps.get(value, 0) | bitmap
+        self._all |= bitmap
+
+    def remove(self, product: Dict[str, Any]):
+        """Clears the product's bits. The product must have the values it was added with."""
+        mask = ~(1 << product["id"])
+        for field, value_of in BITMAP_FIELDS.items():
+            bitmaps = self._bitmaps[field]
+            value = value_of(product)
+            remaining = bitmaps.get(value, 0) & mask
+            if remaining:
+                bitmaps[value] = remaining
+            else:
+                bitmaps.pop(value, None)
+        self._all &= mask
+
+    def get(self, field: str, value: Any) -> int:
+        """Returns the bitmap of products whose field equals value."""
+        return self._bitmaps[field].get(value, 0)
+
+    def values(self, field: str) -> Dict[Any, int]:
+        """Returns value -> bitmap for a field (values with no products are absent)."""
+        return self._bitmaps[field]
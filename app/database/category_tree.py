@@ -0,0 +1,85 @@
+"""
+Category Tree
+=============
+Parent/child structure of the categories, built from their parent_id.
+
+Categories change rarely (products change all the time), so the database
+keeps one CategoryTree and rebuilds it only after a category write. Product
+counts are not part of the tree: they come from the per-category product
+index when a response is assembled.
+
+Categories are laid out in pre-order (a parent, then each child's subtree,
+children by id), so a category's subtree is one contiguous slice of that
+order. Each category keeps the slice as an interval [start, end): start is
+its pre-order number, end the number after its last descendant (assigned
+when the walk leaves it, i.e. in post-order). B is a descendant of A
+exactly when A's interval contains B's start, an O(1) check.
+
+Categories whose parent_id is null or names a missing category are roots.
+A parent_id cycle is broken at its smallest id, which becomes a root.
+"""
+
+from typing import Any, Dict, List
+
+
+class CategoryTree:
+    """Immutable category hierarchy with pre/post-order subtree intervals."""
+
+    def __init__(self, categories: Dict[int, Dict[str, Any]]):
+        children: Dict[int, List[int]] = {category_id: [] for category_id in categories}
+        parents: Dict[int, int] = {}
+        roots: List[int] = []
+        for category_id in sorted(categories):
+            parent_id = categories[category_id].get("parent_id")
+            if parent_id in children and parent_id != category_id:
+                children[parent_id].append(category_id)
+                parents[category_id] = parent_id
+            else:
+                roots.append(category_id)
+
+        self._children = children
+        self._order: List[int] = []
+        self._start: Dict[int, int] = {}  # category_id -> position in _order
+        self._end: Dict[int, int] = {}    # category_id -> end of its subtree slice
+        for root in roots:
+            self._walk(root)
+
+        # Categories left over are only reachable through a cycle
+        for category_id in sorted(categories):
+            if category_id not in self._start:
+                children[parents.pop(category_id)].remove(category_id)
+                roots.append(category_id)
+                self._walk(category_id)
+        self.roots = roots
+
+    def _walk(self, root: int):
+        """Appends root's subtree to the pre-order (iteratively, trees can be deep)."""
+        order, start, end = self._order, self._start, self._end
+        stack = [(root, False)]
+        while stack:
+            category_id, done = stack.pop()
+            if done:
+                end[category_id] = len(order)
+                continue
+            start[category_id] = len(order)
+            order.append(category_id)
+            stack.append((category_id, True))
+            stack.extend((child, False) for child in reversed(self._children[category_id]))
+
+    def __contains__(self, category_id: Any) -> bool:
+        return category_id in self._start
+
+    def children(self, category_id: int) -> List[int]:
+        """Returns the direct subcategories of a category, by id."""
+        return self._children[category_id]
+
+    def contains(self, ancestor_id: int, category_id: Any) -> bool:
+        """Returns True if category_id is ancestor_id or one of its descendants."""
+        if category_id == ancestor_id:
+            return True
+        start = self._start.get(category_id)
+        return start is not None and self._start[ancestor_id] < start < self._end[ancestor_id]
+
+    def subtree(self, category_id: int) -> List[int]:
+        """Returns the category and all its descendants, in pre-order."""
+        return self._order[self._start[category_id]:self._end[category_id]]
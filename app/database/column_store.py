@@ -0,0 +1,168 @@
+"""
+Column Store
+============
+Columnar (NumPy) shadow copy of the numeric product attributes.
+
+Each attribute lives in its own array, addressed by product id, so a range
+filter is a single vectorized comparison over the column instead of a
+Python loop calling p.get() on every product dict:
+
+    mask = alive & (final_price >= 100) & (average_rating >= 4)
+
+Columns: final_price, average_rating, discount_percentage, review_count.
+Equality filters on low-cardinality fields come from the bitmap index and
+are passed in as a boolean mask over the same ids.
+
+Rows are product ids (ids are auto-incremented, so the arrays stay dense);
+deleted ids are cleared in the `alive` mask. Numeric columns also order the
+matched ids (lexsort by key then id, narrowed with a partition when only
+the first page is needed), so only the page's ids go back to the caller.
+
+Ordering matches the database's sort indexes:
+- ascending: key ascending, ties by id ascending
+- descending: key descending, ties by id ascending
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+
+# Column name -> dtype
+COLUMNS: Dict[str, Any] = {
+    "final_price": np.float64,
+    "average_rating": np.float64,
+    "discount_percentage": np.float64,
+    "review_count": np.int64,
+}
+
+# Columns that can order results
+SORTABLE_COLUMNS = tuple(COLUMNS)
+
+
+class ColumnStore:
+    """NumPy columns of numeric product attributes, indexed by product id."""
+
+    def __init__(self, capacity: int = 1024):
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size(self) -> int:
+        """Row count of every column (greater than the largest stored id)."""
+        return len(self._alive)
+
+    def clear(self):
+        """Removes all rows."""
+        self._alive[:] = False
+        self._count = 0
+
+    def _grow(self, min_size: int):
+        """Doubles the capacity of every column until min_size rows fit."""
+        capacity = len(self._alive)
+        while capacity < min_size:
+            capacity *= 2
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+        for name, column in self._columns.items():
+            self._columns[name] = np.concatenate([column, np.zeros(capacity - len(column), dtype=column.dtype)])
+
+    def put(self, product: Dict[str, Any]):
+        """Inserts a product's row, or overwrites it if present."""
+        row = product["id"]
+        if row >= len(self._alive):
+            self._grow(row + 1)
+        if not self._alive[row]:
+            self._alive[row] = True
+            self._count += 1
+
+        columns = self._columns
+        columns["final_price"][row] = product.get("final_price", 0)
+        columns["average_rating"][row] = product.get("average_rating", 0)
+        columns["discount_percentage"][row] = product.get("discount_percentage", 0)
+        columns["review_count"][row] = product.get("review_count", 0)
+
+    def load(self, ids: np.ndarray, columns: Dict[str, np.ndarray]):
+        """Inserts many rows at once: ids plus each column's values aligned with them."""
+        if len(ids) == 0:
+            return
+        top = int(ids.max())
+        if top >= len(self._alive):
+            self._grow(top + 1)
+        self._count += len(ids) - int(np.count_nonzero(self._alive[ids]))
+        self._alive[ids] = True
+        for name, values in columns.items():
+            self._columns[name][ids] = values
+
+    def remove(self, product_id: int):
+        """Removes a product's row if present."""
+        if product_id < len(self._alive) and self._alive[product_id]:
+            self._alive[product_id] = False
+            self._count -= 1
+
+    def range_mask(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        ids: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Returns the mask of stored products within the (inclusive) bounds.
+
+        ids: check only these (stored) ids; the mask then aligns with ids.
+        """
+        if ids is None:
+            mask = self._alive.copy()
+            price, rating = self._columns["final_price"], self._columns["average_rating"]
+        else:
+            mask = np.ones(len(ids), dtype=bool)
+            price, rating = self._columns["final_price"][ids], self._columns["average_rating"][ids]
+
+        if min_price is not None:
+            mask &= price >= min_price
+        if max_price is not None:
+            mask &= price <= max_price
+        if min_rating is not None:
+            mask &= rating >= min_rating
+        return mask
+
+    def order(
+        self,
+        ids: np.ndarray,
+        sort_field: str,
+        descending: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[Any, int]] = None
+    ) -> List[int]:
+        """
+        Returns one page of ids ordered by a SORTABLE_COLUMNS field.
+
+        after: optional (key, id) keyset position; the page starts right after it.
+        """
+        keys = self._columns[sort_field][ids]
+
+        if after is not None:
+            after_key, after_id = after
+            beyond = keys < after_key if descending else keys > after_key
+            keep = beyond | ((keys == after_key) & (ids > after_id))
+            keys, ids = keys[keep], ids[keep]
+
+        # Ascending order of sort_keys (ties by id) is the requested order
+        sort_keys = -keys if descending else keys
+        end = len(ids) if limit is None else min(offset + limit, len(ids))
+        if end <= offset:
+            return []
+
+        # Only the first `end` ids are needed: keep keys up to the end-th
+        # smallest (ties at the boundary included) before sorting
+        if end < len(ids):
+            threshold = np.partition(sort_keys, end - 1)[end - 1]
+            head = sort_keys <= threshold
+            sort_keys, ids = sort_keys[head], ids[head]
+
+        order = np.lexsort((ids, sort_keys))[offset:end]
+        return ids[order].tolist()
@@ -14,11 +14,84 @@ Data Structures:
 - sellers: Seller information (id -> Seller dict)
 - categories: Category information (id -> Category dict)
 - api_keys: API key -> seller_id mappings
+
+Secondary Indexes:
+- products_by_category: category_id -> set of product ids
+- products_by_seller: seller_id -> set of product ids
+- reviews_by_product: product_id -> set of review ids
+- reviews_by_user: user_id -> set of review ids
+- sort_indexes: sortable field -> ordered (key, product id) index
+- search_index: inverted index over product name and description
+- autocomplete: sorted-prefix array over product names, weighted by review
+  count (top products of busy prefixes cached)
+- category_autocomplete: sorted-prefix array over category names
+- columns: NumPy column store of numeric product attributes
+- bitmaps: per-value bitsets of category, seller, stock status and discount
+
+Aggregates:
+- rating_stats: product_id -> rating sum, count, 1-5 histogram and
+  positive (4+) count, updated incrementally as reviews come and go
+- category_versions: category_id -> version, bumped on changes that affect
+  similar-product rankings within the category
+- product_versions: product_id -> version, bumped on every change to the record
+- similar_neighbors: (product_id, include_same_seller) -> (category version,
+  ids) similar-product lists of the recommendation service, valid while the
+  category version matches; dropped with the product
+- product_fragments: product_id -> (version, bytes) opaque per-record data
+  (serialized JSON) cached by the API layer; valid while the version matches
+
+Versions:
+- Every mutating method bumps the version of each table it changes
+  (TABLES). Versions are taken from one clock that only moves forward,
+  also across clear_all, so data_version (the clock) grows with every write.
+  Caches stamp entries with the versions they were built from.
+
+Snapshots:
+- save_snapshot / load_snapshot write and map a binary columnar image of
+  all tables, counters and API keys (see snapshot.py). Loaded records are
+  decoded on first access; the text indexes are built in the background.
+- With a write-ahead log open (open_wal) every write is also appended to
+  the log (see wal.py); compact() folds the log into a snapshot. Once the
+  log has failed, writes raise LogWriteError before changing anything.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Optional, Any, Set, Tuple
 from datetime import datetime
-import threading
+from itertools import islice
+from threading import Thread
+import heapq
+import math
+import numpy as np
+
+from .rwlock import ReadWriteLock, ExclusiveLock
+from .sorted_index import SortedIndex, comes_after
+from .search_index import SearchIndex
+from .autocomplete import PrefixIndex, KIND_CATEGORY, KIND_PRODUCT
+from .category_tree import CategoryTree
+from .column_store import ColumnStore, SORTABLE_COLUMNS
+from .bitmap_index import BitmapIndex, BITMAP_FIELDS, to_mask, from_mask, from_ids
+from .snapshot import SnapshotTable, TableImage, read_snapshot, to_columns, write_snapshot
+from .wal import WriteAheadLog, read_log
+
+
+# Sortable product fields and the key each ordered index is built on
+PRODUCT_SORT_KEYS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "final_price": lambda p: p.get("final_price", 0),
+    "average_rating": lambda p: p.get("average_rating", 0),
+    "name": lambda p: p.get("name", "").lower(),
+    "created_at": lambda p: p.get("created_at", ""),
+    "discount_percentage": lambda p: p.get("discount_percentage", 0),
+    "review_count": lambda p: p.get("review_count", 0),
+}
+
+# Product fields derived from reviews
+RATING_SORT_FIELDS = ("average_rating", "review_count")
+
+# Versioned tables
+TABLES = ("products", "reviews", "users", "sellers", "categories")
+
+# Product fields that similar-product rankings depend on
+SIMILARITY_FIELDS = ("category_id", "seller_id", "final_price", "average_rating")
 
 
 class InMemoryDatabase:
@@ -27,10 +100,21 @@ class InMemoryDatabase:
     
     Provides a centralized structure for all CRUD operations.
     Thread-safety is guaranteed with a lock mechanism.
+    
+    By default a reader-writer lock is used: multi-step reads (scans, index
+    lookups) run concurrently and writes are exclusive. Pass
+    concurrent_reads=False to serialize them behind a single mutex.
+    Single-key lookups (get_product, verify_api_key, ...) are one atomic
+    dict read and take no lock at all.
+    
+    Product and review records are copy-on-write: a write stores a new dict
+    instead of changing the stored one, so a record a reader holds never
+    changes under it (see export_products). Callers must not modify
+    returned records either; copy them to add fields (see join_user_names).
     """
     
-    def __init__(self):
-        self._lock = threading.Lock()
+    def __init__(self, concurrent_reads: bool = True):
+        self._lock = ReadWriteLock() if concurrent_reads else ExclusiveLock()
         self._products: Dict[int, Dict[str, Any]] = {}
         self._reviews: Dict[int, Dict[str, Any]] = {}
         self._users: Dict[int, Dict[str, Any]] = {}
@@ -38,6 +122,56 @@ class InMemoryDatabase:
         self._categories: Dict[int, Dict[str, Any]] = {}
         self._api_keys: Dict[str, int] = {}  # api_key -> seller_id
         
+        # Secondary indexes (kept in sync by product write methods)
+        self._products_by_category: Dict[int, Set[int]] = {}
+        self._products_by_seller: Dict[int, Set[int]] = {}
+        self._reviews_by_product: Dict[int, Set[int]] = {}
+        self._reviews_by_user: Dict[int, Set[int]] = {}
+        self._sort_indexes: Dict[str, SortedIndex] = {
+            field: SortedIndex() for field in PRODUCT_SORT_KEYS
+        }
+        self._search_index = SearchIndex()
+        self._autocomplete = PrefixIndex()
+        self._category_autocomplete = PrefixIndex()
+        # Set while the text indexes of a loaded snapshot are being built:
+        # ids of products written meanwhile (re-indexed when the build lands)
+        self._text_pending: Optional[Set[int]] = None
+        self._text_generation = 0
+        self._columns = ColumnStore()
+        self._bitmaps = BitmapIndex()
+        # Category hierarchy, rebuilt on first use after a category write
+        self._category_tree: Optional[CategoryTree] = None
+        
+        # Per-product rating aggregates (product_id -> stats)
+        self._rating_stats: Dict[int, Dict[str, Any]] = {}
+        
+        # Versions. Table versions (table -> version) are bumped by every
+        # write to the table; category versions (category_id -> version)
+        # whenever a product enters/leaves a category or changes a
+        # SIMILARITY_FIELDS value. All come from one clock that never resets,
+        # so a version seen once is never handed out again (not even after clear_all).
+        self._table_versions: Dict[str, int] = dict.fromkeys(TABLES, 0)
+        self._category_versions: Dict[int, int] = {}
+        self._product_versions: Dict[int, int] = {}
+        self._product_fragments: Dict[int, Tuple[int, bytes]] = {}
+        self._similar_neighbors: Dict[Tuple[int, bool], Tuple[int, List[int]]] = {}
+        self._version_clock = 0
+        
+        # Materialized product details (see get_product_detail):
+        # product_id -> (version built at, category_id, body); detail
+        # versions track writes a detail depends on besides its products
+        # (review helpful counts, author/seller/category records), and
+        # detail dependents map product_id -> ids of details listing it
+        # as a similar product
+        self._product_details: Dict[int, Tuple[int, Any, bytes]] = {}
+        self._detail_versions: Dict[int, int] = {}
+        self._detail_dependents: Dict[int, Set[int]] = {}
+        
+        # Write-ahead log (open_wal) and the sequence number (LSN) of the
+        # last logged write reflected in memory (also stored in snapshots)
+        self._wal: Optional[WriteAheadLog] = None
+        self._log_sequence = 0
+        
         # Auto-increment counters
         self._product_counter = 0
         self._review_counter = 0
@@ -45,133 +179,894 @@ class InMemoryDatabase:
         self._seller_counter = 0
         self._category_counter = 0
     
+    # ==================== INDEXES ====================
+    
+    @staticmethod
+    def _add_to_index(index: Dict[int, Set[int]], key: Any, item_id: int):
+        """Adds an id to the set stored under key."""
+        index.setdefault(key, set()).add(item_id)
+    
+    @staticmethod
+    def _remove_from_index(index: Dict[int, Set[int]], key: Any, item_id: int):
+        """Removes an id from the set stored under key, dropping empty sets."""
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(item_id)
+            if not ids:
+                del index[key]
+    
+    def _index_product(self, product: Dict[str, Any]):
+        """Adds a product to the secondary indexes. Caller must hold the lock."""
+        self._add_to_index(self._products_by_category, product.get("category_id"), product["id"])
+        self._add_to_index(self._products_by_seller, product.get("seller_id"), product["id"])
+        self._index_sort_keys(product, PRODUCT_SORT_KEYS)
+        self._columns.put(product)
+        self._bitmaps.add(product)
+    
+    def _unindex_product(self, product: Dict[str, Any]):
+        """Removes a product from the secondary indexes. Caller must hold the lock."""
+        self._remove_from_index(self._products_by_category, product.get("category_id"), product["id"])
+        self._remove_from_index(self._products_by_seller, product.get("seller_id"), product["id"])
+        self._unindex_sort_keys(product, PRODUCT_SORT_KEYS)
+        self._columns.remove(product["id"])
+        self._bitmaps.remove(product)
+    
+    def _index_sort_keys(self, product: Dict[str, Any], fields: Collection[str]):
+        """Adds a product to the ordered indexes of the given fields. Caller must hold the lock."""
+        for field in fields:
+            self._sort_indexes[field].add(PRODUCT_SORT_KEYS[field](product), product["id"])
+    
+    def _unindex_sort_keys(self, product: Dict[str, Any], fields: Collection[str]):
+        """
+        Removes a product from the ordered indexes of the given fields.
+        Must run before the fields change. Caller must hold the lock.
+        """
+        for field in fields:
+            self._sort_indexes[field].remove(PRODUCT_SORT_KEYS[field](product), product["id"])
+    
+    def _index_review(self, review: Dict[str, Any]):
+        """Adds a review to the secondary indexes. Caller must hold the lock."""
+        self._add_to_index(self._reviews_by_product, review.get("product_id"), review["id"])
+        self._add_to_index(self._reviews_by_user, review.get("user_id"), review["id"])
+    
+    def _unindex_review(self, review: Dict[str, Any]):
+        """Removes a review from the secondary indexes. Caller must hold the lock."""
+        self._remove_from_index(self._reviews_by_product, review.get("product_id"), review["id"])
+        self._remove_from_index(self._reviews_by_user, review.get("user_id"), review["id"])
+    
+    @staticmethod
+    def _empty_rating_stats() -> Dict[str, Any]:
+        """Returns a zeroed rating aggregate."""
+        return {
+            "sum": 0,
+            "count": 0,
+            "distribution": {"5": 0, "4": 0, "3": 0, "2": 0, "1": 0},
+            "positive": 0
+        }
+    
+    def _apply_review_rating(self, product_id: int, rating: int, delta: int):
+        """
+        Adds (delta=1) or removes (delta=-1) a rating from the product's
+        aggregate and syncs the product's rating fields. Caller must hold the lock.
+        """
+        if product_id not in self._products:
+            return
+        
+        stats = self._rating_stats.get(product_id)
+        if stats is None:
+            stats = self._rating_stats[product_id] = self._empty_rating_stats()
+        
+        stats["sum"] += rating * delta
+        stats["count"] += delta
+        rating_key = str(rating)
+        if rating_key in stats["distribution"]:
+            stats["distribution"][rating_key] += delta
+        if rating >= 4:
+            stats["positive"] += delta
+        
+        self._sync_product_rating(product_id)
+    
+    def _sync_product_rating(self, product_id: int):
+        """Copies the rating aggregate onto the product. Caller must hold the lock."""
+        previous = self._products.get(product_id)
+        if previous is None:
+            return
+        
+        self._unindex_sort_keys(previous, RATING_SORT_FIELDS)
+        previous_rating = previous.get("average_rating")
+        product = self._products[product_id] = dict(previous)
+        stats = self._rating_stats.get(product_id)
+        if stats and stats["count"] > 0:
+            product["average_rating"] = round(stats["sum"] / stats["count"], 2)
+            product["review_count"] = stats["count"]
+        else:
+            product["average_rating"] = 0.0
+            product["review_count"] = 0
+        self._index_sort_keys(product, RATING_SORT_FIELDS)
+        self._columns.put(product)
+        self._autocomplete.set_weight(KIND_PRODUCT, product_id, product["review_count"])
+        self._note_text_write(product_id)
+        self._touch_product(product_id)
+        if product["average_rating"] != previous_rating:
+            self._touch_category(product.get("category_id"))
+    
+    def _bump(self, *tables: str):
+        """Bumps the versions of changed tables. Caller must hold the lock."""
+        self._version_clock += 1
+        for table in tables:
+            self._table_versions[table] = self._version_clock
+    
+    def _touch_category(self, category_id: Any):
+        """Bumps a category's version. Caller must hold the lock."""
+        self._version_clock += 1
+        self._category_versions[category_id] = self._version_clock
+    
+    def _touch_product(self, product_id: int):
+        """
+        Bumps a product's version, invalidating its fragment and the details
+        showing it. Caller must hold the lock.
+        """
+        self._version_clock += 1
+        self._product_versions[product_id] = self._version_clock
+        self._product_fragments.pop(product_id, None)
+        self._drop_details(product_id)
+    
+    def _touch_details(self, product_ids: Iterable[int]):
+        """Bumps the detail versions of products, invalidating their details. Caller must hold the lock."""
+        self._version_clock += 1
+        for product_id in product_ids:
+            self._detail_versions[product_id] = self._version_clock
+            self._product_details.pop(product_id, None)
+    
+    def _drop_details(self, product_id: int):
+        """Removes the product's detail and the details listing it. Caller must hold the lock."""
+        self._product_details.pop(product_id, None)
+        for dependent in self._detail_dependents.pop(product_id, ()):
+            self._product_details.pop(dependent, None)
+    
+    def _note_text_write(self, product_id: int):
+        """Records a product text or review count change made while text indexes build. Caller must hold the lock."""
+        if self._text_pending is not None:
+            self._text_pending.add(product_id)
+    
+    @staticmethod
+    def _rows_for_ids(table: Dict[int, Dict[str, Any]], ids: Optional[Set[int]]) -> List[Dict[str, Any]]:
+        """Returns rows of a table for a set of ids in id order. Caller must hold the lock."""
+        if not ids:
+            return []
+        return [table[item_id] for item_id in sorted(ids)]
+    
     # ==================== PRODUCTS ====================
     
     def get_all_products(self) -> List[Dict[str, Any]]:
         """Returns all products."""
-        with self._lock:
+        with self._lock.read_lock:
             return list(self._products.values())
     
     def get_product(self, product_id: int) -> Optional[Dict[str, Any]]:
         """Returns a single product by ID."""
-        with self._lock:
-            return self._products.get(product_id)
+        # Single dict read: atomic, no lock needed
+        return self._products.get(product_id)
+    
+    def get_products_by_ids(self, product_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Returns products in the given id order, skipping ids that do not exist."""
+        with self._lock.read_lock:
+            products = self._products
+            return [products[i] for i in product_ids if i in products]
+    
+    def export_products(
+        self,
+        category_id: Optional[int] = None,
+        seller_id: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterates products (optionally of one category, subcategories
+        included, and/or seller) in id order, as they were when called.
+        
+        The lock is held only to capture the matching records; later writes
+        replace records instead of changing them, so iterating needs no lock.
+        Snapshot rows not read yet are decoded one at a time while iterating.
+        """
+        with self._lock.read_lock:
+            products = self._products
+            if category_id is None and seller_id is None:
+                ids = sorted(products)
+            else:
+                ids = None
+                if category_id is not None:
+                    ids = self._category_members(category_id)
+                if seller_id is not None:
+                    members = self._products_by_seller.get(seller_id, set())
+                    ids = members if ids is None else ids & members
+                ids = sorted(ids)
+            
+            if isinstance(products, SnapshotTable):
+                return products.frozen(ids)
+            return iter([products[product_id] for product_id in ids])
     
     def get_products_by_category(self, category_id: int) -> List[Dict[str, Any]]:
         """Returns products in a specific category."""
-        with self._lock:
-            return [p for p in self._products.values() if p.get("category_id") == category_id]
+        with self._lock.read_lock:
+            return self._rows_for_ids(self._products, self._products_by_category.get(category_id))
     
     def get_products_by_seller(self, seller_id: int) -> List[Dict[str, Any]]:
         """Returns products of a specific seller."""
-        with self._lock:
-            return [p for p in self._products.values() if p.get("seller_id") == seller_id]
+        with self._lock.read_lock:
+            return self._rows_for_ids(self._products, self._products_by_seller.get(seller_id))
+    
+    def get_sorted_products(
+        self,
+        sort_field: str,
+        descending: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        product_ids: Optional[Collection[int]] = None,
+        after: Optional[Tuple[Any, int]] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Returns one page of products in sort order, plus the total match count.
+        
+        Without product_ids the ordered index is walked directly, so a page
+        costs O(offset + limit). With product_ids (a filtered subset) the
+        cheaper of two plans is used: sort the subset, or walk the index and
+        skip non-members until the page is filled.
+        
+        after: optional (sort key, id) keyset position; the page starts right
+        after it (the index is entered with a bisect instead of skipping).
+        """
+        with self._lock.read_lock:
+            if product_ids is None:
+                index = self._sort_indexes[sort_field]
+                end = None if limit is None else offset + limit
+                page_ids = islice(index.iter_ids(descending, after), offset, end)
+                return [self._products[i] for i in page_ids], len(self._products)
+            
+            members = {i for i in product_ids if i in self._products}
+            return self._sorted_subset(members, sort_field, descending, offset, limit, after), len(members)
+    
+    def _sorted_subset(
+        self,
+        members: Set[int],
+        sort_field: str,
+        descending: bool,
+        offset: int,
+        limit: Optional[int],
+        after: Optional[Tuple[Any, int]]
+    ) -> List[Dict[str, Any]]:
+        """Returns one sorted page of a set of existing product ids. Caller must hold the lock."""
+        total = len(members)
+        if total == 0:
+            return []
+        
+        index = self._sort_indexes[sort_field]
+        end = None if limit is None else offset + limit
+        
+        # Walking visits about (wanted / selectivity) entries; sorting costs k log k
+        wanted = total if end is None else min(end, total)
+        walk_cost = wanted * len(index) / total
+        sort_cost = total * max(1.0, math.log2(total))
+        if sort_cost <= walk_cost:
+            key = PRODUCT_SORT_KEYS[sort_field]
+            rows = [self._products[i] for i in sorted(members)]
+            if after is not None:
+                rows = [p for p in rows if comes_after(key(p), p["id"], after, descending)]
+            rows.sort(key=key, reverse=descending)
+            return rows[offset:end]
+        
+        walk = (i for i in index.iter_ids(descending, after) if i in members)
+        return [self._products[i] for i in islice(walk, offset, end)]
+    
+    @staticmethod
+    def _equality_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the active bitmap-indexed filters (field -> value)."""
+        active = {}
+        for field in BITMAP_FIELDS:
+            value = filters.get(field)
+            # Falsy values mean "no filter" (has_discount=false included)
+            if value:
+                active[field] = value
+        return active
+    
+    def _filter_bitmap(self, field: str, value: Any) -> int:
+        """
+        Returns the bitmap of products matching an equality filter. A
+        category matches its descendants too (OR of their bitmaps).
+        Caller must hold the lock.
+        """
+        if field != "category_id":
+            return self._bitmaps.get(field, value)
+        tree = self._get_tree()
+        if value not in tree:
+            return self._bitmaps.get(field, value)
+        bitmap = 0
+        for category_id in tree.subtree(value):
+            bitmap |= self._bitmaps.get(field, category_id)
+        return bitmap
+    
+    def _category_members(self, category_id: int) -> Set[int]:
+        """
+        Returns ids of products in the category or its descendants, from
+        the per-category indexes. Caller must hold the lock (and not change the set).
+        """
+        tree = self._get_tree()
+        if category_id not in tree or not tree.children(category_id):
+            return self._products_by_category.get(category_id, set())
+        index = self._products_by_category
+        return set().union(*(index.get(c, ()) for c in tree.subtree(category_id)))
+    
+    def _filter_mask(self, filters: Dict[str, Any], skip_field: Optional[str] = None) -> np.ndarray:
+        """
+        Returns the id mask of products matching filters, optionally
+        ignoring one bitmap field. Caller must hold the lock.
+        """
+        mask = self._columns.range_mask(
+            filters.get("min_price"), filters.get("max_price"), filters.get("min_rating")
+        )
+        equal = self._equality_filters(filters)
+        equal.pop(skip_field, None)
+        if equal:
+            bitmap = self._bitmaps.all
+            for field, value in equal.items():
+                bitmap &= self._filter_bitmap(field, value)
+            mask &= to_mask(bitmap, self._columns.size)
+        return mask
+    
+    def _plan(self, filters: Dict[str, Any], product_ids: Optional[Collection[int]] = None) -> Dict[str, Any]:
+        """
+        Estimates the rows each access path would produce and picks the
+        smallest as the driver. Caller must hold the lock.
+        
+        Access paths (all estimates are exact and cheap to get):
+        - search: the given product_ids (e.g. search matches)
+        - category_id / seller_id / stock_status / has_discount: bitmap popcount
+        - price_range / rating_range: O(log n) count on the sort index
+        - scan: every product (vectorized masks over the column store)
+        """
+        estimates: Dict[str, int] = {}
+        if product_ids is not None:
+            estimates["search"] = len(product_ids)
+        for field, value in self._equality_filters(filters).items():
+            estimates[field] = self._filter_bitmap(field, value).bit_count()
+        min_price, max_price = filters.get("min_price"), filters.get("max_price")
+        if min_price is not None or max_price is not None:
+            estimates["price_range"] = self._sort_indexes["final_price"].count_between(min_price, max_price)
+        if filters.get("min_rating") is not None:
+            estimates["rating_range"] = self._sort_indexes["average_rating"].count_between(filters["min_rating"])
+        estimates["scan"] = len(self._products)
+        
+        # Ties go to the path listed first (indexes before the scan)
+        driver = min(estimates, key=estimates.get)
+        return {"driver": driver, "estimates": estimates}
+    
+    def _match_ids(
+        self,
+        filters: Dict[str, Any],
+        product_ids: Optional[Collection[int]] = None
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Returns the ids of products matching filters (and within product_ids),
+        plus the plan used. Caller must hold the lock.
+        
+        The driving access path produces candidates; the remaining predicates
+        are checked on those candidates only.
+        """
+        plan = self._plan(filters, product_ids)
+        driver = plan["driver"]
+        equal = self._equality_filters(filters)
+        bounds = (filters.get("min_price"), filters.get("max_price"), filters.get("min_rating"))
+        size = self._columns.size
+        
+        def members_mask() -> np.ndarray:
+            mask = np.zeros(size, dtype=bool)
+            mask[[i for i in product_ids if i in self._products]] = True
+            return mask
+        
+        if driver == "scan":
+            mask = self._filter_mask(filters)
+            if product_ids is not None:
+                mask &= members_mask()
+            plan["residual"] = []
+            plan["candidates"] = len(self._products)
+            ids = np.flatnonzero(mask)
+            plan["matched"] = len(ids)
+            return ids, plan
+        
+        residual = []
+        if driver in BITMAP_FIELDS:
+            # All equality filters intersect as bitmaps in one go
+            bitmap = self._bitmaps.all
+            for field, value in equal.items():
+                bitmap &= self._filter_bitmap(field, value)
+            ids = np.flatnonzero(to_mask(bitmap, size))
+            residual += [f for f in equal if f != driver]
+            equal = {}
+        elif driver == "search":
+            ids = np.fromiter((i for i in product_ids if i in self._products), dtype=np.int64)
+        elif driver == "price_range":
+            ids = np.array(self._sort_indexes["final_price"].ids_between(bounds[0], bounds[1]), dtype=np.int64)
+        else:
+            ids = np.array(self._sort_indexes["average_rating"].ids_between(bounds[2]), dtype=np.int64)
+        plan["candidates"] = len(ids)
+        
+        keep = np.ones(len(ids), dtype=bool)
+        if equal:
+            bitmap = self._bitmaps.all
+            for field, value in equal.items():
+                bitmap &= self._filter_bitmap(field, value)
+            keep &= to_mask(bitmap, size)[ids]
+            residual += list(equal)
+        if any(bound is not None for bound in bounds):
+            keep &= self._columns.range_mask(*bounds, ids=ids)
+            residual += [name for name, bound in zip(("min_price", "max_price", "min_rating"), bounds) if bound is not None]
+        if product_ids is not None and driver != "search":
+            keep &= members_mask()[ids]
+            residual.append("search")
+        
+        ids = ids[keep]
+        plan["residual"] = residual
+        plan["matched"] = len(ids)
+        return ids, plan
+    
+    def filter_product_ids(self, filters: Dict[str, Any], product_ids: Optional[Collection[int]] = None) -> Set[int]:
+        """Returns the ids of products matching filters (and within product_ids)."""
+        with self._lock.read_lock:
+            return set(self._match_ids(filters, product_ids)[0].tolist())
+    
+    def explain_products(self, filters: Dict[str, Any], product_ids: Optional[Collection[int]] = None) -> Dict[str, Any]:
+        """
+        Returns the plan query_products uses for filters: the driving access
+        path, row estimates of every candidate path, the predicates checked
+        on the driver's candidates, and the candidate and match counts.
+        """
+        with self._lock.read_lock:
+            return self._match_ids(filters, product_ids)[1]
+    
+    def query_products(
+        self,
+        filters: Dict[str, Any],
+        sort_field: str,
+        descending: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[Any, int]] = None,
+        product_ids: Optional[Collection[int]] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Returns one page of filtered products in sort order, plus the match count.
+        
+        filters: category_id, min_price, max_price, min_rating, stock_status,
+        seller_id, has_discount (None/falsy values are ignored).
+        product_ids: optional candidate set (e.g. search matches).
+        
+        A cost-based plan drives the match from the most selective index
+        (see explain_products); equality filters intersect as bitmaps and
+        range filters are vectorized over the column store. Numeric sorts
+        order the matches there too; name/date sorts use the sort indexes.
+        Only the page's rows are turned back into product dicts.
+        """
+        with self._lock.read_lock:
+            ids, _ = self._match_ids(filters, product_ids)
+            total = len(ids)
+            if sort_field in SORTABLE_COLUMNS:
+                page_ids = self._columns.order(ids, sort_field, descending, offset, limit, after)
+                return [self._products[i] for i in page_ids], total
+            
+            members = set(ids.tolist())
+            return self._sorted_subset(members, sort_field, descending, offset, limit, after), total
+    
+    def get_facets(self, filters: Dict[str, Any]) -> Tuple[int, Dict[str, Dict[Any, int]]]:
+        """
+        Returns the match count for filters and per-value counts of each
+        bitmap field (category_id, seller_id, stock_status, has_discount).
+        
+        A field's counts apply every filter except that field's own, so the
+        other values of a filtered field still show how many products they
+        would give. Values with no matching products are left out.
+        """
+        with self._lock.read_lock:
+            total = int(np.count_nonzero(self._filter_mask(filters)))
+            facets: Dict[str, Dict[Any, int]] = {}
+            for field in BITMAP_FIELDS:
+                others = from_mask(self._filter_mask(filters, skip_field=field))
+                counts = {}
+                for value, bitmap in self._bitmaps.values(field).items():
+                    count = (bitmap & others).bit_count()
+                    if count:
+                        counts[value] = count
+                facets[field] = counts
+            return total, facets
+    
+    def get_top_products(
+        self,
+        sort_field: str,
+        limit: int,
+        descending: bool = True,
+        category_id: Optional[int] = None,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        stop_below: Optional[Any] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the first `limit` products in sort order that pass the filters.
+        
+        The ordered index acts as a maintained leaderboard: the walk stops as
+        soon as `limit` products are found, or (descending walks) once keys
+        drop below stop_below. A small category is instead scanned with a
+        bounded heap selection, O(c log limit). A category includes its
+        subcategories.
+        """
+        key = PRODUCT_SORT_KEYS[sort_field]
+        with self._lock.read_lock:
+            index = self._sort_indexes[sort_field]
+            members = None
+            if category_id is not None:
+                members = self._category_members(category_id)
+                if not members:
+                    return []
+                if len(members) * math.log2(max(limit, 2)) <= limit * len(index) / len(members):
+                    rows = [self._products[i] for i in sorted(members)]
+                    if predicate is not None:
+                        rows = [p for p in rows if predicate(p)]
+                    select = heapq.nlargest if descending else heapq.nsmallest
+                    return select(limit, rows, key=key)
+            
+            result = []
+            for product_id in index.iter_ids(descending):
+                if members is not None and product_id not in members:
+                    continue
+                product = self._products[product_id]
+                if stop_below is not None and key(product) < stop_below:
+                    break
+                if predicate is None or predicate(product):
+                    result.append(product)
+                    if len(result) >= limit:
+                        break
+            return result
+    
+    def get_products_in_range(
+        self,
+        sort_field: str,
+        low: Any,
+        high: Any,
+        category_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns products whose sort key lies in [low, high] (inclusive), found
+        via the ordered index. A category includes its subcategories.
+        """
+        with self._lock.read_lock:
+            products = [self._products[i] for i in self._sort_indexes[sort_field].ids_between(low, high)]
+            if category_id is not None:
+                # O(1) subtree check per product (pre/post-order interval)
+                tree = self._get_tree()
+                if category_id in tree:
+                    products = [p for p in products if tree.contains(category_id, p.get("category_id"))]
+                else:
+                    products = [p for p in products if p.get("category_id") == category_id]
+            return products
     
     def search_products(self, query: str) -> List[Dict[str, Any]]:
-        """Searches in product name or description."""
-        query_lower = query.lower()
-        with self._lock:
-            return [
-                p for p in self._products.values()
-                if query_lower in p.get("name", "").lower() 
-                or query_lower in p.get("description", "").lower()
-            ]
+        """
+        Searches in product name or description.
+        
+        Every query word must match the start of a word in the product
+        (AND, prefix match). Results are ordered by BM25 relevance.
+        """
+        with self._lock.read_lock:
+            return [self._products[i] for i, _ in self._search_index.search(query)]
+    
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Returns up to `limit` name completions for a typed prefix.
+        
+        Matching categories come first (most products first), then matching
+        products ranked by review count. Ties are broken by id.
+        """
+        with self._lock.read_lock:
+            # Categories are few: rank every match by its live product count
+            matches = self._category_autocomplete.matches(prefix)
+            category_ids = [i for _, i in matches if i in self._categories]
+            
+            def category_rank(category_id: int):
+                return len(self._products_by_category.get(category_id, ())), -category_id
+            
+            suggestions = []
+            for category_id in heapq.nlargest(limit, category_ids, key=category_rank):
+                suggestions.append({
+                    "text": self._categories[category_id].get("name", ""),
+                    "type": KIND_CATEGORY,
+                    "id": category_id,
+                    "product_count": category_rank(category_id)[0]
+                })
+            for _, product_id in self._autocomplete.top(prefix, limit - len(suggestions)):
+                product = self._products[product_id]
+                suggestions.append({
+                    "text": product.get("name", ""),
+                    "type": KIND_PRODUCT,
+                    "id": product_id,
+                    "review_count": product.get("review_count", 0)
+                })
+            return suggestions
+    
+    def _new_product(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Builds a new product record with the next id. Caller must hold the lock."""
+        self._product_counter += 1
+        product = {
+            "id": self._product_counter,
+            **product_data,
+            "created_at": datetime.now().isoformat(),
+            "updated_at": datetime.now().isoformat(),
+            "average_rating": 0.0,
+            "review_count": 0
+        }
+        # Calculate final price
+        price = product.get("price", 0)
+        discount = product.get("discount_percentage", 0)
+        product["final_price"] = round(price * (1 - discount / 100), 2)
+        return product
     
     def create_product(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """Creates a new product."""
-        with self._lock:
-            self._product_counter += 1
-            product_id = self._product_counter
-            product = {
-                "id": product_id,
-                **product_data,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
-                "average_rating": 0.0,
-                "review_count": 0
-            }
-            # Calculate final price
-            price = product.get("price", 0)
-            discount = product.get("discount_percentage", 0)
-            product["final_price"] = round(price * (1 - discount / 100), 2)
-            
+        with self._lock.write_lock:
+            self._check_log()
+            product = self._new_product(product_data)
+            self._insert_product(product)
+            lsn = self._log("create_product", product)
+        self._commit(lsn)
+        return product
+    
+    def create_products(self, products_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Creates many products under a single lock acquisition, returned in order.
+        
+        Indexes are updated in batch: ordered, search and autocomplete
+        indexes sort once per call instead of inserting row by row.
+        """
+        with self._lock.write_lock:
+            self._check_log()
+            products = [self._new_product(product_data) for product_data in products_data]
+            self._insert_products(products)
+            lsn = self._log("create_products", products) if products else 0
+        self._commit(lsn)
+        return products
+    
+    def _insert_product(self, product: Dict[str, Any]):
+        """Stores and indexes a new product. Caller must hold the lock."""
+        product_id = product["id"]
+        self._products[product_id] = product
+        self._index_product(product)
+        self._touch_product(product_id)
+        self._touch_category(product.get("category_id"))
+        self._search_index.add(product_id, product.get("name", ""), product.get("description", ""))
+        self._autocomplete.add(KIND_PRODUCT, product_id, product.get("name", ""), product.get("review_count", 0))
+        self._note_text_write(product_id)
+        self._bump("products")
+    
+    def _insert_products(self, products: List[Dict[str, Any]]):
+        """Stores and indexes new products in batch. Caller must hold the lock."""
+        for product in products:
+            product_id = product["id"]
             self._products[product_id] = product
-            return product
+            self._add_to_index(self._products_by_category, product.get("category_id"), product_id)
+            self._add_to_index(self._products_by_seller, product.get("seller_id"), product_id)
+            self._columns.put(product)
+            self._bitmaps.add(product)
+            self._touch_product(product_id)
+            self._note_text_write(product_id)
+        for field, index in self._sort_indexes.items():
+            key = PRODUCT_SORT_KEYS[field]
+            index.update((key(product), product["id"]) for product in products)
+        self._search_index.update(
+            (product["id"], product.get("name", ""), product.get("description", ""))
+            for product in products
+        )
+        self._autocomplete.update(
+            (KIND_PRODUCT, product["id"], product.get("name", ""), product.get("review_count", 0))
+            for product in products
+        )
+        for category_id in {product.get("category_id") for product in products}:
+            self._touch_category(category_id)
+        self._bump("products")
     
     def update_product(self, product_id: int, product_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Updates an existing product."""
-        with self._lock:
-            if product_id not in self._products:
-                return None
-            
-            product = self._products[product_id]
-            product.update(product_data)
-            product["updated_at"] = datetime.now().isoformat()
-            
-            # Recalculate final price
-            price = product.get("price", 0)
-            discount = product.get("discount_percentage", 0)
-            product["final_price"] = round(price * (1 - discount / 100), 2)
-            
-            return product
+        with self._lock.write_lock:
+            self._check_log()
+            updated_at = datetime.now().isoformat()
+            product = self._update_product(product_id, product_data, updated_at)
+            lsn = self._log("update_product", product_id, product_data, updated_at) if product else 0
+        self._commit(lsn)
+        return product
+    
+    def _update_product(self, product_id: int, product_data: Dict[str, Any], updated_at: str) -> Optional[Dict[str, Any]]:
+        """Applies a product update. Caller must hold the lock."""
+        if product_id not in self._products:
+            return None
+        
+        previous = self._products[product_id]
+        before = {field: previous.get(field) for field in SIMILARITY_FIELDS}
+        self._unindex_product(previous)
+        product = {**previous, **product_data, "updated_at": updated_at}
+        
+        # Recalculate final price
+        price = product.get("price", 0)
+        discount = product.get("discount_percentage", 0)
+        product["final_price"] = round(price * (1 - discount / 100), 2)
+        self._products[product_id] = product
+        self._index_product(product)
+        self._touch_product(product_id)
+        if any(product.get(field) != value for field, value in before.items()):
+            self._touch_category(before["category_id"])
+            self._touch_category(product.get("category_id"))
+        if "name" in product_data or "description" in product_data:
+            self._search_index.add(product_id, product.get("name", ""), product.get("description", ""))
+            self._note_text_write(product_id)
+        if "name" in product_data:
+            self._autocomplete.add(KIND_PRODUCT, product_id, product.get("name", ""), product.get("review_count", 0))
+        
+        self._bump("products")
+        return product
     
     def delete_product(self, product_id: int) -> bool:
         """Deletes a product."""
-        with self._lock:
-            if product_id in self._products:
-                del self._products[product_id]
-                # Also delete related reviews
-                self._reviews = {
-                    k: v for k, v in self._reviews.items() 
-                    if v.get("product_id") != product_id
-                }
-                return True
+        with self._lock.write_lock:
+            self._check_log()
+            deleted = self._delete_product(product_id)
+            lsn = self._log("delete_product", product_id) if deleted else 0
+        self._commit(lsn)
+        return deleted
+    
+    def _delete_product(self, product_id: int) -> bool:
+        """Deletes a product and its reviews. Caller must hold the lock."""
+        if product_id not in self._products:
             return False
+        
+        product = self._products.pop(product_id)
+        self._unindex_product(product)
+        self._touch_category(product.get("category_id"))
+        self._product_versions.pop(product_id, None)
+        self._product_fragments.pop(product_id, None)
+        for include_same_seller in (False, True):
+            self._similar_neighbors.pop((product_id, include_same_seller), None)
+        self._detail_versions.pop(product_id, None)
+        self._drop_details(product_id)
+        self._search_index.remove(product_id)
+        self._autocomplete.remove(KIND_PRODUCT, product_id)
+        self._note_text_write(product_id)
+        # Also delete related reviews
+        for review_id in list(self._reviews_by_product.get(product_id, ())):
+            self._unindex_review(self._reviews.pop(review_id))
+        self._rating_stats.pop(product_id, None)
+        self._bump("products", "reviews")
+        return True
     
     def update_product_rating(self, product_id: int):
-        """Updates the product's average rating and review count."""
-        with self._lock:
-            if product_id not in self._products:
+        """Updates the product's average rating and review count from its rating aggregate."""
+        with self._lock.write_lock:
+            self._sync_product_rating(product_id)
+            self._bump("products")
+    
+    def get_product_version(self, product_id: int) -> int:
+        """Returns the product's version; it changes on every write to the record."""
+        # Single dict read: atomic, no lock needed
+        return self._product_versions.get(product_id, 0)
+    
+    def get_product_fragment(self, product_id: int, version: int) -> Optional[bytes]:
+        """Returns the product's cached fragment if it was stored at this version."""
+        # Single dict read: atomic, no lock needed
+        entry = self._product_fragments.get(product_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        return None
+    
+    def put_product_fragment(self, product_id: int, version: int, fragment: bytes):
+        """
+        Caches opaque per-product data (e.g. serialized JSON) built at version.
+        
+        Read the version before building the fragment: if the product changes
+        meanwhile the entry is stored under the old version and never served.
+        """
+        # Single dict write: atomic, no lock needed
+        if product_id in self._products:
+            self._product_fragments[product_id] = (version, fragment)
+    
+    def get_similar_neighbors(self, product_id: int, include_same_seller: bool, version: int) -> Optional[List[int]]:
+        """Returns the product's stored similar-product ids if they were ranked at this category version."""
+        # Single dict read: atomic, no lock needed
+        entry = self._similar_neighbors.get((product_id, include_same_seller))
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        return None
+    
+    def put_similar_neighbors(self, product_id: int, include_same_seller: bool, version: int, neighbor_ids: List[int]):
+        """
+        Stores the product's similar-product ids ranked at category version.
+        
+        Read the version before ranking: if the category changes meanwhile
+        the entry is stored under the old version and never served.
+        """
+        # Single dict write: atomic, no lock needed
+        if product_id in self._products:
+            self._similar_neighbors[(product_id, include_same_seller)] = (version, neighbor_ids)
+    
+    def get_product_detail(self, product_id: int) -> Optional[bytes]:
+        """
+        Returns the product's materialized detail (opaque, e.g. serialized
+        ProductDetail JSON) if nothing it depends on changed since it was built.
+        """
+        # Dict reads only: atomic, no lock needed. Writes to the product,
+        # its similar products, reviews, author/seller/category records
+        # remove the entry; category changes (similar set) are checked here
+        entry = self._product_details.get(product_id)
+        if entry is None:
+            return None
+        version, category_id, body = entry
+        if self._category_versions.get(category_id, 0) > version:
+            return None
+        return body
+    
+    def put_product_detail(self, product_id: int, version: int, similar_ids: List[int], body: bytes):
+        """
+        Stores a materialized product detail built from data read after
+        data_version was `version`, showing the given similar products.
+        
+        Read the version before building: if anything the detail depends on
+        changed meanwhile, it is not stored.
+        """
+        with self._lock.read_lock:
+            product = self._products.get(product_id)
+            if product is None:
                 return
-            
-            product_reviews = [
-                r for r in self._reviews.values() 
-                if r.get("product_id") == product_id
-            ]
-            
-            if product_reviews:
-                avg_rating = sum(r.get("rating", 0) for r in product_reviews) / len(product_reviews)
-                self._products[product_id]["average_rating"] = round(avg_rating, 2)
-                self._products[product_id]["review_count"] = len(product_reviews)
-            else:
-                self._products[product_id]["average_rating"] = 0.0
-                self._products[product_id]["review_count"] = 0
+            category_id = product.get("category_id")
+            versions = self._product_versions
+            if (
+                self._category_versions.get(category_id, 0) > version
+                or self._detail_versions.get(product_id, 0) > version
+                or any(versions.get(i, 0) > version for i in (product_id, *similar_ids))
+            ):
+                return
+            # Writers are excluded: no write can slip in before registration
+            for similar_id in similar_ids:
+                self._detail_dependents.setdefault(similar_id, set()).add(product_id)
+            self._product_details[product_id] = (version, category_id, body)
+    
+    def get_rating_stats(self, product_id: int) -> Dict[str, Any]:
+        """
+        Returns a copy of the product's rating aggregate in constant time.
+        
+        Keys: sum, count, distribution ("1"-"5" -> count), positive (4+ ratings).
+        """
+        with self._lock.read_lock:
+            stats = self._rating_stats.get(product_id)
+            if stats is None:
+                return self._empty_rating_stats()
+            return {**stats, "distribution": dict(stats["distribution"])}
     
     # ==================== REVIEWS ====================
     
     def get_all_reviews(self) -> List[Dict[str, Any]]:
         """Returns all reviews."""
-        with self._lock:
+        with self._lock.read_lock:
             return list(self._reviews.values())
     
     def get_review(self, review_id: int) -> Optional[Dict[str, Any]]:
         """Returns a single review by ID."""
-        with self._lock:
-            return self._reviews.get(review_id)
+        # Single dict read: atomic, no lock needed
+        return self._reviews.get(review_id)
     
     def get_reviews_by_product(self, product_id: int) -> List[Dict[str, Any]]:
         """Returns reviews for a specific product."""
-        with self._lock:
-            return [r for r in self._reviews.values() if r.get("product_id") == product_id]
+        with self._lock.read_lock:
+            return self._rows_for_ids(self._reviews, self._reviews_by_product.get(product_id))
     
     def get_reviews_by_user(self, user_id: int) -> List[Dict[str, Any]]:
         """Returns reviews by a specific user."""
-        with self._lock:
-            return [r for r in self._reviews.values() if r.get("user_id") == user_id]
+        with self._lock.read_lock:
+            return self._rows_for_ids(self._reviews, self._reviews_by_user.get(user_id))
     
     def create_review(self, review_data: Dict[str, Any]) -> Dict[str, Any]:
         """Creates a new review."""
-        with self._lock:
+        with self._lock.write_lock:
+            self._check_log()
             self._review_counter += 1
             review_id = self._review_counter
             review = {
@@ -180,35 +1075,69 @@ class InMemoryDatabase:
                 "created_at": datetime.now().isoformat(),
                 "helpful_count": 0
             }
-            self._reviews[review_id] = review
-        
-        # Update product rating (outside lock)
-        self.update_product_rating(review_data.get("product_id"))
+            self._insert_review(review)
+            lsn = self._log("create_review", review)
+        self._commit(lsn)
         return review
     
+    def _insert_review(self, review: Dict[str, Any]):
+        """Stores and indexes a new review. Caller must hold the lock."""
+        self._reviews[review["id"]] = review
+        self._index_review(review)
+        
+        # Update product rating aggregate
+        self._apply_review_rating(review.get("product_id"), review.get("rating", 0), 1)
+        self._bump("reviews", "products")
+    
     def increment_helpful(self, review_id: int) -> bool:
         """Increments a review's helpful count."""
-        with self._lock:
-            if review_id in self._reviews:
-                self._reviews[review_id]["helpful_count"] += 1
-                return True
+        with self._lock.write_lock:
+            self._check_log()
+            found = self._increment_helpful(review_id)
+            lsn = self._log("increment_helpful", review_id) if found else 0
+        self._commit(lsn)
+        return found
+    
+    def _increment_helpful(self, review_id: int) -> bool:
+        """Increments a review's helpful count. Caller must hold the lock."""
+        review = self._reviews.get(review_id)
+        if review is None:
             return False
+        self._reviews[review_id] = {**review, "helpful_count": review["helpful_count"] + 1}
+        self._touch_details([review.get("product_id")])
+        self._bump("reviews")
+        return True
     
     # ==================== USERS ====================
     
     def get_all_users(self) -> List[Dict[str, Any]]:
         """Returns all users."""
-        with self._lock:
+        with self._lock.read_lock:
             return list(self._users.values())
     
     def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Returns a single user by ID."""
-        with self._lock:
-            return self._users.get(user_id)
+        # Single dict read: atomic, no lock needed
+        return self._users.get(user_id)
+    
+    def join_user_names(self, reviews: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Returns copies of reviews with the author's user_name added
+        ("Anonymous" for unknown users), resolved in one locked pass.
+        """
+        with self._lock.read_lock:
+            users = self._users
+            joined = []
+            for review in reviews:
+                user = users.get(review.get("user_id"))
+                name = user.get("name", "Anonymous") if user else "Anonymous"
+                joined.append({**review, "user_name": name})
+            return joined
     
     def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Creates a new user."""
-        with self._lock:
+        with self._lock.write_lock:
+            self._check_log()
             self._user_counter += 1
             user_id = self._user_counter
             user = {
@@ -216,32 +1145,43 @@ class InMemoryDatabase:
                 **user_data,
                 "created_at": datetime.now().isoformat()
             }
-            self._users[user_id] = user
-            return user
+            self._insert_user(user)
+            lsn = self._log("create_user", user)
+        self._commit(lsn)
+        return user
+    
+    def _insert_user(self, user: Dict[str, Any]):
+        """Stores a new user. Caller must hold the lock."""
+        self._users[user["id"]] = user
+        # Details showing reviews by this id named the author "Anonymous"
+        reviews = self._reviews
+        self._touch_details({reviews[i].get("product_id") for i in self._reviews_by_user.get(user["id"], ())})
+        self._bump("users")
     
     # ==================== SELLERS ====================
     
     def get_all_sellers(self) -> List[Dict[str, Any]]:
         """Returns all sellers."""
-        with self._lock:
+        with self._lock.read_lock:
             return list(self._sellers.values())
     
     def get_seller(self, seller_id: int) -> Optional[Dict[str, Any]]:
         """Returns a single seller by ID."""
-        with self._lock:
-            return self._sellers.get(seller_id)
+        # Single dict read: atomic, no lock needed
+        return self._sellers.get(seller_id)
     
     def get_seller_by_api_key(self, api_key: str) -> Optional[Dict[str, Any]]:
         """Returns seller by API key."""
-        with self._lock:
-            seller_id = self._api_keys.get(api_key)
-            if seller_id:
-                return self._sellers.get(seller_id)
-            return None
+        # Two atomic dict reads; sellers are never deleted, so no lock needed
+        seller_id = self._api_keys.get(api_key)
+        if seller_id:
+            return self._sellers.get(seller_id)
+        return None
     
     def create_seller(self, seller_data: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Creates a new seller."""
-        with self._lock:
+        with self._lock.write_lock:
+            self._check_log()
             self._seller_counter += 1
             seller_id = self._seller_counter
             seller = {
@@ -249,64 +1189,466 @@ class InMemoryDatabase:
                 **seller_data,
                 "created_at": datetime.now().isoformat()
             }
-            self._sellers[seller_id] = seller
-            self._api_keys[api_key] = seller_id
-            return seller
+            self._insert_seller(seller, api_key)
+            lsn = self._log("create_seller", seller, api_key)
+        self._commit(lsn)
+        return seller
+    
+    def _insert_seller(self, seller: Dict[str, Any], api_key: str):
+        """Stores a new seller and its API key. Caller must hold the lock."""
+        self._sellers[seller["id"]] = seller
+        self._api_keys[api_key] = seller["id"]
+        self._touch_details(self._products_by_seller.get(seller["id"], ()))
+        self._bump("sellers")
     
     def verify_api_key(self, api_key: str) -> bool:
         """Checks if the API key is valid."""
-        with self._lock:
-            return api_key in self._api_keys
+        # Single dict read: atomic, no lock needed
+        return api_key in self._api_keys
     
     # ==================== CATEGORIES ====================
     
     def get_all_categories(self) -> List[Dict[str, Any]]:
         """Returns all categories."""
-        with self._lock:
+        with self._lock.read_lock:
             return list(self._categories.values())
     
     def get_category(self, category_id: int) -> Optional[Dict[str, Any]]:
         """Returns a single category by ID."""
-        with self._lock:
-            return self._categories.get(category_id)
+        # Single dict read: atomic, no lock needed
+        return self._categories.get(category_id)
     
     def create_category(self, category_data: Dict[str, Any]) -> Dict[str, Any]:
         """Creates a new category."""
-        with self._lock:
+        with self._lock.write_lock:
+            self._check_log()
             self._category_counter += 1
             category_id = self._category_counter
             category = {
                 "id": category_id,
                 **category_data
             }
-            self._categories[category_id] = category
-            return category
+            self._insert_category(category)
+            lsn = self._log("create_category", category)
+        self._commit(lsn)
+        return category
+    
+    def _insert_category(self, category: Dict[str, Any]):
+        """Stores a new category. Caller must hold the lock."""
+        self._categories[category["id"]] = category
+        self._category_autocomplete.add(KIND_CATEGORY, category["id"], category.get("name", ""))
+        self._touch_details(self._products_by_category.get(category["id"], ()))
+        self._category_tree = None
+        self._bump("categories")
     
     def get_category_product_count(self, category_id: int) -> int:
         """Returns the number of products in a category."""
-        with self._lock:
-            return len([p for p in self._products.values() if p.get("category_id") == category_id])
+        with self._lock.read_lock:
+            return len(self._products_by_category.get(category_id, ()))
+    
+    def get_category_tree(self) -> List[Dict[str, Any]]:
+        """
+        Returns the top-level categories, each with its product counts and
+        nested subcategories (see _category_node), in one pass over the categories.
+        """
+        with self._lock.read_lock:
+            tree = self._get_tree()
+            return [self._category_node(tree, root) for root in tree.roots]
+    
+    def get_category_node(self, category_id: int) -> Optional[Dict[str, Any]]:
+        """Returns a category with its product counts and nested subcategories."""
+        with self._lock.read_lock:
+            tree = self._get_tree()
+            if category_id not in tree:
+                return None
+            return self._category_node(tree, category_id)
+    
+    def _get_tree(self) -> CategoryTree:
+        """Returns the category tree, building it if categories changed. Caller must hold the lock."""
+        tree = self._category_tree
+        if tree is None:
+            tree = self._category_tree = CategoryTree(self._categories)
+        return tree
+    
+    def _category_node(self, tree: CategoryTree, category_id: int) -> Dict[str, Any]:
+        """
+        Builds a category's subtree as nested dicts. Caller must hold the lock.
+        
+        product_count: products directly in the category
+        total_product_count: products in the category and all its descendants
+        """
+        nodes: Dict[int, Dict[str, Any]] = {}
+        # Reverse pre-order: children are built before their parent
+        for node_id in reversed(tree.subtree(category_id)):
+            subcategories = [nodes.pop(child) for child in tree.children(node_id)]
+            count = len(self._products_by_category.get(node_id, ()))
+            nodes[node_id] = {
+                **self._categories[node_id],
+                "product_count": count,
+                "total_product_count": count + sum(c["total_product_count"] for c in subcategories),
+                "subcategories": subcategories
+            }
+        return nodes[category_id]
+    
+    def get_category_version(self, category_id: int) -> int:
+        """
+        Returns the category's version. It changes whenever a product joins or
+        leaves the category or changes category, seller, price or rating, so
+        derived data (e.g. similar-product lists) can be cached per version.
+        """
+        # Single dict read: atomic, no lock needed
+        return self._category_versions.get(category_id, 0)
+    
+    # ==================== SNAPSHOTS ====================
+    
+    def save_snapshot(self, path: str):
+        """Writes all tables, counters and API keys to a binary snapshot file."""
+        with self._lock.read_lock:
+            self._write_snapshot(path)
+    
+    def _write_snapshot(self, path: str):
+        """Writes the snapshot file. Caller must hold the lock."""
+        tables = {
+            "products": to_columns(self._products.values()),
+            "reviews": to_columns(self._reviews.values()),
+            "users": to_columns(self._users.values()),
+            "sellers": to_columns(self._sellers.values()),
+            "categories": to_columns(self._categories.values()),
+            "rating_stats": to_columns(
+                {
+                    "id": product_id,
+                    "sum": stats["sum"],
+                    "count": stats["count"],
+                    "positive": stats["positive"],
+                    **stats["distribution"]
+                }
+                for product_id, stats in self._rating_stats.items()
+            )
+        }
+        # Sort index entries are stored in order, so loading needs no sort
+        for field, index in self._sort_indexes.items():
+            entries = index.entries()
+            tables[f"sort:{field}"] = {
+                "key": [key for key, _ in entries],
+                "id": [item_id for _, item_id in entries]
+            }
+        meta = {
+            "wal_lsn": self._log_sequence,
+            "api_keys": self._api_keys,
+            "counters": {
+                "products": self._product_counter,
+                "reviews": self._review_counter,
+                "users": self._user_counter,
+                "sellers": self._seller_counter,
+                "categories": self._category_counter
+            }
+        }
+        write_snapshot(path, tables, meta)
+    
+    def load_snapshot(self, path: str) -> Dict[str, int]:
+        """
+        Replaces all data with a snapshot written by save_snapshot.
+        
+        The file is memory-mapped: records are decoded on first access, and
+        the indexes are rebuilt from whole columns (sort indexes from their
+        stored order). Search and autocomplete indexes are built by a
+        background thread; until text_indexes_ready they only cover products
+        written since the load.
+        """
+        snapshot = read_snapshot(path)
+        tables = snapshot.tables
+        products = tables["products"]
+        
+        with self._lock.write_lock:
+            self._reset()
+            self._products = SnapshotTable(products)
+            self._reviews = SnapshotTable(tables["reviews"])
+            self._users = SnapshotTable(tables["users"])
+            self._sellers = SnapshotTable(tables["sellers"])
+            self._categories = SnapshotTable(tables["categories"])
+            self._api_keys.update(snapshot.meta["api_keys"])
+            self._log_sequence = max(self._log_sequence, snapshot.meta.get("wal_lsn", 0))
+            counters = snapshot.meta["counters"]
+            self._product_counter = counters["products"]
+            self._review_counter = counters["reviews"]
+            self._user_counter = counters["users"]
+            self._seller_counter = counters["sellers"]
+            self._category_counter = counters["categories"]
+            
+            # Product indexes
+            ids = products.numbers("id")
+            self._columns.load(ids, {field: products.numbers(field) for field in SORTABLE_COLUMNS})
+            for field, index in (("category_id", self._products_by_category), ("seller_id", self._products_by_seller)):
+                for value, members in products.groups(field).items():
+                    index[value] = set(members.tolist())
+                    self._bitmaps.put(field, value, from_ids(members))
+            for value, members in products.groups("stock_status").items():
+                self._bitmaps.put("stock_status", value, from_ids(members))
+            discounted = products.numbers("discount_percentage") > 0
+            for value in (True, False):
+                members = ids[discounted == value]
+                if len(members):
+                    self._bitmaps.put("has_discount", value, from_ids(members))
+            for field, index in self._sort_indexes.items():
+                entries = tables[f"sort:{field}"]
+                index.update(zip(entries.values("key"), entries.numbers("id").tolist()))
+            
+            # Review indexes and rating aggregates
+            reviews = tables["reviews"]
+            for value, members in reviews.groups("product_id").items():
+                self._reviews_by_product[value] = set(members.tolist())
+            for value, members in reviews.groups("user_id").items():
+                self._reviews_by_user[value] = set(members.tolist())
+            rating_stats = tables["rating_stats"]
+            ratings = ("5", "4", "3", "2", "1")
+            columns = [rating_stats.values(field) for field in ("id", "sum", "count", "positive", *ratings)]
+            for product_id, total, count, positive, *distribution in zip(*columns):
+                self._rating_stats[product_id] = {
+                    "sum": total,
+                    "count": count,
+                    "distribution": dict(zip(ratings, distribution)),
+                    "positive": positive
+                }
+            
+            for category_id, category in self._categories.items():
+                self._category_autocomplete.add(KIND_CATEGORY, category_id, category.get("name", ""))
+            # Fresh versions for every loaded category (derived caches are per version)
+            for category_id in self._products_by_category:
+                self._touch_category(category_id)
+            self._bump(*TABLES)
+            
+            self._text_pending = set()
+            generation = self._text_generation
+        
+        Thread(
+            target=self._build_text_indexes,
+            args=(products, generation),
+            name="snapshot-text-indexes",
+            daemon=True
+        ).start()
+        return self.get_stats()
+    
+    def _build_text_indexes(self, products: TableImage, generation: int):
+        """
+        Builds the search and autocomplete indexes of a loaded snapshot
+        (background thread) and swaps them in, re-indexing products written
+        during the build.
+        """
+        ids = products.numbers("id").tolist()
+        names = products.values("name", "")
+        search_index = SearchIndex()
+        search_index.update(zip(ids, names, products.values("description", "")))
+        autocomplete = PrefixIndex()
+        review_counts = products.numbers("review_count").tolist()
+        autocomplete.update(
+            (KIND_PRODUCT, product_id, name, weight)
+            for product_id, name, weight in zip(ids, names, review_counts)
+        )
+        
+        with self._lock.write_lock:
+            # Data was cleared or reloaded meanwhile
+            if generation != self._text_generation:
+                return
+            for product_id in self._text_pending:
+                search_index.remove(product_id)
+                autocomplete.remove(KIND_PRODUCT, product_id)
+                product = self._products.get(product_id)
+                if product is not None:
+                    search_index.add(product_id, product.get("name", ""), product.get("description", ""))
+                    autocomplete.add(KIND_PRODUCT, product_id, product.get("name", ""), product.get("review_count", 0))
+            self._search_index = search_index
+            self._autocomplete = autocomplete
+            self._text_pending = None
+            self._bump("products", "categories")
+    
+    @property
+    def text_indexes_ready(self) -> bool:
+        """False while a loaded snapshot's search and autocomplete indexes are being built."""
+        return self._text_pending is None
+    
+    # ==================== WRITE-AHEAD LOG ====================
+    
+    def _check_log(self):
+        """
+        Raises LogWriteError if a write could not be logged. Caller must hold
+        the lock and call it before applying the write, so a rejected write
+        leaves memory unchanged.
+        """
+        if self._wal is not None:
+            self._wal.check()
+    
+    def _log(self, op: str, *args: Any) -> int:
+        """
+        Appends a write to the log, if one is open, and returns its LSN (0 if
+        not logged). Caller must hold the lock, so log order is apply order.
+        """
+        if self._wal is None:
+            return 0
+        self._log_sequence += 1
+        self._wal.append(self._log_sequence, op, list(args))
+        return self._log_sequence
+    
+    def _commit(self, lsn: int):
+        """Waits (after the lock is released) until a logged write is durable."""
+        wal = self._wal
+        if lsn and wal is not None:
+            wal.wait(lsn)
+    
+    def _apply_logged(self, op: str, args: List[Any]):
+        """Re-applies one logged write. Caller must hold the lock."""
+        if op == "create_product":
+            product = args[0]
+            self._product_counter = max(self._product_counter, product["id"])
+            self._insert_product(product)
+        elif op == "create_products":
+            products = args[0]
+            if products:
+                self._product_counter = max(self._product_counter, products[-1]["id"])
+            self._insert_products(products)
+        elif op == "update_product":
+            self._update_product(*args)
+        elif op == "delete_product":
+            self._delete_product(*args)
+        elif op == "create_review":
+            review = args[0]
+            self._review_counter = max(self._review_counter, review["id"])
+            self._insert_review(review)
+        elif op == "increment_helpful":
+            self._increment_helpful(*args)
+        elif op == "create_user":
+            user = args[0]
+            self._user_counter = max(self._user_counter, user["id"])
+            self._insert_user(user)
+        elif op == "create_seller":
+            seller, api_key = args
+            self._seller_counter = max(self._seller_counter, seller["id"])
+            self._insert_seller(seller, api_key)
+        elif op == "create_category":
+            category = args[0]
+            self._category_counter = max(self._category_counter, category["id"])
+            self._insert_category(category)
+        elif op == "clear_all":
+            self._reset()
+        else:
+            raise ValueError(f"Unknown log record: {op}")
+    
+    def open_wal(self, path: str, sync_interval: float = 0.0) -> int:
+        """
+        Replays the write-ahead log at path on top of the current data and
+        logs every later write to it. Returns the number of replayed records.
+        
+        Records already contained in the loaded snapshot (LSN <= its
+        wal_lsn) are skipped. sync_interval: see WriteAheadLog.
+        """
+        with self._lock.write_lock:
+            replayed = 0
+            for record in read_log(path):
+                if record["lsn"] <= self._log_sequence:
+                    continue
+                self._apply_logged(record["op"], record["args"])
+                self._log_sequence = record["lsn"]
+                replayed += 1
+            self._wal = WriteAheadLog(path, sync_interval)
+        return replayed
+    
+    def close_wal(self):
+        """Writes out pending log records and closes the log."""
+        with self._lock.write_lock:
+            wal, self._wal = self._wal, None
+        if wal is not None:
+            wal.close()
+    
+    def compact(self, snapshot_path: str):
+        """
+        Saves a snapshot and empties the log, so the next startup loads the
+        snapshot and replays only what is logged after it. Writes wait
+        while the snapshot is written.
+        
+        Without a log this is just save_snapshot.
+        """
+        with self._lock.read_lock:
+            self._write_snapshot(snapshot_path)
+            # A crash before the truncate is harmless: replay skips records
+            # up to the snapshot's LSN
+            if self._wal is not None:
+                self._wal.truncate()
+    
+    def get_wal_stats(self) -> Optional[Dict[str, int]]:
+        """Returns log size and record/fsync counters, or None without a log."""
+        wal = self._wal
+        if wal is None:
+            return None
+        return {
+            "lsn": self._log_sequence,
+            "bytes": wal.size(),
+            "records": wal.records,
+            "syncs": wal.syncs
+        }
     
     # ==================== UTILITY ====================
     
     def clear_all(self):
         """Clears all data (for testing)."""
-        with self._lock:
-            self._products.clear()
-            self._reviews.clear()
-            self._users.clear()
-            self._sellers.clear()
-            self._categories.clear()
-            self._api_keys.clear()
-            self._product_counter = 0
-            self._review_counter = 0
-            self._user_counter = 0
-            self._seller_counter = 0
-            self._category_counter = 0
+        with self._lock.write_lock:
+            self._check_log()
+            self._reset()
+            lsn = self._log("clear_all")
+        self._commit(lsn)
+    
+    def _reset(self):
+        """Empties all tables, indexes and counters. Caller must hold the lock."""
+        # Fresh tables rather than clear(): snapshot tables are swapped out whole
+        self._products = {}
+        self._reviews = {}
+        self._users = {}
+        self._sellers = {}
+        self._categories = {}
+        self._api_keys.clear()
+        # A text index build still running for earlier data is discarded
+        self._text_generation += 1
+        self._text_pending = None
+        self._products_by_category.clear()
+        self._products_by_seller.clear()
+        self._reviews_by_product.clear()
+        self._reviews_by_user.clear()
+        for index in self._sort_indexes.values():
+            index.clear()
+        self._search_index.clear()
+        self._autocomplete.clear()
+        self._category_autocomplete.clear()
+        self._columns.clear()
+        self._bitmaps.clear()
+        self._category_tree = None
+        self._rating_stats.clear()
+        self._category_versions.clear()
+        self._product_versions.clear()
+        self._product_fragments.clear()
+        self._similar_neighbors.clear()
+        self._product_details.clear()
+        self._detail_versions.clear()
+        self._detail_dependents.clear()
+        self._bump(*TABLES)
+        self._product_counter = 0
+        self._review_counter = 0
+        self._user_counter = 0
+        self._seller_counter = 0
+        self._category_counter = 0
+    
+    @property
+    def data_version(self) -> int:
+        """Monotonic version of the whole database; changes on every write."""
+        return self._version_clock
+    
+    def get_versions(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """Returns the current versions of the given tables (see TABLES)."""
+        # Each read is atomic and versions only grow, so no lock is needed:
+        # a write racing this call at worst yields a version that is already stale
+        versions = self._table_versions
+        return tuple(versions[table] for table in tables)
     
     def get_stats(self) -> Dict[str, int]:
         """Returns database statistics."""
-        with self._lock:
+        with self._lock.read_lock:
             return {
                 "total_products": len(self._products),
                 "total_reviews": len(self._reviews),
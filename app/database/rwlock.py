@@ -0,0 +1,113 @@
+"""
+Read-Write Lock
+===============
+Lock primitives used by the in-memory database.
+
+ReadWriteLock lets any number of readers hold the lock at the same time,
+while writers get exclusive access. Waiting writers block new readers so a
+steady stream of reads cannot starve writes.
+
+ExclusiveLock exposes the same interface on top of a single mutex, so reads
+serialize just like writes. It is kept for comparison and benchmarks.
+
+Usage:
+    lock = ReadWriteLock()
+
+    with lock.read_lock:
+        ...  # shared access
+
+    with lock.write_lock:
+        ...  # exclusive access
+"""
+
+import threading
+
+
+class _ReadGuard:
+    """Context manager acquiring the shared side of a ReadWriteLock."""
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: "ReadWriteLock"):
+        self._owner = owner
+
+    def __enter__(self):
+        self._owner.acquire_read()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._owner.release_read()
+        return False
+
+
+class _WriteGuard:
+    """Context manager acquiring the exclusive side of a ReadWriteLock."""
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: "ReadWriteLock"):
+        self._owner = owner
+
+    def __enter__(self):
+        self._owner.acquire_write()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._owner.release_write()
+        return False
+
+
+class ReadWriteLock:
+    """
+    Writer-preferring reader-writer lock.
+
+    Not reentrant: a thread holding either side must not acquire the lock again.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+        self.read_lock = _ReadGuard(self)
+        self.write_lock = _WriteGuard(self)
+
+    def acquire_read(self):
+        """Blocks until no writer holds or waits for the lock, then registers a reader."""
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        """Unregisters a reader and wakes writers when the last reader leaves."""
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        """Blocks until there are no active readers or writers."""
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self):
+        """Releases exclusive access and wakes all waiters."""
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+
+class ExclusiveLock:
+    """Single mutex with the ReadWriteLock interface; readers block each other."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.read_lock = self._lock
+        self.write_lock = self._lock
@@ -0,0 +1,183 @@
+"""
+Search Index
+============
+Tokenized inverted index with BM25 ranking for product search.
+
+Documents are products; their name and description are tokenized into
+lowercase word terms. Name terms count NAME_WEIGHT times so a match in the
+title outranks one buried in the description.
+
+Data Structures:
+- postings: term -> {doc_id: weighted term frequency}
+- doc_terms: doc_id -> {term: weighted term frequency} (for removal)
+- doc_lengths: doc_id -> weighted document length
+- vocabulary: sorted list of all terms (for prefix expansion)
+
+Query Semantics:
+- The query is tokenized the same way as documents
+- Every query term must match (AND)
+- A query term matches any indexed term it is a prefix of,
+  so "head" finds "headphones" and "pro" finds "professional"
+- Results are ranked by BM25 score (highest first, ties by id)
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Set, Tuple
+import math
+import re
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Term frequency multiplier for terms in the product name
+NAME_WEIGHT = 2.0
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into lowercase word terms."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index over product name and description."""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._doc_lengths: Dict[int, float] = {}
+        self._total_length = 0.0
+        self._vocabulary: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._doc_terms
+
+    def clear(self):
+        """Removes all documents."""
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_lengths.clear()
+        self._total_length = 0.0
+        self._vocabulary.clear()
+
+    def add(self, doc_id: int, name: str, description: str):
+        """Indexes a document. Re-adding an existing id replaces it."""
+        if doc_id in self._doc_terms:
+            self.remove(doc_id)
+        for term in self._index(doc_id, name, description):
+            insort(self._vocabulary, term)
+
+    def update(self, documents: Iterable[Tuple[int, str, str]]):
+        """
+        Indexes many (doc_id, name, description) documents, sorting the
+        vocabulary once instead of per new term. Ids must be distinct.
+        """
+        documents = list(documents)
+        for doc_id, _, _ in documents:
+            self.remove(doc_id)
+        new_terms: List[str] = []
+        for doc_id, name, description in documents:
+            new_terms.extend(self._index(doc_id, name, description))
+        self._vocabulary.extend(new_terms)
+        self._vocabulary.sort()
+
+    def _index(self, doc_id: int, name: str, description: str) -> List[str]:
+        """Adds a new document's postings and returns terms not seen before (vocabulary is left to the caller)."""
+        terms: Dict[str, float] = {}
+        for term in tokenize(name):
+            terms[term] = terms.get(term, 0.0) + NAME_WEIGHT
+        for term in tokenize(description):
+            terms[term] = terms.get(term, 0.0) + 1.0
+
+        new_terms: List[str] = []
+        for term, frequency in terms.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                new_terms.append(term)
+            posting[doc_id] = frequency
+
+        length = sum(terms.values())
+        self._doc_terms[doc_id] = terms
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+        return new_terms
+
+    def remove(self, doc_id: int):
+        """Removes a document if it is indexed."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Returns indexed terms starting with prefix."""
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, prefix)
+        end = start
+        while end < len(vocabulary) and vocabulary[end].startswith(prefix):
+            end += 1
+        return vocabulary[start:end]
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """
+        Returns (doc_id, score) for documents matching every query term,
+        best match first.
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms or not self._doc_terms:
+            return []
+
+        expansions = [self._expand(term) for term in query_terms]
+        if not all(expansions):
+            return []
+
+        # Intersect posting lists: materialize the smallest, probe the rest
+        def posting_size(terms: List[str]) -> int:
+            return sum(len(self._postings[term]) for term in terms)
+
+        expansions.sort(key=posting_size)
+        candidates: Set[int] = set()
+        for term in expansions[0]:
+            candidates.update(self._postings[term])
+        for terms in expansions[1:]:
+            postings = [self._postings[term] for term in terms]
+            candidates = {
+                doc_id for doc_id in candidates
+                if any(doc_id in posting for posting in postings)
+            }
+            if not candidates:
+                return []
+
+        # BM25 scoring over the matched terms
+        doc_count = len(self._doc_terms)
+        average_length = self._total_length / doc_count or 1.0
+        scores: Dict[int, float] = dict.fromkeys(candidates, 0.0)
+        for term in {term for terms in expansions for term in terms}:
+            posting = self._postings[term]
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            # Probe from whichever side is smaller
+            if len(candidates) < len(posting):
+                matches = ((doc_id, posting.get(doc_id)) for doc_id in candidates)
+            else:
+                matches = ((doc_id, f) for doc_id, f in posting.items() if doc_id in scores)
+            for doc_id, frequency in matches:
+                if frequency:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,379 @@
+"""
+Binary Snapshot
+===============
+Columnar on-disk image of the database, loaded through mmap.
+
+File layout (little endian):
+    magic        8 bytes   b"OSNAP001"
+    header size  uint64
+    header       UTF-8 JSON: metadata, string table and per table its row
+                 count and columns (name, encoding, block positions)
+    blocks       column arrays, each starting at a multiple of 8 bytes
+
+Tables are stored column by column (one column per record field, rows in
+table order). Column encodings:
+- int64 / float64 / bool: the raw values
+- str: int64 positions in the string table
+- json: positions of the value's JSON text (lists, dicts, mixed types)
+A column with None or missing values (or ints in a float column) also has
+a uint8 state block (STATE_*); without one every row holds a plain value.
+
+Every distinct string of the file is stored once in the string table: one
+UTF-8 blob plus an int64 array of offsets into it.
+
+read_snapshot maps the file and wraps each block in a zero-copy NumPy
+view, so opening a snapshot costs the same however large it is. Nothing is
+decoded until a record is read (SnapshotTable) or a whole column is asked
+for (TableImage.values / numbers / groups).
+"""
+
+from collections.abc import MutableMapping
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List
+import json
+import mmap
+import os
+import struct
+import numpy as np
+
+
+MAGIC = b"OSNAP001"
+
+# Row states (state block values)
+STATE_VALUE = 0
+STATE_NONE = 1
+STATE_MISSING = 2
+STATE_INT = 3  # float64 column, value was an int
+
+# Placeholder for fields a record does not have (see to_columns)
+MISSING = object()
+
+_ALIGNMENT = 8
+_DTYPES = {"int64": np.int64, "float64": np.float64, "bool": np.bool_, "str": np.int64, "json": np.int64}
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def to_columns(records: Iterable[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Turns records into field -> values lists (MISSING where a record lacks the field)."""
+    columns: Dict[str, List[Any]] = {}
+    count = 0
+    for record in records:
+        for field in record:
+            if field not in columns:
+                columns[field] = [MISSING] * count
+        for field, values in columns.items():
+            values.append(record.get(field, MISSING))
+        count += 1
+    return columns
+
+
+def _column_kind(values: List[Any]) -> str:
+    """Picks the encoding of a column from the types of its values."""
+    types = {type(v) for v in values if v is not None and v is not MISSING}
+    if types <= {bool}:
+        return "bool"
+    if types <= {int}:
+        ints = [v for v in values if type(v) is int]
+        if not ints or (_INT64_MIN <= min(ints) and max(ints) <= _INT64_MAX):
+            return "int64"
+    if types <= {int, float}:
+        return "float64"
+    if types <= {str}:
+        return "str"
+    return "json"
+
+
+class _Writer:
+    """Accumulates blocks and interned strings of a snapshot being written."""
+
+    def __init__(self):
+        self.blocks: List[bytes] = []
+        self.size = 0
+        self.strings: Dict[str, int] = {}
+
+    def block(self, data: bytes) -> List[int]:
+        """Appends a block and returns its [offset, length] in the data section."""
+        offset = self.size
+        padding = -len(data) % _ALIGNMENT
+        self.blocks.append(data + b"\0" * padding)
+        self.size += len(data) + padding
+        return [offset, len(data)]
+
+    def string(self, text: str) -> int:
+        """Returns the string table position of text, adding it if new."""
+        position = self.strings.get(text)
+        if position is None:
+            position = self.strings[text] = len(self.strings)
+        return position
+
+    def column(self, values: List[Any]) -> Dict[str, Any]:
+        """Encodes one column and returns its header entry."""
+        kind = _column_kind(values)
+        states = bytearray(len(values))
+        encoded: List[Any] = []
+        for row, value in enumerate(values):
+            if value is MISSING or value is None:
+                states[row] = STATE_MISSING if value is MISSING else STATE_NONE
+                encoded.append(0)
+            elif kind == "str":
+                encoded.append(self.string(value))
+            elif kind == "json":
+                encoded.append(self.string(json.dumps(value, ensure_ascii=False, separators=(",", ":"))))
+            else:
+                if kind == "float64" and type(value) is int:
+                    states[row] = STATE_INT
+                encoded.append(value)
+
+        array = np.array(encoded, dtype=_DTYPES[kind])
+        return {
+            "kind": kind,
+            "values": self.block(array.tobytes()),
+            "states": self.block(bytes(states)) if any(states) else None
+        }
+
+
+def write_snapshot(path: str, tables: Dict[str, Dict[str, List[Any]]], meta: Dict[str, Any]):
+    """
+    Writes tables (name -> to_columns output) and JSON metadata to path.
+
+    The file is written next to path and moved into place, so a crash
+    never leaves a partial snapshot (and readers mapping the old file keep it).
+    """
+    writer = _Writer()
+    header: Dict[str, Any] = {"meta": meta, "tables": {}}
+    for name, columns in tables.items():
+        rows = len(next(iter(columns.values()), ()))
+        header["tables"][name] = {
+            "rows": rows,
+            "columns": {field: writer.column(values) for field, values in columns.items()}
+        }
+
+    encoded = [text.encode() for text in writer.strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(data) for data in encoded], dtype=np.int64)
+    header["strings"] = {
+        "blob": writer.block(b"".join(encoded)),
+        "offsets": writer.block(offsets.tobytes())
+    }
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    prefix = MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes
+    prefix += b"\0" * (-len(prefix) % _ALIGNMENT)
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(prefix)
+        for block in writer.blocks:
+            file.write(block)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+class TableImage:
+    """Read-only columns of one snapshot table (views over the mapped file)."""
+
+    def __init__(self, snapshot: "Snapshot", spec: Dict[str, Any]):
+        self._snapshot = snapshot
+        self._rows = spec["rows"]
+        self._columns: Dict[str, tuple] = {}
+        for field, column in spec["columns"].items():
+            kind = column["kind"]
+            values = snapshot.array(column["values"], _DTYPES[kind])
+            states = None
+            if column["states"] is not None:
+                states = snapshot.array(column["states"], np.uint8)
+            self._columns[field] = (kind, values, states)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def fields(self) -> List[str]:
+        """Column names, in the order records list their fields."""
+        return list(self._columns)
+
+    def _decode(self, kind: str, value: Any) -> Any:
+        """Turns one stored value into its Python value."""
+        if kind == "str":
+            return self._snapshot.string(int(value))
+        if kind == "json":
+            return json.loads(self._snapshot.string(int(value)))
+        return value.item()
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Decodes one row into a record dict."""
+        record = {}
+        for field, (kind, values, states) in self._columns.items():
+            state = STATE_VALUE if states is None else states[row]
+            if state == STATE_MISSING:
+                continue
+            if state == STATE_NONE:
+                record[field] = None
+            elif state == STATE_INT:
+                record[field] = int(values[row])
+            else:
+                record[field] = self._decode(kind, values[row])
+        return record
+
+    def values(self, field: str, default: Any = None) -> List[Any]:
+        """Decodes a whole column (default where the field is missing)."""
+        if field not in self._columns:
+            return [default] * self._rows
+        kind, values, states = self._columns[field]
+        if kind == "str":
+            decoded = self._snapshot.strings(values)
+        elif kind == "json":
+            decoded = [json.loads(text) for text in self._snapshot.strings(values)]
+        else:
+            decoded = values.tolist()
+
+        if states is not None:
+            for row in np.flatnonzero(states).tolist():
+                state = states[row]
+                if state == STATE_INT:
+                    decoded[row] = int(decoded[row])
+                else:
+                    decoded[row] = default if state == STATE_MISSING else None
+        return decoded
+
+    def numbers(self, field: str, default: float = 0) -> np.ndarray:
+        """Returns a numeric column as an array (default where missing or None)."""
+        if field not in self._columns:
+            return np.full(self._rows, default)
+        kind, values, states = self._columns[field]
+        if kind not in ("int64", "float64", "bool"):
+            values = np.array([default if v is None else v for v in self.values(field, default)])
+        elif states is not None:
+            values = np.where((states == STATE_VALUE) | (states == STATE_INT), values, default)
+        return values
+
+    def groups(self, field: str) -> Dict[Any, np.ndarray]:
+        """Returns value -> ids of the rows holding it (None: missing or None)."""
+        ids = self.numbers("id")
+        if field not in self._columns:
+            return {None: ids} if self._rows else {}
+        kind, values, states = self._columns[field]
+
+        found: Dict[Any, np.ndarray] = {}
+        if states is not None:
+            empty = (states == STATE_NONE) | (states == STATE_MISSING)
+            if empty.any():
+                found[None] = ids[empty]
+            values, ids = values[~empty], ids[~empty]
+
+        uniques, inverse = np.unique(values, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(uniques)))[:-1]
+        for value, members in zip(uniques, np.split(ids[order], bounds)):
+            found[self._decode(kind, value)] = members
+        return found
+
+
+class Snapshot:
+    """A snapshot file mapped into memory."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a database snapshot")
+        (header_size,) = struct.unpack_from("<Q", self._map, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(self._map[start:start + header_size])
+        self._data = start + header_size + (-(start + header_size) % _ALIGNMENT)
+
+        self.meta: Dict[str, Any] = header["meta"]
+        self._blob = header["strings"]["blob"][0] + self._data
+        self._offsets = self.array(header["strings"]["offsets"], np.int64)
+        self.tables: Dict[str, TableImage] = {
+            name: TableImage(self, spec) for name, spec in header["tables"].items()
+        }
+
+    def array(self, block: List[int], dtype: Any) -> np.ndarray:
+        """Returns a zero-copy view of a block."""
+        offset, length = block
+        return np.frombuffer(self._map, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=self._data + offset)
+
+    def string(self, position: int) -> str:
+        """Decodes one string of the string table."""
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return self._map[self._blob + start:self._blob + end].decode()
+
+    def strings(self, positions: np.ndarray) -> List[str]:
+        """Decodes many strings of the string table."""
+        data, blob = self._map, self._blob
+        starts = (self._offsets[positions] + blob).tolist()
+        ends = (self._offsets[positions + 1] + blob).tolist()
+        return [data[start:end].decode() for start, end in zip(starts, ends)]
+
+
+def read_snapshot(path: str) -> Snapshot:
+    """Maps a snapshot file written by write_snapshot."""
+    return Snapshot(path)
+
+
+class SnapshotTable(MutableMapping):
+    """
+    id -> record mapping over a snapshot table that decodes each record
+    the first time it is read. Writes work as on a dict and stay in memory.
+
+    Insertion order is the snapshot's row order, then new keys.
+    """
+
+    def __init__(self, image: TableImage):
+        self._image = image
+        # id -> row number until decoded, then id -> record
+        self._rows: Dict[int, Any] = dict(zip(image.numbers("id").tolist(), range(len(image))))
+        self._lock = Lock()
+
+    def __getitem__(self, key: int) -> Dict[str, Any]:
+        entry = self._rows[key]
+        if type(entry) is not int:
+            return entry
+        record = self._image.record(entry)
+        # Another reader (or a write) may have stored the record meanwhile
+        with self._lock:
+            entry = self._rows[key]
+            if type(entry) is int:
+                entry = self._rows[key] = record
+        return entry
+
+    def __setitem__(self, key: int, record: Dict[str, Any]):
+        with self._lock:
+            self._rows[key] = record
+
+    def __delitem__(self, key: int):
+        with self._lock:
+            del self._rows[key]
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._rows
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+
+    def frozen(self, keys: Iterable[int]) -> Iterator[Dict[str, Any]]:
+        """
+        Returns an iterator over the records of keys as they are now, even
+        if they are replaced meanwhile. Rows are decoded while iterating.
+        """
+        entries = [(key, self._rows[key]) for key in keys]
+        return (self._pinned(key, entry) for key, entry in entries)
+
+    def _pinned(self, key: int, entry: Any) -> Dict[str, Any]:
+        """Returns the record of a captured entry, storing it if the key still holds that row."""
+        if type(entry) is not int:
+            return entry
+        record = self._image.record(entry)
+        with self._lock:
+            if self._rows.get(key) == entry:
+                self._rows[key] = record
+        return record
@@ -0,0 +1,110 @@
+"""
+Sorted Index
+============
+Ordered (key, id) index used by the in-memory database for sorted listings.
+
+Entries are kept in a plain list sorted with bisect, so lookups are
+O(log n) and walking the first page of an ordering costs only the page size.
+Insert/remove shift the list in C (memmove), which stays cheap well into
+hundreds of thousands of entries.
+
+Iteration order:
+- ascending: key ascending, ties by id ascending
+- descending: key descending, ties by id ascending
+
+The descending tie order matches Python's stable sorted(..., reverse=True)
+over id-ordered input, so index walks return exactly what a full sort would.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+import math
+
+
+def comes_after(key: Any, item_id: int, position: Tuple[Any, int], descending: bool) -> bool:
+    """Checks whether (key, item_id) comes after a (key, id) position in index order."""
+    position_key, position_id = position
+    if key == position_key:
+        return item_id > position_id
+    return key < position_key if descending else key > position_key
+
+
+class SortedIndex:
+    """Ordered index of (key, id) entries."""
+
+    def __init__(self):
+        self._entries: List[Tuple[Any, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: Any, item_id: int):
+        """Inserts an entry."""
+        insort(self._entries, (key, item_id))
+
+    def update(self, entries: Iterable[Tuple[Any, int]]):
+        """Inserts many (key, id) entries with a single sort."""
+        self._entries.extend(entries)
+        self._entries.sort()
+
+    def entries(self) -> List[Tuple[Any, int]]:
+        """Returns a copy of all (key, id) entries in ascending order."""
+        return list(self._entries)
+
+    def remove(self, key: Any, item_id: int):
+        """Removes an entry. The key must be the one it was added with."""
+        entries = self._entries
+        index = bisect_left(entries, (key, item_id))
+        if index < len(entries) and entries[index] == (key, item_id):
+            del entries[index]
+
+    def clear(self):
+        """Removes all entries."""
+        self._entries.clear()
+
+    def _bounds(self, low: Any, high: Any) -> Tuple[int, int]:
+        """Returns the entry positions [start, end) of keys in [low, high]; None is unbounded."""
+        entries = self._entries
+        start = 0 if low is None else bisect_left(entries, (low,))
+        end = len(entries) if high is None else bisect_left(entries, (high, math.inf), start)
+        return start, max(start, end)
+
+    def count_between(self, low: Any = None, high: Any = None) -> int:
+        """Returns the number of entries whose key lies in [low, high] in O(log n)."""
+        start, end = self._bounds(low, high)
+        return end - start
+
+    def ids_between(self, low: Any = None, high: Any = None) -> List[int]:
+        """Returns ids whose key lies in [low, high], in key order. None is unbounded."""
+        start, end = self._bounds(low, high)
+        return [item_id for _, item_id in self._entries[start:end]]
+
+    def iter_ids(self, descending: bool = False, after: Optional[Tuple[Any, int]] = None) -> Iterator[int]:
+        """
+        Yields ids in index order.
+        
+        after: optional (key, id) position; iteration starts right after it
+        (keyset seek in O(log n)). The position does not need to exist.
+        """
+        entries = self._entries
+        if not descending:
+            start = 0 if after is None else bisect_right(entries, after)
+            for position in range(start, len(entries)):
+                yield entries[position][1]
+            return
+
+        end = len(entries)
+        if after is not None:
+            # Rest of the cursor's key group (same key, larger ids) comes first
+            key = after[0]
+            group_end = bisect_left(entries, (key, math.inf))
+            for position in range(bisect_right(entries, after), group_end):
+                yield entries[position][1]
+            end = bisect_left(entries, (key,))
+
+        # Walk groups of equal keys from the end, each group in id order
+        while end > 0:
+            start = bisect_left(entries, (entries[end - 1][0],), 0, end)
+            for position in range(start, end):
+                yield entries[position][1]
+            end = start
@@ -0,0 +1,186 @@
+"""
+Write-Ahead Log
+===============
+Append-only log of database writes, replayed on startup.
+
+Every mutating InMemoryDatabase method appends one record describing the
+write with its generated values (ids, timestamps) resolved, so replaying
+the log reproduces exactly the same rows. Records carry a log sequence
+number (LSN); snapshots store the LSN they include, so replay skips
+records a loaded snapshot already contains and compaction (snapshot, then
+truncate the log) is safe to interrupt at any point.
+
+Record framing (little endian):
+    length   uint32   payload size
+    crc32    uint32   checksum of the payload
+    payload  UTF-8 JSON {"lsn": ..., "op": ..., "args": [...]}
+
+A torn or corrupt record (crash mid-write) ends the log: it and anything
+after it are cut off when the log is read.
+
+Group Commit:
+Writers only encode their record and add it to an in-memory buffer (under
+the database lock, so log order is apply order). A flusher thread writes
+everything buffered with one write() and one fsync(), so writes that
+arrive while a sync is running share the next one.
+- sync_interval = 0: a write returns once its record is on disk
+  (WriteAheadLog.wait)
+- sync_interval > 0: writes return at once; the flusher syncs at most
+  once per interval, so a crash can lose the writes of the last interval
+
+If a write() or fsync() fails the flusher stops: what reached the disk is
+unknown, so no later record can be made durable. Waiting writers, and
+every check, wait or sync after that, raise LogWriteError. Writers call
+check() before applying a write, so a write is rejected before it changes
+memory; append itself never raises (a record buffered just as the flusher
+fails is reported by wait).
+"""
+
+from threading import Condition, Lock, Thread
+from typing import Any, Dict, List, Optional
+import json
+import os
+import struct
+import time
+import zlib
+
+
+_FRAME = struct.Struct("<II")
+
+
+def read_log(path: str) -> List[Dict[str, Any]]:
+    """Returns the records of a log file in order, cutting off a torn or corrupt tail."""
+    if not os.path.exists(path):
+        return []
+
+    with open(path, "r+b") as file:
+        data = file.read()
+        records = []
+        position = 0
+        while position + _FRAME.size <= len(data):
+            length, checksum = _FRAME.unpack_from(data, position)
+            start = position + _FRAME.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            records.append(json.loads(payload))
+            position = start + length
+
+        if position < len(data):
+            file.truncate(position)
+    return records
+
+
+class LogWriteError(OSError):
+    """Raised to writers once the flusher failed to write or sync the log."""
+
+
+class WriteAheadLog:
+    """Group-committed append-only log file."""
+
+    def __init__(self, path: str, sync_interval: float = 0.0):
+        self.path = path
+        self.sync_interval = sync_interval
+        self._file = open(path, "ab")
+        self._buffer: List[bytes] = []
+        self._appended = 0  # LSN of the last appended record
+        self._durable = 0   # LSN of the last record on disk
+        self._closed = False
+        self._error: Optional[BaseException] = None  # set when the flusher failed
+        self._lock = Lock()
+        self._pending = Condition(self._lock)  # flusher: records to write
+        self._synced = Condition(self._lock)   # writers: records on disk
+        self.records = 0
+        self.syncs = 0
+        self._flusher = Thread(target=self._flush_loop, name="wal-flusher", daemon=True)
+        self._flusher.start()
+
+    def append(self, lsn: int, op: str, args: List[Any]):
+        """Adds a record to the log (written by the flusher thread)."""
+        payload = json.dumps({"lsn": lsn, "op": op, "args": args}, separators=(",", ":")).encode()
+        frame = _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            self._buffer.append(frame)
+            self._appended = lsn
+            self.records += 1
+            self._pending.notify()
+
+    def check(self):
+        """Raises LogWriteError if the log can no longer make records durable."""
+        with self._lock:
+            self._check()
+
+    def wait(self, lsn: int):
+        """Blocks until the record with this LSN is on disk (no-op with a sync interval)."""
+        if self.sync_interval > 0:
+            return
+        with self._lock:
+            while self._durable < lsn and not self._closed:
+                self._check()
+                self._synced.wait()
+
+    def sync(self):
+        """Blocks until every appended record is on disk."""
+        with self._lock:
+            while self._durable < self._appended:
+                self._check()
+                self._pending.notify()
+                self._synced.wait()
+
+    def _check(self):
+        """Raises LogWriteError if the flusher has failed. Caller must hold the lock."""
+        if self._error is not None:
+            raise LogWriteError(f"Write-ahead log {self.path} failed: {self._error}") from self._error
+
+    def truncate(self):
+        """Empties the log file. Appends must be paused (see InMemoryDatabase.compact)."""
+        self.sync()
+        with self._lock:
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+
+    def size(self) -> int:
+        """Returns the log file size in bytes."""
+        return os.path.getsize(self.path)
+
+    def close(self):
+        """Writes out pending records and stops the flusher."""
+        with self._lock:
+            self._closed = True
+            self._pending.notify()
+        self._flusher.join()
+        try:
+            self._file.close()
+        except OSError:
+            # Buffered bytes a failed flusher left behind
+            if self._error is None:
+                raise
+
+    def _flush_loop(self):
+        """Writes and syncs buffered records in batches until closed."""
+        while True:
+            with self._lock:
+                while not self._buffer and not self._closed:
+                    self._pending.wait()
+                if not self._buffer:
+                    self._synced.notify_all()
+                    return
+                frames, self._buffer = self._buffer, []
+                lsn = self._appended
+
+            try:
+                self._file.write(b"".join(frames))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except BaseException as error:
+                with self._lock:
+                    self._error = error
+                    self._synced.notify_all()
+                return
+
+            with self._lock:
+                self._durable = lsn
+                self.syncs += 1
+                self._synced.notify_all()
+            if self.sync_interval > 0:
+                time.sleep(self.sync_interval)
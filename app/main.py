@@ -7,7 +7,7 @@ This file:
 - Creates the FastAPI application
 - Registers routers
 - Customizes Swagger UI
-- Loads seed data on startup
+- Loads seed data (or a database snapshot) on startup
 - Configures CORS settings
 
 Run:
@@ -31,7 +31,10 @@ from .config import (
     API_TITLE,
     API_DESCRIPTION,
     API_VERSION,
-    TAGS_METADATA
+    TAGS_METADATA,
+    SNAPSHOT_PATH,
+    WAL_PATH,
+    WAL_SYNC_INTERVAL_MS
 )
 from .routers import (
     products_router,
@@ -41,6 +44,7 @@ from .routers import (
 )
 from .database.seed_data import seed_database
 from .database import db
+from .services.response_cache import response_cache
 
 
 @asynccontextmanager
@@ -48,17 +52,31 @@ async def lifespan(app: FastAPI):
     """
     Application lifecycle manager.
     
-    Loads seed data on startup.
-    Cleanup operations can be performed on shutdown.
+    Loads the database snapshot (SNAPSHOT_PATH) on startup if there is one,
+    otherwise the seed data, then replays the write-ahead log (WAL_PATH).
+    Saves the snapshot again on shutdown.
     """
     # Startup
     print("🚀 Starting Mock Online Store API...")
-    seed_database()
+    if SNAPSHOT_PATH and os.path.exists(SNAPSHOT_PATH):
+        stats = db.load_snapshot(SNAPSHOT_PATH)
+        print(f"✅ Snapshot loaded: {stats}")
+    else:
+        seed_database()
+    if WAL_PATH:
+        replayed = db.open_wal(WAL_PATH, WAL_SYNC_INTERVAL_MS / 1000)
+        print(f"✅ Write-ahead log replayed: {replayed} writes")
+        if replayed and SNAPSHOT_PATH:
+            db.compact(SNAPSHOT_PATH)
     print("✅ Application ready!")
     
     yield
     
     # Shutdown
+    if SNAPSHOT_PATH:
+        db.compact(SNAPSHOT_PATH)
+        print(f"💾 Snapshot saved: {SNAPSHOT_PATH}")
+    db.close_wal()
     print("👋 Shutting down application...")
 
 
@@ -89,6 +107,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # Lets browser clients read it for If-None-Match
 )
 
 # Register routers
@@ -138,7 +157,10 @@ async def root():
     description="""
 ## Health Check
 
-Returns the API health status and database statistics.
+Returns the API health status, database statistics and response cache counters.
+`text_indexes_ready` is false while search indexes of a freshly loaded
+snapshot are still being built in the background; `wal` is null unless
+the write-ahead log is enabled (STORE_WAL_PATH).
 
 ### Response
 
@@ -151,16 +173,36 @@ Returns the API health status and database statistics.
         "total_users": 10,
         "total_sellers": 5,
         "total_categories": 5
+    },
+    "data_version": 118,
+    "text_indexes_ready": true,
+    "wal": {
+        "lsn": 42,
+        "bytes": 18304,
+        "records": 42,
+        "syncs": 17
+    },
+    "response_cache": {
+        "entries": 12,
+        "bytes": 48211,
+        "max_bytes": 16777216,
+        "hits": 340,
+        "misses": 27,
+        "evictions": 0
     }
 }
 ```
 """
 )
 async def health_check():
-    """Health check and database statistics"""
+    """Health check, database statistics and cache counters"""
     return {
         "status": "healthy",
-        "database": db.get_stats()
+        "database": db.get_stats(),
+        "data_version": db.data_version,
+        "text_indexes_ready": db.text_indexes_ready,
+        "wal": db.get_wal_stats(),
+        "response_cache": response_cache.get_stats()
     }
 
 
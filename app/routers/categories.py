@@ -6,8 +6,8 @@ API endpoints for product categories.
 This module contains all endpoints for category listing and details.
 
 Endpoints:
-- GET /categories - List all categories
-- GET /categories/{id} - Category detail
+- GET /categories - Category tree (top-level categories with nested subcategories)
+- GET /categories/{id} - Category detail with its subcategories
 
 MCP Conversion Notes:
 - Categories are the fundamental structure for product discovery
@@ -18,6 +18,7 @@ from typing import List
 from fastapi import APIRouter, HTTPException, status
 from ..database import db
 from ..schemas.category import Category, CategoryWithCount
+from ..services.response_cache import cached_response
 
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
@@ -30,7 +31,9 @@ router = APIRouter(prefix="/categories", tags=["Categories"])
     description="""
 ## List All Categories
 
-Returns all categories in the store with their product counts.
+Returns all categories in the store with their product counts, as a tree:
+the top-level categories, each with its subcategories nested under
+`subcategories` (at any depth).
 
 ### Returned Data
 
@@ -40,7 +43,10 @@ For each category:
 - description: Category description
 - icon: Category icon (emoji)
 - image_url: Cover image URL
-- product_count: Number of products in this category
+- parent_id: Parent category ID (null for top-level categories)
+- product_count: Number of products directly in this category
+- total_product_count: Products in this category and all its subcategories
+- subcategories: Child categories (same fields)
 
 ### Example Usage
 
@@ -57,18 +63,41 @@ GET /categories
         "name": "Electronics",
         "description": "Phones, computers, tablets...",
         "icon": "📱",
-        "product_count": 156
+        "parent_id": null,
+        "product_count": 156,
+        "total_product_count": 210,
+        "subcategories": [
+            {
+                "id": 6,
+                "name": "Smartphones",
+                "description": "iPhone, Samsung, Xiaomi and other smartphones",
+                "icon": "📱",
+                "parent_id": 1,
+                "product_count": 54,
+                "total_product_count": 54,
+                "subcategories": []
+            }
+        ]
     },
     {
         "id": 2,
         "name": "Fashion",
         "description": "Clothing, shoes, accessories...",
         "icon": "👔",
-        "product_count": 89
+        "parent_id": null,
+        "product_count": 89,
+        "total_product_count": 89,
+        "subcategories": []
     }
 ]
 ```
 
+### Performance
+
+The tree is precomputed and rebuilt only when categories change; product
+counts come from maintained per-category counters, so the cost depends on
+the number of categories, not on the catalog size.
+
 ### Use Cases
 
 - Homepage category menu
@@ -83,23 +112,12 @@ Used for queries like "What categories are there?", "List categories".
         200: {"description": "Category list"}
     }
 )
+@cached_response(List[CategoryWithCount], tables=("categories", "products"))
 async def list_categories():
     """
-    Returns all categories with their product counts.
+    Returns the category tree with product counts.
     """
-    categories = db.get_all_categories()
-    
-    # Add product count to each category
-    result = []
-    for cat in categories:
-        product_count = db.get_category_product_count(cat["id"])
-        result.append({
-            **cat,
-            "product_count": product_count,
-            "subcategories": []
-        })
-    
-    return result
+    return db.get_category_tree()
 
 
 @router.get(
@@ -114,8 +132,9 @@ Returns detailed information for a specific category.
 ### Returned Data
 
 - Basic category info
-- Total product count in this category
-- Subcategories (if any)
+- Product count in this category (`product_count`) and including
+  subcategories (`total_product_count`)
+- Subcategories (if any), nested with the same fields
 
 ### Example Usage
 
@@ -134,6 +153,7 @@ GET /categories/1
     "image_url": "https://example.com/categories/electronics.jpg",
     "parent_id": null,
     "product_count": 156,
+    "total_product_count": 156,
     "subcategories": []
 }
 ```
@@ -147,11 +167,12 @@ Used for queries like "info about Electronics category".
         404: {"description": "Category not found"}
     }
 )
+@cached_response(CategoryWithCount, tables=("categories", "products"))
 async def get_category(category_id: int):
     """
     Returns detailed information for a single category.
     """
-    category = db.get_category(category_id)
+    category = db.get_category_node(category_id)
     
     if category is None:
         raise HTTPException(
@@ -159,10 +180,4 @@ async def get_category(category_id: int):
             detail=f"Category with ID: {category_id} not found."
         )
     
-    product_count = db.get_category_product_count(category_id)
-    
-    return {
-        **category,
-        "product_count": product_count,
-        "subcategories": []
-    }
+    return category
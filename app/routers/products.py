@@ -8,9 +8,14 @@ This module contains all endpoints for product CRUD operations and listing.
 Endpoints:
 - GET /products - List all products (filtering, sorting, pagination)
 - GET /products/search - Search products
+- GET /products/facets - Filter sidebar counts
+- GET /products/autocomplete - Search box name completions
+- GET /products/export - Stream the whole catalog as NDJSON
+- GET/POST /products/batch - Many products by ID in one call
 - GET /products/{id} - Single product detail
 - GET /products/category/{category_id} - Products by category
 - POST /products - Add new product (API Key required)
+- POST /products/bulk - Import many products from NDJSON (API Key required)
 - PUT /products/{id} - Update product (API Key + ownership check)
 - DELETE /products/{id} - Delete product (API Key + ownership check)
 
@@ -20,10 +25,29 @@ MCP Conversion Notes:
 - Parameter descriptions and validations defined
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from ..config import BULK_IMPORT_CHUNK_SIZE, MAX_BATCH_IDS
 from ..database import db
-from ..schemas.product import Product, ProductCreate, ProductUpdate, ProductDetail, ProductSummary
+from ..database.memory_db import PRODUCT_SORT_KEYS, TABLES
+from ..schemas.product import (
+    Product,
+    ProductCreate,
+    ProductUpdate,
+    ProductDetail,
+    ProductSummary,
+    AutocompleteSuggestion,
+    ProductFacets,
+    ProductPage,
+    BulkImportResult,
+    ProductBatchRequest,
+    ProductBatch,
+    ProductSummaryBatch
+)
 from ..schemas.common import (
     PaginatedResponse, 
     ProductSortBy, 
@@ -33,77 +57,176 @@ from ..schemas.common import (
 )
 from ..auth.api_key import get_current_seller, verify_product_owner
 from ..services.recommendation import RecommendationService
+from ..services.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from ..services.response_cache import cached_response
+from ..services.json_fragments import (
+    product_batch_json,
+    product_lines,
+    product_page_json,
+    product_plan_page_json
+)
 
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
 
-def apply_filters(products: List[dict], **filters) -> List[dict]:
-    """Applies filters to products."""
-    result = products
-    
-    if filters.get("category_id"):
-        result = [p for p in result if p.get("category_id") == filters["category_id"]]
-    
-    if filters.get("min_price") is not None:
-        result = [p for p in result if p.get("final_price", 0) >= filters["min_price"]]
-    
-    if filters.get("max_price") is not None:
-        result = [p for p in result if p.get("final_price", 0) <= filters["max_price"]]
-    
-    if filters.get("min_rating") is not None:
-        result = [p for p in result if p.get("average_rating", 0) >= filters["min_rating"]]
-    
-    if filters.get("stock_status"):
-        result = [p for p in result if p.get("stock_status") == filters["stock_status"]]
-    
-    if filters.get("seller_id"):
-        result = [p for p in result if p.get("seller_id") == filters["seller_id"]]
-    
-    if filters.get("has_discount"):
-        result = [p for p in result if p.get("discount_percentage", 0) > 0]
-    
-    return result
+# Sort criteria -> product field with an ordered index in the database
+SORT_FIELDS = {
+    ProductSortBy.PRICE: "final_price",
+    ProductSortBy.RATING: "average_rating",
+    ProductSortBy.NAME: "name",
+    ProductSortBy.CREATED_AT: "created_at",
+    ProductSortBy.DISCOUNT: "discount_percentage",
+    ProductSortBy.REVIEW_COUNT: "review_count",
+}
 
 
-def apply_sorting(products: List[dict], sort_by: ProductSortBy, order: SortOrder) -> List[dict]:
-    """Sorts products."""
-    reverse = order == SortOrder.DESC
-    
-    key_map = {
-        ProductSortBy.PRICE: lambda p: p.get("final_price", 0),
-        ProductSortBy.RATING: lambda p: p.get("average_rating", 0),
-        ProductSortBy.NAME: lambda p: p.get("name", "").lower(),
-        ProductSortBy.CREATED_AT: lambda p: p.get("created_at", ""),
-        ProductSortBy.DISCOUNT: lambda p: p.get("discount_percentage", 0),
-        ProductSortBy.REVIEW_COUNT: lambda p: p.get("review_count", 0),
+def facet_counts(counts: dict) -> dict:
+    """Turns facet values into JSON keys (sorted, missing values dropped)."""
+    present = sorted((value, count) for value, count in counts.items() if value is not None)
+    return {
+        (str(value).lower() if isinstance(value, bool) else str(value)): count
+        for value, count in present
     }
-    
-    return sorted(products, key=key_map.get(sort_by, key_map[ProductSortBy.CREATED_AT]), reverse=reverse)
 
 
-def paginate(items: List, page: int, page_size: int) -> dict:
-    """Paginates the list."""
-    total = len(items)
+def has_active_filters(**filters) -> bool:
+    """Checks whether any of the filter values would filter anything out."""
+    return any(value is not None and value is not False for value in filters.values())
+
+
+# Sort fields whose index keys are strings (cursor keys are validated against this)
+TEXT_SORT_FIELDS = ("name", "created_at")
+
+
+def paginate(items: List, total: int, page: int, page_size: int) -> dict:
+    """Builds the paginated response for an already sliced page."""
     total_pages = (total + page_size - 1) // page_size if page_size > 0 else 1
     
-    start = (page - 1) * page_size
-    end = start + page_size
-    
     return {
-        "items": items[start:end],
+        "items": items,
         "total": total,
         "page": page,
         "page_size": page_size,
         "total_pages": total_pages,
         "has_next": page < total_pages,
-        "has_previous": page > 1
+        "has_previous": page > 1,
+        "next_cursor": None
+    }
+
+
+def product_summary(product: dict) -> dict:
+    """Builds the ProductSummary fields of a product."""
+    return {
+        "id": product.get("id"),
+        "name": product.get("name"),
+        "price": product.get("price"),
+        "final_price": product.get("final_price"),
+        "discount_percentage": product.get("discount_percentage", 0),
+        "average_rating": product.get("average_rating", 0),
+        "review_count": product.get("review_count", 0),
+        "stock_status": product.get("stock_status", "in_stock"),
+        "image": product.get("images", [None])[0] if product.get("images") else None
     }
 
 
+def product_batch(ids: List[int], summary: bool) -> Response:
+    """Fetches products by ID (one database read) and serializes a ProductBatch response."""
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_IDS} IDs per request."
+        )
+    
+    products = db.get_products_by_ids(ids)
+    found = {product["id"] for product in products}
+    missing = [product_id for product_id in ids if product_id not in found]
+    
+    if summary:
+        batch = ProductSummaryBatch(items=[product_summary(p) for p in products], missing=missing)
+        body = batch.model_dump_json().encode()
+    else:
+        body = product_batch_json(products, missing)
+    return Response(content=body, media_type="application/json")
+
+
+def validation_message(error: ValidationError) -> str:
+    """Formats a validation error as "field: message" parts joined with "; "."""
+    parts = []
+    for item in error.errors():
+        location = ".".join(str(part) for part in item["loc"])
+        parts.append(f"{location}: {item['msg']}" if location else item["msg"])
+    return "; ".join(parts)
+
+
+def sorted_page(
+    sort_by: ProductSortBy,
+    order: SortOrder,
+    page: int,
+    page_size: int,
+    product_ids: Optional[List[int]] = None,
+    cursor: Optional[str] = None,
+    filters: Optional[dict] = None
+) -> dict:
+    """
+    Returns one sorted page of products using the database's ordered indexes.
+    
+    product_ids restricts the listing to a subset (e.g. search matches); None means all products.
+    filters (the /products filter values) are planned and evaluated by db.query_products.
+    cursor (from a previous response's next_cursor) replaces page: the page
+    starts right after the item the cursor points to.
+    """
+    field = SORT_FIELDS.get(sort_by, "created_at")
+    descending = order == SortOrder.DESC
+    
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(
+                cursor, field, descending,
+                key_types=str if field in TEXT_SORT_FIELDS else (int, float)
+            )
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    
+    # One extra row tells whether another page follows
+    offset = 0 if after else (page - 1) * page_size
+    if filters:
+        items, total = db.query_products(
+            filters,
+            field,
+            descending=descending,
+            offset=offset,
+            limit=page_size + 1,
+            after=after,
+            product_ids=product_ids
+        )
+    else:
+        items, total = db.get_sorted_products(
+            field,
+            descending=descending,
+            offset=offset,
+            limit=page_size + 1,
+            product_ids=product_ids,
+            after=after
+        )
+    has_next = len(items) > page_size
+    items = items[:page_size]
+    
+    response = paginate(items, total, page, page_size)
+    response["has_next"] = has_next
+    if after is not None:
+        response["has_previous"] = True
+    if has_next:
+        last = items[-1]
+        response["next_cursor"] = encode_cursor(field, descending, PRODUCT_SORT_KEYS[field](last), last["id"])
+    return response
+
+
 @router.get(
     "",
-    response_model=PaginatedResponse[Product],
+    response_model=ProductPage,
     summary="List All Products",
     description="""
 ## List All Products
@@ -115,7 +238,7 @@ Supports filtering, sorting and pagination.
 
 | Parameter | Type | Description |
 |-----------|------|-------------|
-| category_id | int | Filter by category ID |
+| category_id | int | Filter by category ID (subcategories included) |
 | min_price | float | Minimum price (inclusive) |
 | max_price | float | Maximum price (inclusive) |
 | min_rating | float | Minimum average rating (0-5) |
@@ -133,11 +256,36 @@ Supports filtering, sorting and pagination.
 | created_at | By date added |
 | discount | By discount percentage |
 | review_count | By number of reviews |
+| relevance | Search relevance (search only; falls back to created_at here) |
+
+### Cursor Pagination
+
+Every response with a next page carries `next_cursor`. Passing it back as
+`cursor` (with the same `sort_by` and `order`) returns the page right after
+the last item seen; `page` is then ignored. Cursor pages cost the same at any
+depth, and items added or removed mid-scroll do not shift later pages.
+
+### Query Plan
+
+Filters are matched starting from the most selective index (category,
+seller, stock status or discount bitmaps, or the price / rating range of the
+sorted indexes); the remaining filters are only checked on those candidates.
+`explain=true` fills `explain` (null otherwise) with the plan:
+
+| Field | Description |
+|-------|-------------|
+| driver | Access path the match started from (`scan` = all products) |
+| estimates | Rows each candidate access path would produce |
+| residual | Filters checked on the driver's candidates |
+| candidates | Rows produced by the driver |
+| matched | Rows matching every filter |
 
 ### Example Usage
 
 ```
 GET /products?category_id=1&min_price=100&max_price=1000&sort_by=rating&order=desc&page=1&page_size=20
+GET /products?sort_by=price&order=asc&cursor=WyJmaW5hbF9wcmljZSIsImFzYyIsMjQ5Ljk5LDRd
+GET /products?seller_id=2&min_rating=4&explain=true
 ```
 
 ### MCP Integration
@@ -167,17 +315,20 @@ Returned data is in Product schema format.
                         "page_size": 10,
                         "total_pages": 15,
                         "has_next": True,
-                        "has_previous": False
+                        "has_previous": False,
+                        "next_cursor": "WyJjcmVhdGVkX2F0IiwiZGVzYyIsIjIwMjQtMDEtMTVUMTA6MzA6MDAiLDE1XQ",
+                        "explain": None
                     }
                 }
             }
         }
     }
 )
+@cached_response(ProductPage, tables=("products",), serialize=product_plan_page_json)
 async def list_products(
     category_id: Optional[int] = Query(
         default=None, 
-        description="Filter by category ID. Example: 1 (Electronics)",
+        description="Filter by category ID, subcategories included. Example: 1 (Electronics)",
         ge=1
     ),
     min_price: Optional[float] = Query(
@@ -227,16 +378,20 @@ async def list_products(
         ge=1, 
         le=100, 
         description="Items per page (max: 100)"
+    ),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="next_cursor from the previous page (replaces page)"
+    ),
+    explain: bool = Query(
+        default=False,
+        description="If true, adds the filter query plan as `explain` (debugging)"
     )
 ):
     """
     Lists all products with filtering, sorting and pagination.
     """
-    products = db.get_all_products()
-    
-    # Apply filters
-    products = apply_filters(
-        products,
+    filters = dict(
         category_id=category_id,
         min_price=min_price,
         max_price=max_price,
@@ -246,16 +401,19 @@ async def list_products(
         has_discount=has_discount
     )
     
-    # Apply sorting
-    products = apply_sorting(products, sort_by, order)
+    # Filter in the database (unfiltered listings walk the sort index directly)
+    active = filters if has_active_filters(**filters) else None
     
-    # Apply pagination
-    return paginate(products, page, page_size)
+    # Apply sorting and pagination
+    response = sorted_page(sort_by, order, page, page_size, cursor=cursor, filters=active)
+    if explain:
+        response["explain"] = db.explain_products(filters)
+    return response
 
 
 @router.get(
     "/search",
-    response_model=PaginatedResponse[Product],
+    response_model=ProductPage,
     summary="Search Products",
     description="""
 ## Search Products
@@ -265,14 +423,24 @@ Search is case-insensitive.
 
 ### Search Algorithm
 
-1. Searches in product name
-2. Searches in product description
-3. Returns all matching products
+1. The query is split into words
+2. Every word must match the beginning of a word in the product name or description
+   (e.g. "head" matches "headphones")
+3. Matches are scored with BM25; words in the name count more than the description
+4. Use `sort_by=relevance` to get the best matches first
+
+Cursor pagination (`cursor` = previous `next_cursor`) works for every sort
+except `relevance`, which only supports `page`.
+
+Filters are planned like `/products`, with the search matches as one more
+candidate access path; `explain=true` adds the plan as `explain`.
 
 ### Example Usage
 
 ```
 GET /products/search?q=iphone&min_price=500&sort_by=rating
+GET /products/search?q=noise cancelling headphones&sort_by=relevance
+GET /products/search?q=phone&category_id=1&explain=true
 ```
 
 ### MCP Integration
@@ -285,6 +453,7 @@ User commands like "search for iPhone" can be routed to this endpoint.
         400: {"description": "Search term required"}
     }
 )
+@cached_response(ProductPage, tables=("products",), serialize=product_plan_page_json)
 async def search_products(
     q: str = Query(
         ..., 
@@ -314,26 +483,347 @@ async def search_products(
         description="Sort direction"
     ),
     page: int = Query(default=1, ge=1),
-    page_size: int = Query(default=10, ge=1, le=100)
+    page_size: int = Query(default=10, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="next_cursor from the previous page (replaces page; not for relevance)"
+    ),
+    explain: bool = Query(
+        default=False,
+        description="If true, adds the filter query plan as `explain` (debugging)"
+    )
 ):
     """
     Searches in product name and description.
     """
-    # Perform search
+    # Perform search (results come ranked by relevance)
     products = db.search_products(q)
+    product_ids = [p["id"] for p in products]
     
-    # Additional filters
-    products = apply_filters(
-        products,
-        category_id=category_id,
-        min_price=min_price,
-        max_price=max_price
-    )
+    filters = dict(category_id=category_id, min_price=min_price, max_price=max_price)
+    active = filters if has_active_filters(**filters) else None
     
-    # Sorting
-    products = apply_sorting(products, sort_by, order)
+    # Relevance order is the search order itself
+    if sort_by == ProductSortBy.RELEVANCE:
+        if cursor is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is not available for sort_by=relevance; use page."
+            )
+        if active:
+            matches = db.filter_product_ids(active, product_ids)
+            products = [p for p in products if p["id"] in matches]
+        if order == SortOrder.ASC:
+            products.reverse()
+        start = (page - 1) * page_size
+        response = paginate(products[start:start + page_size], len(products), page, page_size)
+    else:
+        # Sorting and pagination
+        response = sorted_page(sort_by, order, page, page_size, product_ids, cursor, active)
     
-    return paginate(products, page, page_size)
+    if explain:
+        response["explain"] = db.explain_products(filters, product_ids)
+    return response
+
+
+@router.get(
+    "/facets",
+    response_model=ProductFacets,
+    summary="Product Facet Counts",
+    description="""
+## Product Facet Counts
+
+Returns how many products match the given filters, and for each filter
+field how many products every value would give.
+
+Takes the same filters as `GET /products`. Each facet ignores its own
+filter, so with `category_id=1` the `category_id` facet still lists the
+other categories (under the remaining filters).
+
+### Example Usage
+
+```
+GET /products/facets?category_id=1&stock_status=in_stock&has_discount=true
+```
+
+### Example Response
+
+```json
+{
+    "total": 3,
+    "category_id": {"1": 3, "2": 2},
+    "seller_id": {"1": 3},
+    "stock_status": {"in_stock": 3, "low_stock": 1},
+    "has_discount": {"true": 3, "false": 2}
+}
+```
+
+### MCP Integration
+
+Useful for questions like "how many discounted electronics are in stock?".
+""",
+    responses={
+        200: {"description": "Facet counts"}
+    }
+)
+@cached_response(ProductFacets, tables=("products",))
+async def product_facets(
+    category_id: Optional[int] = Query(default=None, description="Filter by category ID", ge=1),
+    min_price: Optional[float] = Query(default=None, description="Minimum price (inclusive)", ge=0),
+    max_price: Optional[float] = Query(default=None, description="Maximum price (inclusive)", ge=0),
+    min_rating: Optional[float] = Query(default=None, description="Minimum average rating", ge=0, le=5),
+    stock_status: Optional[StockStatus] = Query(default=None, description="Stock status filter"),
+    seller_id: Optional[int] = Query(default=None, description="Filter by seller ID", ge=1),
+    has_discount: Optional[bool] = Query(default=None, description="If true, counts only discounted products")
+):
+    """
+    Returns filter match counts per value, from the bitmap indexes.
+    """
+    total, facets = db.get_facets(dict(
+        category_id=category_id,
+        min_price=min_price,
+        max_price=max_price,
+        min_rating=min_rating,
+        stock_status=stock_status.value if stock_status else None,
+        seller_id=seller_id,
+        has_discount=has_discount
+    ))
+    return {"total": total, **{field: facet_counts(counts) for field, counts in facets.items()}}
+
+
+@router.get(
+    "/autocomplete",
+    response_model=List[AutocompleteSuggestion],
+    summary="Autocomplete Product Names",
+    description="""
+## Autocomplete
+
+Returns name completions for the text typed so far in the search box.
+
+### Matching
+
+- Case-insensitive prefix match on any word of a product or category name
+  ("pro" suggests "MacBook Pro 14\" M3 Pro")
+- Matching categories are listed first, then products ranked by review count
+- At least 2 characters must be typed
+
+### Example Usage
+
+```
+GET /products/autocomplete?q=sam&limit=5
+```
+
+### Example Response
+
+```json
+[
+    {"text": "Samsung Galaxy S24 Ultra 512GB", "type": "product", "id": 2, "review_count": 3, "product_count": null}
+]
+```
+""",
+    responses={
+        200: {"description": "Suggestions (may be empty)"}
+    }
+)
+async def autocomplete_products(
+    q: str = Query(
+        ...,
+        min_length=2,
+        max_length=100,
+        description="Text typed so far"
+    ),
+    limit: int = Query(default=10, ge=1, le=20, description="Maximum number of suggestions")
+):
+    """
+    Returns product and category name completions for a prefix.
+    """
+    return db.autocomplete(q, limit)
+
+
+@router.get(
+    "/export",
+    summary="Export Catalog (NDJSON)",
+    description="""
+## Export Catalog
+
+Streams every product as **NDJSON** (`application/x-ndjson`): one
+`Product` JSON object per line, in ID order.
+
+Use this instead of paging through `GET /products` to copy the whole
+catalog (feeds, search engines, warehouses): it is a single request and
+the response is written as it is produced.
+
+### Filters
+
+| Parameter | Description |
+|-----------|-------------|
+| category_id | Only products of this category (subcategories included) |
+| seller_id | Only products of this seller |
+
+### Consistency
+
+The export is a consistent view of the catalog at the moment the request
+starts: products created, updated or deleted while it streams don't
+appear in (or change) it.
+
+### Example Usage
+
+```
+GET /products/export?seller_id=1
+```
+
+### Example Response
+
+```
+{"name":"Apple iPhone 15 Pro 256GB","description":"...","category_id":1,"price":1199.99,...,"id":1,"seller_id":1}
+{"name":"Samsung Galaxy S24 Ultra","description":"...","category_id":1,"price":1099.99,...,"id":2,"seller_id":1}
+```
+""",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Products, one JSON object per line",
+            "content": {"application/x-ndjson": {}}
+        }
+    }
+)
+async def export_products(
+    category_id: Optional[int] = Query(default=None, description="Filter by category ID", ge=1),
+    seller_id: Optional[int] = Query(default=None, description="Filter by seller ID", ge=1)
+):
+    """
+    Streams products as NDJSON from a consistent view of the catalog.
+    """
+    products = db.export_products(category_id=category_id, seller_id=seller_id)
+    return StreamingResponse(product_lines(products), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/batch",
+    response_model=ProductBatch,
+    summary="Get Products by IDs",
+    description="""
+## Get Products by IDs
+
+Returns many products in one call, e.g. for a cart, wishlist or
+comparison page. All IDs are looked up in a single database read.
+
+### Parameters
+
+| Parameter | Description |
+|-----------|-------------|
+| ids | Comma-separated product IDs (at least 1, at most 200) |
+| summary | Return short product info instead of full records |
+
+For long ID lists use `POST /products/batch`.
+
+### Example Usage
+
+```
+GET /products/batch?ids=1,2,999&summary=true
+```
+
+### Summary Mode
+
+With `summary=true` each item is a short `ProductSummary` (id, name,
+prices, rating, stock status, main image) instead of the full record.
+
+### Response
+
+`items` holds the found products in request order (duplicate IDs are
+returned once); `missing` lists the requested IDs that don't exist.
+Reviews, rating distribution and similar products are not included
+(use `GET /products/{id}` for those).
+
+```json
+{
+    "items": [{"id": 1, "name": "Apple iPhone 15 Pro 256GB", ...}],
+    "missing": [999]
+}
+```
+""",
+    responses={
+        200: {"description": "Found products and missing IDs"},
+        400: {"description": "Invalid ID list or too many IDs"},
+        422: {"description": "No IDs given"}
+    }
+)
+async def get_products_batch(
+    ids: str = Query(description="Comma-separated product IDs, e.g. 1,2,3"),
+    summary: bool = Query(default=False, description="Return ProductSummary items")
+):
+    """
+    Returns the products with the given IDs and the IDs that don't exist.
+    """
+    try:
+        product_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be comma-separated integers."
+        )
+    # Same contract as POST (ProductBatchRequest.ids has min_length=1)
+    if not product_ids:
+        raise RequestValidationError([{
+            "type": "too_short",
+            "loc": ("query", "ids"),
+            "msg": "List should have at least 1 item after validation, not 0",
+            "input": ids,
+            "ctx": {"field_type": "List", "min_length": 1, "actual_length": 0}
+        }])
+    return product_batch(product_ids, summary)
+
+
+@router.post(
+    "/batch",
+    response_model=ProductBatch,
+    summary="Get Products by IDs (POST)",
+    description="""
+## Get Products by IDs (POST)
+
+Same as `GET /products/batch`, with the IDs sent in the request body
+(for lists too long for a URL).
+
+### Example Request
+
+```json
+{
+    "ids": [1, 2, 3, 999]
+}
+```
+
+### Summary Mode
+
+With `summary=true` each item is a short `ProductSummary` (id, name,
+prices, rating, stock status, main image) instead of the full record.
+
+### Response
+
+`items` holds the found products in request order (duplicate IDs are
+returned once); `missing` lists the requested IDs that don't exist.
+Reviews, rating distribution and similar products are not included
+(use `GET /products/{id}` for those).
+
+```json
+{
+    "items": [{"id": 1, "name": "Apple iPhone 15 Pro 256GB", ...}],
+    "missing": [999]
+}
+```
+""",
+    responses={
+        200: {"description": "Found products and missing IDs"},
+        400: {"description": "Too many IDs"}
+    }
+)
+async def post_products_batch(
+    request: ProductBatchRequest,
+    summary: bool = Query(default=False, description="Return ProductSummary items")
+):
+    """
+    Returns the products with the given IDs and the IDs that don't exist.
+    """
+    return product_batch(request.ids, summary)
 
 
 @router.get(
@@ -343,7 +833,8 @@ async def search_products(
     description="""
 ## List Products by Category
 
-Returns all products in a specific category.
+Returns all products in a specific category, including the products of
+all its subcategories (at any depth).
 Supports sorting and pagination.
 
 ### Category IDs (Example)
@@ -361,18 +852,27 @@ Supports sorting and pagination.
 ```
 GET /products/category/1?sort_by=price&order=asc
 ```
+
+Pass a response's `next_cursor` back as `cursor` to fetch the following page.
 """,
     responses={
         200: {"description": "Category products"},
         404: {"description": "Category not found"}
     }
 )
+@cached_response(
+    PaginatedResponse[Product], tables=("products", "categories"), serialize=product_page_json
+)
 async def get_products_by_category(
     category_id: int,
     sort_by: ProductSortBy = Query(default=ProductSortBy.RATING),
     order: SortOrder = Query(default=SortOrder.DESC),
     page: int = Query(default=1, ge=1),
-    page_size: int = Query(default=10, ge=1, le=100)
+    page_size: int = Query(default=10, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="next_cursor from the previous page (replaces page)"
+    )
 ):
     """
     Lists products in a specific category.
@@ -385,10 +885,8 @@ async def get_products_by_category(
             detail=f"Category with ID: {category_id} not found."
         )
     
-    products = db.get_products_by_category(category_id)
-    products = apply_sorting(products, sort_by, order)
-    
-    return paginate(products, page, page_size)
+    # The category filter includes subcategories (see db.query_products)
+    return sorted_page(sort_by, order, page, page_size, cursor=cursor, filters={"category_id": category_id})
 
 
 @router.get(
@@ -409,6 +907,13 @@ Returns all details of a specific product.
 - 5 similar product recommendations
 - Rating distribution statistics
 
+### Caching
+
+The assembled detail is kept per product and rebuilt only after a write
+to something it shows: the product, its reviews, its seller or category,
+a review author, or its similar products (including changes in its
+category that can change which products are similar).
+
 ### Example Usage
 
 ```
@@ -425,10 +930,18 @@ Suitable for queries like "give me info about iPhone 15".
         404: {"description": "Product not found"}
     }
 )
+# The endpoint returns the serialized body (materialized per product)
+@cached_response(ProductDetail, tables=TABLES, store=False, serialize=bytes)
 async def get_product(product_id: int):
     """
     Returns all details of a single product along with reviews and similar products.
     """
+    body = db.get_product_detail(product_id)
+    if body is not None:
+        return body
+    
+    # Read the version before building (see db.put_product_detail)
+    version = db.data_version
     product = db.get_product(product_id)
     
     if product is None:
@@ -441,44 +954,23 @@ async def get_product(product_id: int):
     seller = db.get_seller(product.get("seller_id"))
     category = db.get_category(product.get("category_id"))
     
-    # Get reviews and add user names
+    # Get last 5 reviews and add user names
     reviews = db.get_reviews_by_product(product_id)
-    for review in reviews:
-        user = db.get_user(review.get("user_id"))
-        review["user_name"] = user.get("name", "Anonymous") if user else "Anonymous"
-    
-    # Get last 5 reviews
-    recent_reviews = sorted(
+    recent_reviews = db.join_user_names(sorted(
         reviews, 
         key=lambda r: r.get("created_at", ""), 
         reverse=True
-    )[:5]
+    )[:5])
     
-    # Calculate rating distribution
-    rating_distribution = {"5": 0, "4": 0, "3": 0, "2": 0, "1": 0}
-    for review in reviews:
-        rating = str(review.get("rating", 0))
-        if rating in rating_distribution:
-            rating_distribution[rating] += 1
+    # Rating distribution from the maintained aggregate
+    rating_distribution = db.get_rating_stats(product_id)["distribution"]
     
     # Get similar products
     similar_products = RecommendationService.get_similar_products(product_id, limit=5)
-    similar_summaries = []
-    for p in similar_products:
-        similar_summaries.append({
-            "id": p.get("id"),
-            "name": p.get("name"),
-            "price": p.get("price"),
-            "final_price": p.get("final_price"),
-            "discount_percentage": p.get("discount_percentage", 0),
-            "average_rating": p.get("average_rating", 0),
-            "review_count": p.get("review_count", 0),
-            "stock_status": p.get("stock_status", "in_stock"),
-            "image": p.get("images", [None])[0] if p.get("images") else None
-        })
+    similar_summaries = [product_summary(p) for p in similar_products]
     
     # Build detailed response
-    return {
+    detail = {
         **product,
         "seller_name": seller.get("name", "Unknown") if seller else "Unknown",
         "category_name": category.get("name", "Unknown") if category else "Unknown",
@@ -486,6 +978,9 @@ async def get_product(product_id: int):
         "similar_products": similar_summaries,
         "rating_distribution": rating_distribution
     }
+    body = ProductDetail.model_validate(detail).model_dump_json().encode()
+    db.put_product_detail(product_id, version, [p["id"] for p in similar_products], body)
+    return body
 
 
 @router.post(
@@ -566,15 +1061,131 @@ async def create_product(
         )
     
     # Prepare product data
-    product_data = product.model_dump()
+    product_data = product.model_dump(mode="json")
     product_data["seller_id"] = seller["id"]
     
-    # Create product
-    created_product = db.create_product(product_data)
+    # Create product (in the threadpool: a write may wait for the WAL fsync)
+    created_product = await run_in_threadpool(db.create_product, product_data)
     
     return created_product
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkImportResult,
+    summary="Bulk Import Products",
+    description="""
+## Bulk Import Products
+
+Adds many products in one request. The body is **NDJSON**
+(`application/x-ndjson`): one product object per line, in the same
+format as `POST /products`.
+
+### Authentication
+
+This endpoint **requires API Key** (`X-API-Key` header), checked once
+for the whole import. Every product is created for the calling seller.
+
+### Processing
+
+- The body is read as a stream and validated line by line
+- Valid rows are inserted in chunks of 1000, each chunk under a single
+  database write (indexes are updated once per chunk)
+- Invalid rows (bad JSON, failed validation, unknown category) are
+  skipped and reported; they don't stop the import
+- Blank lines are ignored
+
+### Example Request Body
+
+```
+{"name": "USB-C Cable 1m", "description": "Braided cable", "category_id": 1, "price": 9.99, "stock_quantity": 500}
+{"name": "USB-C Cable 2m", "description": "Braided cable", "category_id": 1, "price": 12.99, "stock_quantity": 300}
+```
+
+### Response
+
+`results` has one entry per non-blank line, in order: the new product's
+`id`, or the `error` that rejected the line.
+
+```json
+{
+    "created": 2,
+    "failed": 0,
+    "results": [
+        {"line": 1, "id": 51, "error": null},
+        {"line": 2, "id": 52, "error": null}
+    ]
+}
+```
+""",
+    responses={
+        200: {"description": "Import finished (see per-line results)"},
+        401: {"description": "API key required"},
+        403: {"description": "Invalid API key"}
+    }
+)
+async def bulk_import_products(
+    request: Request,
+    seller: dict = Depends(get_current_seller)
+):
+    """
+    Imports products from an NDJSON body. Requires API Key for seller authentication.
+    """
+    results: List[dict] = []
+    pending: List[dict] = []  # results of valid rows waiting for insert
+    pending_data: List[dict] = []
+    known_categories: Dict[int, bool] = {}
+    
+    async def insert_pending():
+        created = await run_in_threadpool(db.create_products, pending_data)
+        for result, product in zip(pending, created):
+            result["id"] = product["id"]
+        pending.clear()
+        pending_data.clear()
+    
+    def import_line(number: int, line: bytes):
+        if not line.strip():
+            return
+        result = {"line": number, "id": None, "error": None}
+        results.append(result)
+        try:
+            product = ProductCreate.model_validate_json(line)
+        except ValidationError as error:
+            result["error"] = validation_message(error)
+            return
+        
+        # Category check (once per category)
+        category_id = product.category_id
+        if category_id not in known_categories:
+            known_categories[category_id] = db.get_category(category_id) is not None
+        if not known_categories[category_id]:
+            result["error"] = f"Category with ID: {category_id} not found."
+            return
+        
+        product_data = product.model_dump(mode="json")
+        product_data["seller_id"] = seller["id"]
+        pending.append(result)
+        pending_data.append(product_data)
+    
+    number = 0
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            import_line(number, line)
+            if len(pending) >= BULK_IMPORT_CHUNK_SIZE:
+                await insert_pending()
+    if buffer:
+        import_line(number + 1, buffer)
+    if pending:
+        await insert_pending()
+    
+    failed = sum(1 for result in results if result["error"] is not None)
+    return {"created": len(results) - failed, "failed": failed, "results": results}
+
+
 @router.put(
     "/{product_id}",
     response_model=Product,
@@ -621,7 +1232,7 @@ async def update_product(
     Updates an existing product. Only the product owner can update.
     """
     # Update data
-    update_data = product_update.model_dump(exclude_unset=True)
+    update_data = product_update.model_dump(mode="json", exclude_unset=True)
     
     if not update_data:
         raise HTTPException(
@@ -638,7 +1249,7 @@ async def update_product(
                 detail=f"Category with ID: {update_data['category_id']} not found."
             )
     
-    updated_product = db.update_product(product_id, update_data)
+    updated_product = await run_in_threadpool(db.update_product, product_id, update_data)
     
     return updated_product
 
@@ -682,7 +1293,7 @@ async def delete_product(
     """
     Deletes a product. Only the product owner can delete.
     """
-    db.delete_product(product_id)
+    await run_in_threadpool(db.delete_product, product_id)
     
     return MessageResponse(
         message=f"Product with ID: {product_id} deleted successfully.",
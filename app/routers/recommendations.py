@@ -23,6 +23,8 @@ from fastapi import APIRouter, HTTPException, Query, status
 from ..database import db
 from ..schemas.product import Product
 from ..services.recommendation import RecommendationService
+from ..services.response_cache import cached_response
+from ..services.json_fragments import product_list_json
 
 
 router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
@@ -79,6 +81,7 @@ Can be used for commands like "show similar products" or "list iPhone alternativ
         404: {"description": "Product not found"}
     }
 )
+@cached_response(List[Product], tables=("products",), serialize=product_list_json)
 async def get_similar_products(
     product_id: int,
     limit: int = Query(
@@ -130,7 +133,7 @@ High ratings from products with few reviews may not be reliable.
 
 | Parameter | Type | Default | Description |
 |-----------|------|---------|-------------|
-| category_id | int | - | Optional category filter |
+| category_id | int | - | Optional category filter (subcategories included) |
 | min_reviews | int | 3 | Minimum number of reviews |
 | limit | int | 10 | Number of products to return |
 
@@ -160,6 +163,7 @@ Used for queries like "What are the best products?", "Highest rated phones".
         200: {"description": "Top rated products"}
     }
 )
+@cached_response(List[Product], tables=("products",), serialize=product_list_json)
 async def get_top_rated(
     category_id: Optional[int] = Query(
         default=None,
@@ -200,7 +204,7 @@ Returns products with the highest discount percentage.
 
 | Parameter | Type | Default | Description |
 |-----------|------|---------|-------------|
-| category_id | int | - | Optional category filter |
+| category_id | int | - | Optional category filter (subcategories included) |
 | min_discount | float | 5.0 | Minimum discount percentage |
 | limit | int | 10 | Number of products to return |
 
@@ -238,6 +242,7 @@ Used for queries like "show discounted products", "phones with biggest discounts
         200: {"description": "Discounted products list"}
     }
 )
+@cached_response(List[Product], tables=("products",), serialize=product_list_json)
 async def get_deals(
     category_id: Optional[int] = Query(
         default=None,
@@ -284,7 +289,7 @@ Products with many reviews have received more attention.
 
 | Parameter | Type | Default | Description |
 |-----------|------|---------|-------------|
-| category_id | int | - | Optional category filter |
+| category_id | int | - | Optional category filter (subcategories included) |
 | limit | int | 10 | Number of products to return |
 
 ### Sorting
@@ -312,6 +317,7 @@ Used for queries like "most popular products", "trending phones".
         200: {"description": "Popular products list"}
     }
 )
+@cached_response(List[Product], tables=("products",), serialize=product_list_json)
 async def get_popular(
     category_id: Optional[int] = Query(
         default=None,
@@ -351,7 +357,7 @@ Newest products shown first.
 
 | Parameter | Type | Default | Description |
 |-----------|------|---------|-------------|
-| category_id | int | - | Optional category filter |
+| category_id | int | - | Optional category filter (subcategories included) |
 | limit | int | 10 | Number of products to return |
 
 ### Example Usage
@@ -375,6 +381,7 @@ Used for queries like "newly added products", "latest phones".
         200: {"description": "New products list"}
     }
 )
+@cached_response(List[Product], tables=("products",), serialize=product_list_json)
 async def get_new_arrivals(
     category_id: Optional[int] = Query(
         default=None,
@@ -412,7 +419,7 @@ Useful for budget-based product recommendations.
 |-----------|------|---------|-------------|
 | min_price | float | **required** | Minimum price (inclusive) |
 | max_price | float | **required** | Maximum price (inclusive) |
-| category_id | int | - | Optional category filter |
+| category_id | int | - | Optional category filter (subcategories included) |
 | limit | int | 10 | Number of products to return |
 
 ### Sorting
@@ -442,6 +449,7 @@ Suitable for queries like "recommend phone under $1000", "headphones between $10
         400: {"description": "Invalid price range"}
     }
 )
+@cached_response(List[Product], tables=("products",), serialize=product_list_json)
 async def get_by_price_range(
     min_price: float = Query(
         ...,
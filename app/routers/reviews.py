@@ -18,44 +18,80 @@ MCP Conversion Notes:
 """
 
 from typing import List, Optional
+import heapq
 from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
 from ..database import db
+from ..database.sorted_index import comes_after
 from ..schemas.review import Review, ReviewCreate, ReviewStats
 from ..schemas.common import PaginatedResponse, ReviewSortBy, SortOrder
+from ..services.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from ..services.response_cache import cached_response
 
 
 router = APIRouter(tags=["Reviews"])
 
 
-def apply_review_sorting(reviews: List[dict], sort_by: ReviewSortBy, order: SortOrder) -> List[dict]:
-    """Sorts reviews."""
-    reverse = order == SortOrder.DESC
-    
-    key_map = {
-        ReviewSortBy.DATE: lambda r: r.get("created_at", ""),
-        ReviewSortBy.RATING: lambda r: r.get("rating", 0),
-        ReviewSortBy.HELPFUL: lambda r: r.get("helpful_count", 0),
-    }
-    
-    return sorted(reviews, key=key_map.get(sort_by, key_map[ReviewSortBy.DATE]), reverse=reverse)
+# Sort criteria -> review sort key
+REVIEW_SORT_KEYS = {
+    ReviewSortBy.DATE: lambda r: r.get("created_at", ""),
+    ReviewSortBy.RATING: lambda r: r.get("rating", 0),
+    ReviewSortBy.HELPFUL: lambda r: r.get("helpful_count", 0),
+}
 
 
-def paginate_reviews(items: List, page: int, page_size: int) -> dict:
-    """Paginates reviews."""
-    total = len(items)
+def review_page(
+    reviews: List[dict],
+    sort_by: ReviewSortBy,
+    order: SortOrder,
+    page: int,
+    page_size: int,
+    cursor: Optional[str] = None
+) -> dict:
+    """
+    Selects one sorted page of reviews.
+    
+    reviews must be in id order (as the database returns them); ties keep
+    that order. Only the requested page is selected (heap, O(n log k)),
+    not the whole list sorted. cursor replaces page when given.
+    """
+    key = REVIEW_SORT_KEYS.get(sort_by, REVIEW_SORT_KEYS[ReviewSortBy.DATE])
+    descending = order == SortOrder.DESC
+    total = len(reviews)
     total_pages = (total + page_size - 1) // page_size if page_size > 0 else 1
     
-    start = (page - 1) * page_size
-    end = start + page_size
+    if cursor is not None:
+        try:
+            after = decode_cursor(
+                cursor, sort_by.value, descending,
+                key_types=str if sort_by == ReviewSortBy.DATE else int
+            )
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        reviews = [r for r in reviews if comes_after(key(r), r["id"], after, descending)]
+        start = 0
+    else:
+        start = (page - 1) * page_size
+    
+    # One extra row tells whether another page follows
+    select = heapq.nlargest if descending else heapq.nsmallest
+    items = select(start + page_size + 1, reviews, key=key)[start:]
+    has_next = len(items) > page_size
+    items = items[:page_size]
+    
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor(sort_by.value, descending, key(items[-1]), items[-1]["id"])
     
     return {
-        "items": items[start:end],
+        "items": items,
         "total": total,
         "page": page,
         "page_size": page_size,
         "total_pages": total_pages,
-        "has_next": page < total_pages,
-        "has_previous": page > 1
+        "has_next": has_next,
+        "has_previous": cursor is not None or page > 1,
+        "next_cursor": next_cursor
     }
 
 
@@ -87,8 +123,15 @@ Returns all reviews of a specific product in paginated form.
 ```
 GET /products/1/reviews?sort_by=helpful&order=desc&page=1
 GET /products/1/reviews?rating=5  # Only 5-star reviews
+GET /products/1/reviews?cursor=<next_cursor>  # Page after the previous response
 ```
 
+### Cursor Pagination
+
+Pass a response's `next_cursor` back as `cursor` (with the same `sort_by` and
+`order`) to get the following page; `page` is then ignored. Reviews added
+mid-scroll do not shift the pages that follow.
+
 ### Response Content
 
 Each review includes:
@@ -109,6 +152,7 @@ Suitable for commands like "show reviews for this product".
         404: {"description": "Product not found"}
     }
 )
+@cached_response(PaginatedResponse[Review], tables=("reviews", "users", "products"))
 async def get_product_reviews(
     product_id: int,
     rating: Optional[int] = Query(
@@ -126,7 +170,11 @@ async def get_product_reviews(
         description="Sort direction. DESC: Newest first / Highest first"
     ),
     page: int = Query(default=1, ge=1, description="Page number"),
-    page_size: int = Query(default=10, ge=1, le=50, description="Reviews per page (max: 50)")
+    page_size: int = Query(default=10, ge=1, le=50, description="Reviews per page (max: 50)"),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="next_cursor from the previous page (replaces page)"
+    )
 ):
     """
     Lists, sorts and paginates product reviews.
@@ -142,20 +190,17 @@ async def get_product_reviews(
     # Get reviews
     reviews = db.get_reviews_by_product(product_id)
     
-    # Add user names
-    for review in reviews:
-        user = db.get_user(review.get("user_id"))
-        review["user_name"] = user.get("name", "Anonymous") if user else "Anonymous"
-    
     # Filter by rating
     if rating is not None:
         reviews = [r for r in reviews if r.get("rating") == rating]
     
-    # Sort
-    reviews = apply_review_sorting(reviews, sort_by, order)
+    # Sort and paginate
+    response = review_page(reviews, sort_by, order, page, page_size, cursor)
     
-    # Paginate
-    return paginate_reviews(reviews, page, page_size)
+    # Add user names (page items only)
+    response["items"] = db.join_user_names(response["items"])
+    
+    return response
 
 
 @router.post(
@@ -241,13 +286,12 @@ async def create_review(
     review_data = review.model_dump()
     review_data["product_id"] = product_id
     
-    # Create review (this automatically updates product rating)
-    created_review = db.create_review(review_data)
+    # Create review (this automatically updates product rating). In the
+    # threadpool: a write may wait for the WAL fsync
+    created_review = await run_in_threadpool(db.create_review, review_data)
     
     # Add user name
-    created_review["user_name"] = user.get("name", "Anonymous")
-    
-    return created_review
+    return {**created_review, "user_name": user.get("name", "Anonymous")}
 
 
 @router.get(
@@ -315,45 +359,27 @@ async def get_review_stats(product_id: int):
             detail=f"Product with ID: {product_id} not found."
         )
     
-    # Get reviews
-    reviews = db.get_reviews_by_product(product_id)
-    
-    # Calculate statistics
-    total_reviews = len(reviews)
+    # Read the maintained rating aggregate
+    stats = db.get_rating_stats(product_id)
+    total_reviews = stats["count"]
     
     if total_reviews == 0:
         return ReviewStats(
             product_id=product_id,
             total_reviews=0,
             average_rating=0.0,
-            rating_distribution={"5": 0, "4": 0, "3": 0, "2": 0, "1": 0},
+            rating_distribution=stats["distribution"],
             recommendation_percentage=0.0
         )
     
-    # Rating distribution
-    rating_distribution = {"5": 0, "4": 0, "3": 0, "2": 0, "1": 0}
-    total_rating = 0
-    positive_reviews = 0
-    
-    for review in reviews:
-        rating = review.get("rating", 0)
-        total_rating += rating
-        
-        rating_str = str(rating)
-        if rating_str in rating_distribution:
-            rating_distribution[rating_str] += 1
-        
-        if rating >= 4:
-            positive_reviews += 1
-    
-    average_rating = round(total_rating / total_reviews, 2)
-    recommendation_percentage = round((positive_reviews / total_reviews) * 100, 1)
+    average_rating = round(stats["sum"] / total_reviews, 2)
+    recommendation_percentage = round((stats["positive"] / total_reviews) * 100, 1)
     
     return ReviewStats(
         product_id=product_id,
         total_reviews=total_reviews,
         average_rating=average_rating,
-        rating_distribution=rating_distribution,
+        rating_distribution=stats["distribution"],
         recommendation_percentage=recommendation_percentage
     )
 
@@ -396,7 +422,7 @@ async def mark_review_helpful(review_id: int):
     """
     Increments the review's helpful counter.
     """
-    success = db.increment_helpful(review_id)
+    success = await run_in_threadpool(db.increment_helpful, review_id)
     
     if not success:
         raise HTTPException(
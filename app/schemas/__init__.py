@@ -1,5 +1,5 @@
 # Schemas modülü
-from .product import Product, ProductCreate, ProductUpdate, ProductDetail
+from .product import Product, ProductCreate, ProductUpdate, ProductDetail, ProductSummary, AutocompleteSuggestion, ProductFacets, ProductPage, BulkImportResult, ProductBatch
 from .review import Review, ReviewCreate, ReviewStats
 from .user import User, Seller
 from .category import Category, CategoryWithCount
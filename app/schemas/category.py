@@ -90,15 +90,22 @@ class CategoryWithCount(Category):
     Used in category listings.
     
     Attributes:
-        product_count: Total number of products in this category
+        product_count: Number of products directly in this category
+        total_product_count: Products in this category and all its subcategories
         subcategories: List of subcategories (if any)
     """
     product_count: int = Field(
         default=0, 
         ge=0, 
-        description="Total number of products in this category",
+        description="Number of products directly in this category",
         json_schema_extra={"example": 156}
     )
+    total_product_count: int = Field(
+        default=0,
+        ge=0,
+        description="Number of products in this category and all its subcategories",
+        json_schema_extra={"example": 210}
+    )
     subcategories: List["CategoryWithCount"] = Field(
         default_factory=list, 
         description="Subcategories (for hierarchical structure)"
@@ -115,6 +122,7 @@ class CategoryWithCount(Category):
                 "image_url": "https://example.com/categories/electronics.jpg",
                 "parent_id": None,
                 "product_count": 156,
+                "total_product_count": 156,
                 "subcategories": []
             }
         }
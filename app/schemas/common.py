@@ -44,6 +44,8 @@ class ProductSortBy(str, Enum):
     - created_at: Sort by date added
     - discount: Sort by discount percentage
     - review_count: Sort by number of reviews
+    - relevance: Sort by search relevance (BM25). Only meaningful for
+      /products/search; other listings fall back to created_at.
     """
     PRICE = "price"
     RATING = "rating"
@@ -51,6 +53,7 @@ class ProductSortBy(str, Enum):
     CREATED_AT = "created_at"
     DISCOUNT = "discount"
     REVIEW_COUNT = "review_count"
+    RELEVANCE = "relevance"
 
 
 class ReviewSortBy(str, Enum):
@@ -126,6 +129,7 @@ class PaginatedResponse(BaseModel, Generic[T]):
         total_pages: Total number of pages
         has_next: Is there a next page?
         has_previous: Is there a previous page?
+        next_cursor: Opaque cursor for the next page (null on the last page)
     
     Example:
         {
@@ -135,7 +139,8 @@ class PaginatedResponse(BaseModel, Generic[T]):
             "page_size": 10,
             "total_pages": 15,
             "has_next": true,
-            "has_previous": true
+            "has_previous": true,
+            "next_cursor": "WyJmaW5hbF9wcmljZSIsImFzYyIsMjQ5Ljk5LDRd"
         }
     """
     items: List[T] = Field(description="List of items on the current page")
@@ -145,6 +150,10 @@ class PaginatedResponse(BaseModel, Generic[T]):
     total_pages: int = Field(description="Total number of pages")
     has_next: bool = Field(description="Is there a next page?")
     has_previous: bool = Field(description="Is there a previous page?")
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to fetch the next page (null on the last page)"
+    )
     
     class Config:
         json_schema_extra = {
@@ -155,7 +164,8 @@ class PaginatedResponse(BaseModel, Generic[T]):
                 "page_size": 10,
                 "total_pages": 15,
                 "has_next": True,
-                "has_previous": True
+                "has_previous": True,
+                "next_cursor": "WyJmaW5hbF9wcmljZSIsImFzYyIsMjQ5Ljk5LDRd"
             }
         }
 
@@ -9,12 +9,16 @@ This module defines all schemas required for product CRUD operations:
 - ProductUpdate: Product update
 - Product: Full product data
 - ProductDetail: Detailed product including reviews and recommendations
+- AutocompleteSuggestion: Search box name completion
+- ProductPage: Filtered product page with optional query plan (QueryPlan)
+- BulkImportResult: Outcome of an NDJSON bulk import
+- ProductBatch / ProductSummaryBatch: Products fetched by ID list
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
-from .common import StockStatus
+from .common import PaginatedResponse, StockStatus
 
 
 class ProductBase(BaseModel):
@@ -322,6 +326,166 @@ class ProductSummary(BaseModel):
         from_attributes = True
 
 
+class AutocompleteSuggestion(BaseModel):
+    """
+    Autocomplete Suggestion Schema
+    
+    A single name completion returned while the user types in the search box.
+    Category suggestions carry product_count, product suggestions review_count.
+    """
+    text: str = Field(description="Suggested product or category name")
+    type: Literal["category", "product"] = Field(description="What the suggestion refers to")
+    id: int = Field(description="Product or category ID")
+    review_count: Optional[int] = Field(default=None, description="Number of reviews (products only)")
+    product_count: Optional[int] = Field(default=None, description="Number of products (categories only)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "text": "Apple iPhone 15 Pro 256GB",
+                "type": "product",
+                "id": 1,
+                "review_count": 3,
+                "product_count": None
+            }
+        }
+
+
+class ProductFacets(BaseModel):
+    """
+    Product Facets Schema
+    
+    Match count and per-value product counts for the filter sidebar.
+    Each facet's counts apply every active filter except its own, so the
+    other options of a filtered field stay visible with their counts.
+    """
+    total: int = Field(description="Number of products matching all filters")
+    category_id: Dict[str, int] = Field(description="Category ID -> product count")
+    seller_id: Dict[str, int] = Field(description="Seller ID -> product count")
+    stock_status: Dict[str, int] = Field(description="Stock status -> product count")
+    has_discount: Dict[str, int] = Field(description='"true"/"false" -> product count')
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "total": 6,
+                "category_id": {"1": 6, "2": 4, "3": 5},
+                "seller_id": {"1": 6},
+                "stock_status": {"in_stock": 5, "low_stock": 1},
+                "has_discount": {"true": 4, "false": 2}
+            }
+        }
+
+
+class QueryPlan(BaseModel):
+    """
+    Query Plan Schema
+    
+    How the product filters were matched (explain=true): the access path
+    the match started from and the filters checked on its candidates.
+    """
+    driver: str = Field(description="Access path the match started from (scan = all products)")
+    estimates: Dict[str, int] = Field(description="Access path -> rows it would produce")
+    candidates: int = Field(description="Rows produced by the driver")
+    residual: List[str] = Field(description="Filters checked on the driver's candidates")
+    matched: int = Field(description="Rows matching every filter")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "driver": "seller_id",
+                "estimates": {"seller_id": 5, "rating_range": 23, "scan": 26},
+                "candidates": 5,
+                "residual": ["min_rating"],
+                "matched": 5
+            }
+        }
+
+
+class ProductPage(PaginatedResponse[Product]):
+    """
+    Product Page Schema
+    
+    Paginated products of the filtering endpoints (/products,
+    /products/search). explain is only present with explain=true.
+    """
+    explain: Optional[QueryPlan] = Field(
+        default=None,
+        description="Filter query plan (explain=true only)"
+    )
+
+
+class BulkImportRow(BaseModel):
+    """
+    Bulk Import Row Schema
+    
+    Outcome of one line of a bulk import: the new product's ID, or why
+    the line was rejected.
+    """
+    line: int = Field(description="Line number in the request body (1-based)")
+    id: Optional[int] = Field(default=None, description="ID of the created product")
+    error: Optional[str] = Field(default=None, description="Validation error (row not imported)")
+
+
+class BulkImportResult(BaseModel):
+    """
+    Bulk Import Result Schema
+    
+    Summary and per-line results of an NDJSON bulk import.
+    Blank lines are skipped and get no result.
+    """
+    created: int = Field(description="Number of products created")
+    failed: int = Field(description="Number of rejected lines")
+    results: List[BulkImportRow] = Field(description="One result per non-blank line, in order")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "created": 2,
+                "failed": 1,
+                "results": [
+                    {"line": 1, "id": 51, "error": None},
+                    {"line": 2, "id": None, "error": "price: Input should be greater than 0"},
+                    {"line": 3, "id": 52, "error": None}
+                ]
+            }
+        }
+
+
+class ProductBatchRequest(BaseModel):
+    """
+    Product Batch Request Schema
+    
+    IDs of the products to fetch in one call (POST /products/batch).
+    """
+    ids: List[int] = Field(
+        min_length=1,
+        description="Product IDs (duplicates are returned once)",
+        json_schema_extra={"example": [1, 2, 3]}
+    )
+
+
+class ProductBatch(BaseModel):
+    """
+    Product Batch Schema
+    
+    Products fetched by ID list, in request order, plus the IDs that
+    don't exist.
+    """
+    items: List[Product] = Field(description="Found products, in request order")
+    missing: List[int] = Field(description="Requested IDs with no product")
+
+
+class ProductSummaryBatch(BaseModel):
+    """
+    Product Summary Batch Schema
+    
+    Same as ProductBatch with short product info (summary=true).
+    """
+    items: List[ProductSummary] = Field(description="Found products, in request order")
+    missing: List[int] = Field(description="Requested IDs with no product")
+
+
 class ProductDetail(Product):
     """
     Product Detail Schema
@@ -0,0 +1,73 @@
+"""
+Product JSON Fragments
+======================
+Pre-serialized product JSON for list responses.
+
+Validating and serializing every product through the response model is the
+largest share of a product list request. A product only changes when it is
+written, so its serialized JSON (the Product schema) is cached per record
+in the database (db.get_product_fragment) and rebuilt only after a write
+bumps the product's version.
+
+List responses are then assembled by joining cached fragments; only the
+small pagination envelope is encoded per request. The output is byte for
+byte what PaginatedResponse[Product] / ProductPage / List[Product] would
+produce.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List
+import json
+from ..database import db
+from ..schemas.product import Product
+
+
+def product_json(product: Dict[str, Any]) -> bytes:
+    """Returns the product serialized with the Product schema (cached per version)."""
+    product_id = product["id"]
+    # Read the version first: a write that lands meanwhile leaves the
+    # fragment under the old version, so it is never served
+    version = db.get_product_version(product_id)
+    fragment = db.get_product_fragment(product_id, version)
+    if fragment is None:
+        fragment = Product.model_validate(product).model_dump_json().encode()
+        # Records are replaced on write: an older copy of the product
+        # must not be cached under the current version
+        if db.get_product(product_id) is product:
+            db.put_product_fragment(product_id, version, fragment)
+    return fragment
+
+
+def product_list_json(products: Iterable[Dict[str, Any]]) -> bytes:
+    """Serializes a product list (List[Product]) from cached fragments."""
+    return b"[" + b",".join(product_json(p) for p in products) + b"]"
+
+
+def product_lines(products: Iterable[Dict[str, Any]], batch_size: int = 256) -> Iterator[bytes]:
+    """Serializes products as NDJSON (one Product per line), yielding batches of lines."""
+    batch = []
+    for product in products:
+        batch.append(product_json(product))
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+def product_batch_json(products: Iterable[Dict[str, Any]], missing: List[int]) -> bytes:
+    """Serializes a multi-get response (ProductBatch) from cached fragments."""
+    tail = json.dumps(missing, separators=(",", ":")).encode()
+    return b'{"items":' + product_list_json(products) + b',"missing":' + tail + b"}"
+
+
+def product_page_json(page: Dict[str, Any]) -> bytes:
+    """Serializes a paginated product response (PaginatedResponse[Product])."""
+    envelope = {name: value for name, value in page.items() if name != "items"}
+    # Envelope fields follow items in PaginatedResponse field order
+    tail = json.dumps(envelope, separators=(",", ":"), ensure_ascii=False).encode()
+    return b'{"items":' + product_list_json(page["items"]) + b"," + tail[1:]
+
+
+def product_plan_page_json(page: Dict[str, Any]) -> bytes:
+    """Serializes a ProductPage: explain is always present (null unless requested)."""
+    return product_page_json({**page, "explain": page.get("explain")})
@@ -0,0 +1,76 @@
+"""
+Cursor Pagination
+=================
+Opaque cursors for keyset pagination.
+
+A cursor remembers the sort key and id of the last item a client has seen,
+plus the sort it belongs to. The next page starts right after that position
+instead of at an offset, so:
+- every page costs O(page_size) when an ordered index is available
+- items inserted or deleted mid-scroll do not shift later pages
+
+Ordering (must match the database's sort indexes):
+- ascending: key ascending, ties by id ascending
+- descending: key descending, ties by id ascending
+
+Cursor format: URL-safe base64 of a compact JSON array
+[sort, order, key, id]. Clients must treat it as opaque.
+"""
+
+import base64
+import json
+import math
+from typing import Any, Tuple, Type, Union
+
+
+# Ids and numeric keys are compared against int64/float64 index columns
+MAX_CURSOR_ID = 2 ** 63 - 1
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed or belongs to another sort."""
+
+
+def encode_cursor(sort: str, descending: bool, key: Any, item_id: int) -> str:
+    """Builds the cursor pointing right after (key, item_id)."""
+    payload = json.dumps([sort, "desc" if descending else "asc", key, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str,
+    sort: str,
+    descending: bool,
+    key_types: Union[Type, Tuple[Type, ...]] = (int, float, str)
+) -> Tuple[Any, int]:
+    """
+    Returns the (key, id) position stored in a cursor.
+    
+    key_types: accepted type(s) for the sort key, so a tampered cursor
+    cannot smuggle in a value that does not compare with the index keys.
+    Numeric keys must also be finite and within float range, and the id
+    within int64 range (e.g. 10**400 or NaN would not compare with a column).
+
+    Raises:
+        InvalidCursorError: Malformed cursor or sort/order mismatch
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, order, key, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Invalid cursor.") from exc
+
+    if cursor_sort != sort or order != ("desc" if descending else "asc"):
+        raise InvalidCursorError("Cursor does not match the requested sort_by/order.")
+    if not isinstance(item_id, int) or not isinstance(key, key_types):
+        raise InvalidCursorError("Invalid cursor.")
+    if abs(item_id) > MAX_CURSOR_ID:
+        raise InvalidCursorError("Invalid cursor.")
+    if isinstance(key, (int, float)):
+        try:
+            finite = math.isfinite(key)
+        except OverflowError:
+            finite = False
+        if not finite:
+            raise InvalidCursorError("Invalid cursor.")
+    return key, item_id
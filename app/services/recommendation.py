@@ -13,18 +13,38 @@ Algorithms:
 2. Price-based: Products within ±30% price range
 3. Rating-based: Products with 4+ rating prioritized
 4. Popularity-based: Sorted by review count
+
+Performance:
+Results are never produced by fully sorting the catalog. Rankings that match
+a maintained database sort index (rating, discount, review count, date) are
+read from it like a leaderboard; the rest use bounded heap selection
+(heapq.nlargest), O(n log k) for k results.
+
+Similar products are served from a neighbor table: the top
+NEIGHBOR_TABLE_SIZE similar product ids per product, stamped with the
+category version they were computed at. A lookup costs O(limit); a list is
+recomputed only after its category changed (a product was added, removed,
+moved, repriced or re-rated there). The lists live in the database
+(get/put_similar_neighbors), so deleting a product or clearing the data
+drops them.
 """
 
 from typing import List, Dict, Any, Optional
+import heapq
 from ..database import db
 
 
+# Neighbors kept per product (the largest `limit` the API accepts)
+NEIGHBOR_TABLE_SIZE = 20
+
+
 class RecommendationService:
     """
     Product Recommendation Service
     
     Service class that provides product recommendations based on different criteria.
-    All methods are static and stateless.
+    All methods are static and keep no state: similar-product neighbor lists
+    are stored by the database, which drops them with their product.
     
     Usage:
         similar = RecommendationService.get_similar_products(product_id=1, limit=5)
@@ -47,11 +67,11 @@ class RecommendationService:
         3. High rating (sorting criterion)
         
         Algorithm:
-        - Filter products in the same category
-        - Remove itself and (optionally) same seller's products
-        - Score based on price similarity
-        - Sort by average rating
-        - Return first N products
+        - Read the product's neighbor list if its category has not changed
+          since the list was computed
+        - Otherwise rank the category (rank_similar_products) and store the
+          top NEIGHBOR_TABLE_SIZE ids
+        - Return the first N neighbors
         
         Args:
             product_id: Reference product ID
@@ -72,6 +92,35 @@ class RecommendationService:
         if product is None:
             return []
         
+        if limit > NEIGHBOR_TABLE_SIZE:
+            return RecommendationService.rank_similar_products(product, limit, include_same_seller)
+        
+        # Read the version before ranking: a write that lands mid-ranking
+        # leaves the entry stale, so it is recomputed on the next call
+        version = db.get_category_version(product.get("category_id"))
+        neighbor_ids = db.get_similar_neighbors(product_id, include_same_seller, version)
+        if neighbor_ids is None:
+            neighbors = RecommendationService.rank_similar_products(
+                product, NEIGHBOR_TABLE_SIZE, include_same_seller
+            )
+            neighbor_ids = [p["id"] for p in neighbors]
+            db.put_similar_neighbors(product_id, include_same_seller, version, neighbor_ids)
+        
+        return db.get_products_by_ids(neighbor_ids[:limit])
+    
+    @staticmethod
+    def rank_similar_products(
+        product: Dict[str, Any],
+        limit: int,
+        include_same_seller: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranks the product's category by similarity (no neighbor table).
+        
+        Score = average rating + price similarity (0-2, full bonus at the
+        same price, none at ±100%). Ties keep id order.
+        """
+        product_id = product["id"]
         category_id = product.get("category_id")
         product_price = product.get("final_price", product.get("price", 0))
         seller_id = product.get("seller_id")
@@ -101,11 +150,8 @@ class RecommendationService:
             # Total score = rating + price similarity
             return rating + price_score
         
-        # Score and sort
-        scored = [(p, calculate_score(p)) for p in candidates]
-        scored.sort(key=lambda x: x[1], reverse=True)
-        
-        return [p for p, _ in scored[:limit]]
+        # Select the best `limit` by score (stable, like a full sort)
+        return heapq.nlargest(limit, candidates, key=calculate_score)
     
     @staticmethod
     def get_top_rated(
@@ -120,10 +166,10 @@ class RecommendationService:
         Provides reliable results with minimum review count filter.
         
         Algorithm:
-        - Filter products meeting minimum review count
+        - Walk the average rating index from the top
         - (Optional) Filter by category
-        - Sort by average rating descending
-        - Return first N products
+        - Keep products meeting minimum review count
+        - Stop after N products
         
         Args:
             category_id: Optional category filter
@@ -137,19 +183,12 @@ class RecommendationService:
             min_reviews parameter is used to filter out
             misleading high ratings from products with few reviews.
         """
-        # Get all products or filter by category
-        if category_id:
-            products = db.get_products_by_category(category_id)
-        else:
-            products = db.get_all_products()
-        
-        # Minimum review count filter
-        products = [p for p in products if p.get("review_count", 0) >= min_reviews]
-        
-        # Sort by rating
-        products.sort(key=lambda p: p.get("average_rating", 0), reverse=True)
-        
-        return products[:limit]
+        return db.get_top_products(
+            "average_rating",
+            limit,
+            category_id=category_id or None,
+            predicate=lambda p: p.get("review_count", 0) >= min_reviews
+        )
     
     @staticmethod
     def get_best_deals(
@@ -163,10 +202,9 @@ class RecommendationService:
         Returns products with the highest discount percentage.
         
         Algorithm:
-        - Filter products meeting minimum discount percentage
+        - Walk the discount index from the top
         - (Optional) Filter by category
-        - Sort by discount percentage descending
-        - Return first N products
+        - Stop after N products or below the minimum discount percentage
         
         Args:
             category_id: Optional category filter
@@ -182,22 +220,13 @@ class RecommendationService:
                 {"id": 7, "name": "...", "discount_percentage": 20, ...}
             ]
         """
-        # Get all products or filter by category
-        if category_id:
-            products = db.get_products_by_category(category_id)
-        else:
-            products = db.get_all_products()
-        
-        # Minimum discount filter
-        products = [
-            p for p in products 
-            if p.get("discount_percentage", 0) >= min_discount
-        ]
-        
-        # Sort by discount percentage
-        products.sort(key=lambda p: p.get("discount_percentage", 0), reverse=True)
-        
-        return products[:limit]
+        return db.get_top_products(
+            "discount_percentage",
+            limit,
+            category_id=category_id or None,
+            predicate=lambda p: p.get("discount_percentage", 0) >= min_discount,
+            stop_below=min_discount
+        )
     
     @staticmethod
     def get_popular_products(
@@ -216,15 +245,8 @@ class RecommendationService:
         Returns:
             List[Dict]: Popular products (sorted by review count)
         """
-        if category_id:
-            products = db.get_products_by_category(category_id)
-        else:
-            products = db.get_all_products()
-        
-        # Sort by review count
-        products.sort(key=lambda p: p.get("review_count", 0), reverse=True)
-        
-        return products[:limit]
+        # Read from the review count index
+        return db.get_top_products("review_count", limit, category_id=category_id or None)
     
     @staticmethod
     def get_price_range_products(
@@ -247,21 +269,15 @@ class RecommendationService:
         Returns:
             List[Dict]: Products in price range (sorted by rating)
         """
-        if category_id:
-            products = db.get_products_by_category(category_id)
-        else:
-            products = db.get_all_products()
-        
-        # Price filter (use final_price)
-        products = [
-            p for p in products
-            if min_price <= p.get("final_price", p.get("price", 0)) <= max_price
-        ]
-        
-        # Sort by rating
-        products.sort(key=lambda p: p.get("average_rating", 0), reverse=True)
-        
-        return products[:limit]
+        # Price filter (use final_price) via the price index
+        products = db.get_products_in_range(
+            "final_price", min_price, max_price, category_id=category_id or None
+        )
+        
+        # Best rated first; ties keep id order like a stable sort would
+        return heapq.nlargest(
+            limit, products, key=lambda p: (p.get("average_rating", 0), -p["id"])
+        )
     
     @staticmethod
     def get_new_arrivals(
@@ -280,12 +296,5 @@ class RecommendationService:
         Returns:
             List[Dict]: New products (sorted by date added)
         """
-        if category_id:
-            products = db.get_products_by_category(category_id)
-        else:
-            products = db.get_all_products()
-        
-        # Sort by date (newest first)
-        products.sort(key=lambda p: p.get("created_at", ""), reverse=True)
-        
-        return products[:limit]
+        # Read from the creation date index (newest first)
+        return db.get_top_products("created_at", limit, category_id=category_id or None)
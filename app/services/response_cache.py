@@ -0,0 +1,205 @@
+"""
+Response Cache
+==============
+Version-stamped LRU cache and conditional GETs (ETag) for read endpoints.
+
+Read endpoints are decorated with @cached_response, naming the database
+tables their output depends on:
+
+    @router.get("", response_model=List[Product])
+    @cached_response(List[Product], tables=("products",))
+    async def list_things(...):
+        ...
+
+Cache Key:
+- route: the endpoint function, by module and qualified name (routers may
+  reuse function names)
+- params: the endpoint's validated arguments (so "?page=1" and no page
+  parameter share an entry, and enum values are normalized)
+
+Each entry is stamped with the versions of its tables at build time
+(db.get_versions). A lookup whose stamp no longer matches is a miss and the
+entry is rebuilt, so entries are invalidated exactly when a write touches
+one of their tables, and only then.
+
+Entries hold the final JSON bytes, so a hit skips filtering, sorting and
+serialization. The cache is bounded by total body size (least recently
+used entries are evicted first).
+
+Conditional GETs:
+- Every response carries a strong ETag derived from the cache key and the
+  version stamp (plus a per-process token, since versions restart with
+  the process), and "Cache-Control: no-cache" so clients revalidate
+- A request whose If-None-Match lists the current ETag gets 304 Not
+  Modified before the endpoint runs: no filtering, sorting or serialization
+- store=False keeps the ETag handling but does not store bodies
+"""
+
+from collections import OrderedDict
+from enum import Enum
+from functools import wraps
+from hashlib import blake2b
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+import inspect
+import secrets
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+from ..config import RESPONSE_CACHE_MAX_BYTES
+from ..database import db
+
+
+# Distinguishes ETags of this process from those of an earlier run
+_PROCESS_TOKEN = secrets.token_hex(8)
+
+# Name of the Request parameter added to decorated endpoints
+_REQUEST_PARAM = "_conditional_request"
+
+
+class ResponseCache:
+    """LRU map of cache key -> (version stamp, JSON body) with a byte budget."""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[int, ...], bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+
+    def get(self, key: Hashable, stamp: Tuple[int, ...]) -> Optional[bytes]:
+        """Returns the cached body if it was built at these versions."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, stamp: Tuple[int, ...], body: bytes):
+        """Stores a body, evicting least recently used entries over budget."""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._entries[key] = (stamp, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Removes all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Returns entry count, size and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "not_modified": self.not_modified
+            }
+
+
+# Shared cache for all decorated endpoints
+response_cache = ResponseCache()
+
+
+def _normalize(value: Any) -> Hashable:
+    """Turns an endpoint argument into a hashable cache key part."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_normalize(item) for item in value)
+    return value
+
+
+def make_etag(key: Hashable, stamp: Tuple[int, ...]) -> str:
+    """Returns the strong ETag of the response built for key at stamp."""
+    digest = blake2b(repr((_PROCESS_TOKEN, key, stamp)).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Checks whether an If-None-Match header lists the ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cached_response(
+    response_type: Any,
+    tables: Sequence[str],
+    store: bool = True,
+    serialize: Optional[Callable[[Any], bytes]] = None
+) -> Callable:
+    """
+    Caches a GET endpoint's serialized response and answers conditional GETs.
+
+    response_type: the route's response_model (used to serialize the result)
+    tables: database tables the response is derived from (see db.get_versions)
+    store: keep bodies in the response cache (False: ETag/304 only)
+    serialize: builds the JSON body instead of response_type validation
+        (must produce the same output, e.g. services.json_fragments)
+
+    Exceptions (404, 400, ...) are raised as usual and not cached.
+    """
+    if serialize is None:
+        adapter = TypeAdapter(response_type)
+        serialize = lambda result: adapter.dump_json(adapter.validate_python(result))
+    tables = tuple(tables)
+
+    def decorator(endpoint: Callable) -> Callable:
+        @wraps(endpoint)
+        async def wrapper(**kwargs):
+            request: Request = kwargs.pop(_REQUEST_PARAM)
+            key = (f"{endpoint.__module__}.{endpoint.__qualname__}", tuple(sorted(
+                (name, _normalize(value)) for name, value in kwargs.items()
+            )))
+            # Read versions before building: a write that lands mid-build
+            # leaves the entry stamped stale, never the other way round
+            stamp = db.get_versions(tables)
+            etag = make_etag(key, stamp)
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                response_cache.not_modified += 1
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+            body = response_cache.get(key, stamp) if store else None
+            if body is None:
+                result = await endpoint(**kwargs)
+                body = serialize(result)
+                if store:
+                    response_cache.put(key, stamp, body)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        # Expose the endpoint's parameters plus the Request to FastAPI
+        signature = inspect.signature(endpoint)
+        wrapper.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter(_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+        ])
+        return wrapper
+
+    return decorator
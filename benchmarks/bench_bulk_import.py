@@ -0,0 +1,90 @@
+"""
+Bulk Import Benchmark
+=====================
+Compares loading a catalog through the ASGI app (TestClient, one client):
+
+- single: one POST /products per product
+- bulk:   one POST /products/bulk with an NDJSON body of every product
+
+Both runs start from the seed catalog and insert the same products
+(distinct names, so the search and autocomplete indexes grow as in a
+real import).
+
+Run (from the repository root):
+    python -m benchmarks.bench_bulk_import
+    python -m benchmarks.bench_bulk_import --count 50000
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from app.database import db
+from app.database.seed_data import seed_database
+from app.main import app
+
+
+HEADERS = {"X-API-Key": "seller_key_001"}
+
+
+def products(count: int):
+    """Builds count distinct product payloads."""
+    return [
+        {
+            "name": f"Benchmark Widget {i}",
+            "description": f"Bulk import benchmark product number {i}.",
+            "category_id": i % 5 + 1,
+            "price": 10 + i % 500,
+            "discount_percentage": i % 30,
+            "stock_status": "in_stock"
+        }
+        for i in range(count)
+    ]
+
+
+def reseed():
+    """Resets the shared database to the seed catalog."""
+    db.clear_all()
+    seed_database()
+
+
+def single_import(client: TestClient, payloads) -> float:
+    """POSTs products one by one and returns the elapsed seconds."""
+    start = time.perf_counter()
+    for payload in payloads:
+        response = client.post("/products", json=payload, headers=HEADERS)
+        assert response.status_code == 201
+    return time.perf_counter() - start
+
+
+def bulk_import(client: TestClient, payloads) -> float:
+    """POSTs every product in one NDJSON body and returns the elapsed seconds."""
+    start = time.perf_counter()
+    body = "\n".join(json.dumps(payload) for payload in payloads)
+    response = client.post(
+        "/products/bulk",
+        content=body,
+        headers={**HEADERS, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200 and response.json()["failed"] == 0
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--single-count", type=int, default=2000, help="products for the one-by-one run")
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} {'products':>9} {'seconds':>8} {'products/s':>11}")
+    with TestClient(app) as client:
+        for name, run, count in [("single", single_import, args.single_count), ("bulk", bulk_import, args.count)]:
+            reseed()
+            elapsed = run(client, products(count))
+            print(f"{name:>8} {count:>9,} {elapsed:>8.2f} {count / elapsed:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Database Read Concurrency Benchmark
+===================================
+Measures InMemoryDatabase read throughput as reader threads are added,
+comparing the reader-writer lock (default) with a single exclusive mutex.
+
+Each reader thread loops over get_product and verify_api_key (lock-free
+point lookups) and get_products_by_seller (a scan under the read lock).
+One background writer keeps updating products so readers also compete
+with writes.
+
+Run (from the repository root):
+    python -m benchmarks.bench_db_concurrency
+    python -m benchmarks.bench_db_concurrency --products 50000 --duration 3
+
+Note: on a GIL build of CPython, pure-Python readers cannot run in parallel,
+so the numbers mostly reflect lock overhead and convoying. On a free-threaded
+build (python3.13t and later) the reader-writer lock lets reads scale.
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from app.database.memory_db import InMemoryDatabase
+
+
+def build_database(concurrent_reads: bool, product_count: int) -> InMemoryDatabase:
+    """Creates a database with 50 sellers, five categories and N products."""
+    db = InMemoryDatabase(concurrent_reads=concurrent_reads)
+    for i in range(50):
+        db.create_seller({"name": f"BenchStore {i}"}, "bench_key" if i == 0 else f"bench_key_{i}")
+    for i in range(5):
+        db.create_category({"name": f"Category {i}", "description": "Benchmark category"})
+    for i in range(product_count):
+        db.create_product({
+            "name": f"Product {i}",
+            "description": "Benchmark product",
+            "category_id": i % 5 + 1,
+            "seller_id": i % 50 + 1,
+            "price": 10.0 + i % 100,
+            "discount_percentage": i % 30,
+            "stock_status": "in_stock",
+        })
+    return db
+
+
+def run(db: InMemoryDatabase, threads: int, duration: float, product_count: int) -> float:
+    """Runs readers plus one writer for `duration` seconds and returns reads/sec."""
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def reader(slot: int):
+        rng = random.Random(slot)
+        done = 0
+        while not stop.is_set():
+            db.get_product(rng.randint(1, product_count))
+            db.verify_api_key("bench_key")
+            db.get_products_by_seller(rng.randint(1, 50))
+            done += 3
+        counts[slot] = done
+
+    def writer():
+        rng = random.Random(-1)
+        while not stop.is_set():
+            db.update_product(rng.randint(1, product_count), {"price": rng.uniform(10, 100)})
+            time.sleep(0.001)
+
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    workers.append(threading.Thread(target=writer))
+    for worker in workers:
+        worker.start()
+    time.sleep(duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'rwlock reads/s':>16} {'mutex reads/s':>16}")
+    databases = {
+        mode: build_database(mode, args.products) for mode in (True, False)
+    }
+    for threads in args.threads:
+        rw = run(databases[True], threads, args.duration, args.products)
+        mutex = run(databases[False], threads, args.duration, args.products)
+        print(f"{threads:>8} {rw:>16,.0f} {mutex:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
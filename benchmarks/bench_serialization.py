@@ -0,0 +1,102 @@
+"""
+List Serialization Benchmark
+============================
+Measures how much of a /products page goes to building the page versus
+serializing it, before and after per-product JSON fragments:
+
+- query:      db.get_sorted_products for one page (sorted_page)
+- model:      PaginatedResponse[Product] validation + JSON encoding
+              (what the response_model round trip costs per request)
+- fragments:  product_page_json joining cached per-product JSON
+              (warm: fragments already cached; cold: every fragment rebuilt)
+
+The catalog is the seed data, repeated until it holds --products records,
+so products carry realistic features, images and descriptions.
+
+Run (from the repository root):
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --products 50000 --page-sizes 20 100
+"""
+
+import argparse
+import time
+
+from pydantic import TypeAdapter
+
+from app.database import db
+from app.database.seed_data import seed_database
+from app.routers.products import sorted_page
+from app.schemas.common import PaginatedResponse, ProductSortBy, SortOrder
+from app.schemas.product import Product
+from app.services.json_fragments import product_page_json
+
+
+# Fields the database sets itself
+GENERATED_FIELDS = ("id", "created_at", "updated_at", "average_rating", "review_count", "final_price")
+
+
+def build_catalog(product_count: int):
+    """Seeds the shared database and repeats seed products up to product_count."""
+    seed_database()
+    templates = [
+        {k: v for k, v in p.items() if k not in GENERATED_FIELDS}
+        for p in db.get_all_products()
+    ]
+    for i in range(product_count - len(templates)):
+        template = templates[i % len(templates)]
+        db.create_product({**template, "name": f"{template['name']} #{i}"})
+
+
+def best_of(func, repeat: int) -> float:
+    """Returns the fastest of `repeat` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    build_catalog(args.products)
+    adapter = TypeAdapter(PaginatedResponse[Product])
+
+    print(f"{args.products:,} products, sort_by=price desc, page 3")
+    print(
+        f"{'page_size':>9} {'query ms':>9} {'model ms':>9} {'share':>6} "
+        f"{'cold ms':>8} {'warm ms':>8} {'share':>6}"
+    )
+    for page_size in args.page_sizes:
+        query = lambda: sorted_page(ProductSortBy.PRICE, SortOrder.DESC, 3, page_size)
+        page = query()
+
+        def model():
+            return adapter.dump_json(adapter.validate_python(page))
+
+        def cold():
+            for product in page["items"]:
+                db.put_product_fragment(product["id"], -1, b"")
+            return product_page_json(page)
+
+        def warm():
+            return product_page_json(page)
+
+        assert model() == cold() == warm()
+        query_ms = best_of(query, args.repeat)
+        model_ms = best_of(model, args.repeat)
+        cold_ms = best_of(cold, args.repeat)
+        warm_ms = best_of(warm, args.repeat)
+        print(
+            f"{page_size:>9} {query_ms:>9.3f} {model_ms:>9.3f} {model_ms / (query_ms + model_ms):>6.0%} "
+            f"{cold_ms:>8.3f} {warm_ms:>8.3f} {warm_ms / (query_ms + warm_ms):>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
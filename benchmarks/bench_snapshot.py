@@ -0,0 +1,87 @@
+"""
+Snapshot Startup Benchmark
+==========================
+Compares the two ways the API can fill its database at startup:
+
+- rebuild:  create_product / create_review row by row (what seed_database does)
+- snapshot: load_snapshot on a file written by save_snapshot (records are
+            decoded lazily; search indexes finish in the background)
+
+Reported per catalog size: rebuild time, snapshot save time and file size,
+time until load_snapshot returns (the API can serve), time until the
+background text indexes are ready, and the first get_product after loading.
+
+Run (from the repository root):
+    python -m benchmarks.bench_snapshot
+    python -m benchmarks.bench_snapshot --products 100000 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app.database import db
+from app.database.memory_db import InMemoryDatabase
+from app.database.seed_data import seed_database
+
+
+# Fields the database sets itself
+GENERATED_FIELDS = ("id", "created_at", "updated_at", "average_rating", "review_count", "final_price")
+
+
+def build_database(product_count: int) -> float:
+    """Fills a new database with product_count products (seed templates) and a review per ten; returns seconds."""
+    seed_database()
+    templates = [
+        {k: v for k, v in p.items() if k not in GENERATED_FIELDS}
+        for p in db.get_all_products()
+    ]
+    database = InMemoryDatabase()
+    start = time.perf_counter()
+    for i in range(product_count):
+        template = templates[i % len(templates)]
+        database.create_product({**template, "name": f"{template['name']} #{i}"})
+    for i in range(1, product_count + 1, 10):
+        database.create_review({"product_id": i, "user_id": 1, "rating": i % 5 + 1, "comment": "Fine"})
+    return database, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    print(
+        f"{'products':>9} {'rebuild s':>10} {'save s':>7} {'file MB':>8} "
+        f"{'load s':>7} {'text s':>7} {'first get ms':>13}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "store.snapshot")
+        for product_count in args.products:
+            source, rebuild_s = build_database(product_count)
+
+            start = time.perf_counter()
+            source.save_snapshot(path)
+            save_s = time.perf_counter() - start
+            del source
+
+            loaded = InMemoryDatabase()
+            start = time.perf_counter()
+            loaded.load_snapshot(path)
+            load_s = time.perf_counter() - start
+            get_start = time.perf_counter()
+            loaded.get_product(product_count // 2)
+            get_ms = (time.perf_counter() - get_start) * 1000
+            while not loaded.text_indexes_ready:
+                time.sleep(0.01)
+            text_s = time.perf_counter() - start
+
+            print(
+                f"{product_count:>9,} {rebuild_s:>10.2f} {save_s:>7.2f} {os.path.getsize(path) / 1e6:>8.1f} "
+                f"{load_s:>7.2f} {text_s:>7.2f} {get_ms:>13.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Top-K Selection Benchmark
+=========================
+Compares three ways of answering /recommendations/top-rated?limit=10:
+
+- sort:    filter, fully sort by rating, slice [:limit] (previous approach)
+- heap:    filter, heapq.nlargest(limit) - O(n log k)
+- index:   walk the maintained average_rating SortedIndex from the top and
+           stop after `limit` matches (what RecommendationService now does)
+
+Run (from the repository root):
+    python -m benchmarks.bench_top_k
+    python -m benchmarks.bench_top_k --sizes 100000 1000000 --limit 10
+"""
+
+import argparse
+import heapq
+import random
+import time
+from itertools import islice
+
+from app.database.sorted_index import SortedIndex
+
+
+def make_products(count: int, seed: int = 42) -> list:
+    """Builds synthetic product dicts with rating and review count."""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "average_rating": round(rng.uniform(1, 5), 2),
+            "review_count": rng.randint(0, 50),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def best_of(func, repeat: int) -> float:
+    """Returns the fastest of `repeat` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--min-reviews", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    limit, min_reviews = args.limit, args.min_reviews
+    rating = lambda p: p["average_rating"]
+
+    print(f"{'products':>10} {'sort ms':>10} {'heap ms':>10} {'index ms':>10}")
+    for size in args.sizes:
+        products = make_products(size)
+        by_id = {p["id"]: p for p in products}
+        index = SortedIndex()
+        index.update((p["average_rating"], p["id"]) for p in products)
+
+        def full_sort():
+            rows = [p for p in products if p["review_count"] >= min_reviews]
+            rows.sort(key=rating, reverse=True)
+            return rows[:limit]
+
+        def heap_select():
+            rows = (p for p in products if p["review_count"] >= min_reviews)
+            return heapq.nlargest(limit, rows, key=rating)
+
+        def index_walk():
+            rows = (by_id[i] for i in index.iter_ids(descending=True))
+            return list(islice((p for p in rows if p["review_count"] >= min_reviews), limit))
+
+        assert full_sort() == heap_select() == index_walk()
+        print(
+            f"{size:>10,} "
+            f"{best_of(full_sort, args.repeat):>10.2f} "
+            f"{best_of(heap_select, args.repeat):>10.2f} "
+            f"{best_of(index_walk, args.repeat):>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
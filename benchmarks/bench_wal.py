@@ -0,0 +1,106 @@
+"""
+Write-Ahead Log Benchmark
+=========================
+Measures write throughput with the write-ahead log off and on:
+
+- POST /products through the ASGI app (TestClient, one client), the
+  request path including validation, API key check and serialization
+- db.create_product from several threads, showing how group commit
+  shares one fsync between concurrent writes (records per fsync)
+
+Every run starts from the seed catalog. Log modes:
+- off:          no log
+- interval=N:   fsync at most every N ms, writes never wait (the default, 10 ms)
+- sync:         every write waits until it is on disk (interval 0)
+
+Run (from the repository root):
+    python -m benchmarks.bench_wal
+    python -m benchmarks.bench_wal --duration 3 --threads 16
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.database import db
+from app.database.seed_data import seed_database
+from app.main import app
+
+
+PRODUCT = {
+    "name": "Benchmark Widget",
+    "description": "Write-ahead log benchmark product.",
+    "category_id": 1,
+    "price": 49.99,
+    "discount_percentage": 5,
+    "stock_status": "in_stock"
+}
+
+MODES = [("off", None), ("interval=10ms", 0.01), ("sync", 0.0)]
+
+
+def open_log(directory: str, name: str, sync_interval):
+    """Reseeds the shared database and switches it to a fresh log (None: no log)."""
+    db.close_wal()
+    # Same starting catalog for every run (indexes get slower as they grow)
+    db.clear_all()
+    seed_database()
+    if sync_interval is not None:
+        db.open_wal(os.path.join(directory, f"{name}.log"), sync_interval)
+
+
+def http_writes(client: TestClient, duration: float) -> int:
+    """POSTs products for duration seconds and returns the count."""
+    count = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        response = client.post("/products", json=PRODUCT, headers={"X-API-Key": "seller_key_001"})
+        assert response.status_code == 201
+        count += 1
+    return count
+
+
+def threaded_writes(threads: int, duration: float) -> int:
+    """Calls db.create_product from several threads and returns the total count."""
+    counts = [0] * threads
+    deadline = time.perf_counter() + duration
+
+    def writer(slot: int):
+        while time.perf_counter() < deadline:
+            db.create_product({**PRODUCT, "seller_id": 1})
+            counts[slot] += 1
+
+    workers = [threading.Thread(target=writer, args=(slot,)) for slot in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'mode':>14} {'POST ops/s':>11} {'threads ops/s':>14} {'records/fsync':>14}")
+    with tempfile.TemporaryDirectory() as directory, TestClient(app) as client:
+        for name, sync_interval in MODES:
+            open_log(directory, f"{name}-http", sync_interval)
+            http_ops = http_writes(client, args.duration) / args.duration
+
+            open_log(directory, f"{name}-threads", sync_interval)
+            thread_ops = threaded_writes(args.threads, args.duration) / args.duration
+            stats = db.get_wal_stats()
+            per_sync = f"{stats['records'] / max(stats['syncs'], 1):.1f}" if stats else "-"
+            print(f"{name:>14} {http_ops:>11,.0f} {thread_ops:>14,.0f} {per_sync:>14}")
+        db.close_wal()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Query Equivalence Check
+=======================
+Randomized check that db.query_products (cost-based plan over the column
+store, bitmap and sort indexes) returns exactly what a brute-force filter
+and stable sort over every product dict returns.
+
+Each step applies a random write (create, update, delete, review, and
+rarely clear_all), then runs a random query: filters, sort field and
+order, offset/limit, optional keyset cursor and optional candidate id set
+(as search passes). Page, total, explain's match count and
+filter_product_ids are compared with the reference, and so are
+get_facets' per-value counts.
+
+Facet keys are also checked through the API: products created, bulk
+imported and updated over HTTP (and reloaded from a snapshot) must only
+produce StockStatus values as stock_status facet keys.
+
+Run (from the repository root):
+    python -m benchmarks.check_query_equivalence
+    python -m benchmarks.check_query_equivalence --steps 5000 --seed 3
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from fastapi.testclient import TestClient
+
+from app.database import db as app_db
+from app.database.bitmap_index import BITMAP_FIELDS
+from app.database.memory_db import InMemoryDatabase, PRODUCT_SORT_KEYS
+from app.database.seed_data import seed_database
+from app.database.sorted_index import comes_after
+from app.main import app
+from app.schemas.common import StockStatus
+
+
+STOCK_STATUSES = [status.value for status in StockStatus]
+HEADERS = {"X-API-Key": "seller_key_001"}
+
+
+def apply_filters(products, filters):
+    """Reference filter: the /products semantics evaluated row by row."""
+    result = products
+    if filters.get("category_id"):
+        result = [p for p in result if p.get("category_id") == filters["category_id"]]
+    if filters.get("min_price") is not None:
+        result = [p for p in result if p.get("final_price", 0) >= filters["min_price"]]
+    if filters.get("max_price") is not None:
+        result = [p for p in result if p.get("final_price", 0) <= filters["max_price"]]
+    if filters.get("min_rating") is not None:
+        result = [p for p in result if p.get("average_rating", 0) >= filters["min_rating"]]
+    if filters.get("stock_status"):
+        result = [p for p in result if p.get("stock_status") == filters["stock_status"]]
+    if filters.get("seller_id"):
+        result = [p for p in result if p.get("seller_id") == filters["seller_id"]]
+    if filters.get("has_discount"):
+        result = [p for p in result if p.get("discount_percentage", 0) > 0]
+    return result
+
+
+def random_product(rng: random.Random) -> dict:
+    """Builds product data drawn from small value sets (many ties)."""
+    return {
+        "name": rng.choice(["a", "B", "c", "d"]) + str(rng.randint(0, 3)),
+        "description": "Randomized equivalence check product",
+        "price": rng.choice([10, 20.5, 99.99, 100, 250]),
+        "discount_percentage": rng.choice([0, 0, 5, 10, 12.5]),
+        "category_id": rng.randint(1, 4),
+        "seller_id": rng.randint(1, 3),
+        "stock_status": rng.choice(STOCK_STATUSES)
+    }
+
+
+def random_write(db: InMemoryDatabase, rng: random.Random):
+    """Applies one random write."""
+    ids = list(db._products)
+    op = rng.random()
+    if op < .2 or len(ids) < 6:
+        db.create_product(random_product(rng))
+    elif op < .35:
+        db.delete_product(rng.choice(ids))
+    elif op < .55:
+        changes = {k: v for k, v in random_product(rng).items() if rng.random() < .4}
+        db.update_product(rng.choice(ids), changes)
+    elif op < .75:
+        db.create_review({"product_id": rng.choice(ids), "user_id": 1, "rating": rng.randint(1, 5)})
+    elif op < .76:
+        db.clear_all()
+        for _ in range(20):
+            db.create_product(random_product(rng))
+
+
+def random_filters(rng: random.Random) -> dict:
+    """Draws a random combination of /products filters."""
+    filters = {}
+    if rng.random() < .5:
+        filters["category_id"] = rng.randint(1, 5)
+    if rng.random() < .4:
+        filters["min_price"] = rng.choice([0, 20.5, 50, 100])
+    if rng.random() < .4:
+        filters["max_price"] = rng.choice([20.5, 99.99, 300])
+    if rng.random() < .3:
+        filters["min_rating"] = rng.choice([0, 2.5, 4])
+    if rng.random() < .3:
+        filters["stock_status"] = rng.choice(STOCK_STATUSES + ["unknown"])
+    if rng.random() < .3:
+        filters["seller_id"] = rng.randint(1, 4)
+    if rng.random() < .3:
+        filters["has_discount"] = rng.choice([True, False])
+    return filters
+
+
+def check_query(db: InMemoryDatabase, rng: random.Random, step: int):
+    """Runs one random query and compares it with the reference."""
+    filters = random_filters(rng)
+    field = rng.choice(list(PRODUCT_SORT_KEYS))
+    descending = rng.random() < .5
+    key = PRODUCT_SORT_KEYS[field]
+
+    products = sorted(db._products.values(), key=lambda p: p["id"])
+    product_ids = None
+    if rng.random() < .4:
+        top = max([p["id"] for p in products] + [40])
+        product_ids = rng.sample(range(0, top + 3), rng.randint(0, 30))
+
+    expected = [p for p in apply_filters(products, filters) if product_ids is None or p["id"] in product_ids]
+    expected.sort(key=key, reverse=descending)
+
+    offset = rng.randint(0, 5)
+    limit = rng.choice([None, 1, 3, 10])
+    after = None
+    remaining = expected
+    if expected and rng.random() < .4:
+        anchor = rng.choice(expected)
+        after = (key(anchor), anchor["id"])
+        remaining = [p for p in expected if comes_after(key(p), p["id"], after, descending)]
+
+    page, total = db.query_products(filters, field, descending, offset, limit, after, product_ids)
+    wanted = remaining[offset:None if limit is None else offset + limit]
+    context = (step, filters, field, descending, offset, limit, after)
+    assert total == len(expected), context
+    assert [p["id"] for p in page] == [p["id"] for p in wanted], context
+    assert db.explain_products(filters, product_ids)["matched"] == len(expected), context
+    assert db.filter_product_ids(filters, product_ids) == {p["id"] for p in expected}, context
+
+
+def check_facets(db: InMemoryDatabase, rng: random.Random, step: int):
+    """Compares get_facets with per-field counts over the reference filter."""
+    filters = random_filters(rng)
+    products = list(db._products.values())
+    total, facets = db.get_facets(filters)
+    assert total == len(apply_filters(products, filters)), (step, filters)
+    for field, extract in BITMAP_FIELDS.items():
+        others = {k: v for k, v in filters.items() if k != field}
+        expected = {}
+        for product in apply_filters(products, others):
+            value = extract(product)
+            expected[value] = expected.get(value, 0) + 1
+        assert facets[field] == expected, (step, filters, field)
+
+
+def check_facet_keys():
+    """Writes stock statuses over HTTP and checks the facet keys, before and after a snapshot reload."""
+    allowed = set(STOCK_STATUSES)
+
+    def facet_keys(client: TestClient) -> set:
+        response = client.get("/products/facets")
+        assert response.status_code == 200
+        return set(response.json()["stock_status"])
+
+    app_db.clear_all()
+    seed_database()
+    payload = {
+        "name": "Facet Check Console",
+        "description": "Product written over HTTP by the facet key check.",
+        "category_id": 1,
+        "price": 499,
+        "stock_status": "pre_order"
+    }
+    with TestClient(app) as client:
+        created = client.post("/products", json=payload, headers=HEADERS)
+        assert created.status_code == 201
+        bulk = client.post(
+            "/products/bulk",
+            content=json.dumps({**payload, "name": "Facet Check Bulk", "stock_status": "out_of_stock"}),
+            headers={**HEADERS, "Content-Type": "application/x-ndjson"}
+        )
+        assert bulk.status_code == 200 and bulk.json()["failed"] == 0
+        updated = client.put(
+            f"/products/{created.json()['id']}", json={"stock_status": "low_stock"}, headers=HEADERS
+        )
+        assert updated.status_code == 200
+        keys = facet_keys(client)
+        assert keys <= allowed, keys
+        assert {"low_stock", "out_of_stock"} <= keys, keys
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "facets.snapshot")
+            app_db.save_snapshot(path)
+            app_db.load_snapshot(path)
+            assert facet_keys(client) == keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=1500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    db = InMemoryDatabase()
+    for _ in range(60):
+        db.create_product(random_product(rng))
+
+    for step in range(args.steps):
+        random_write(db, rng)
+        check_query(db, rng, step)
+        check_facets(db, rng, step)
+    print(f"ok: {args.steps} randomized queries and facet counts match the reference")
+
+    check_facet_keys()
+    print("ok: stock_status facet keys are StockStatus values")
+
+
+if __name__ == "__main__":
+    main()
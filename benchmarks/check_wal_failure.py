@@ -0,0 +1,100 @@
+"""
+WAL Failure Check
+=================
+Checks that writes are rejected before they change memory once the
+write-ahead log has failed.
+
+For each sync mode (sync interval 0 and > 0) a database with a log is
+seeded, the log's file descriptor is closed under it and the flusher is
+made to hit the error (WriteAheadLog.sync). Then every logged write method
+must raise LogWriteError and leave the data unchanged (stats, data_version
+and the product/review/category records).
+
+Run (from the repository root):
+    python -m benchmarks.check_wal_failure
+"""
+
+import os
+import tempfile
+
+from app.database.memory_db import InMemoryDatabase
+from app.database.wal import LogWriteError
+
+
+PRODUCT = {
+    "name": "WAL Check Lamp",
+    "description": "Written while the write-ahead log is broken.",
+    "price": 25,
+    "category_id": 1,
+    "seller_id": 1,
+    "stock_status": "in_stock"
+}
+
+
+def writes(db: InMemoryDatabase, product_id: int, review_id: int):
+    """Returns (name, call) for every logged write method."""
+    return [
+        ("create_product", lambda: db.create_product(dict(PRODUCT))),
+        ("create_products", lambda: db.create_products([dict(PRODUCT), dict(PRODUCT)])),
+        ("update_product", lambda: db.update_product(product_id, {"price": 99})),
+        ("delete_product", lambda: db.delete_product(product_id)),
+        ("create_review", lambda: db.create_review({"product_id": product_id, "user_id": 1, "rating": 5})),
+        ("increment_helpful", lambda: db.increment_helpful(review_id)),
+        ("create_user", lambda: db.create_user({"name": "WAL Check", "email": "wal@example.com"})),
+        ("create_seller", lambda: db.create_seller({"name": "WAL Check Store"}, "wal_check_key")),
+        ("create_category", lambda: db.create_category({"name": "WAL Check", "description": "x"})),
+        ("clear_all", db.clear_all),
+    ]
+
+
+def state(db: InMemoryDatabase) -> tuple:
+    """Everything a rejected write must leave untouched."""
+    return (
+        db.get_stats(),
+        db.data_version,
+        sorted(map(repr, db.get_all_products())),
+        sorted(map(repr, db.get_all_reviews())),
+        sorted(map(repr, db.get_all_categories())),
+    )
+
+
+def check(sync_interval: float):
+    """Breaks the log of a fresh database and checks every write is rejected."""
+    with tempfile.TemporaryDirectory() as directory:
+        db = InMemoryDatabase()
+        db.open_wal(os.path.join(directory, "check.wal"), sync_interval)
+        db.create_category({"name": "Lamps", "description": "Seed category"})
+        product = db.create_product(dict(PRODUCT))
+        review = db.create_review({"product_id": product["id"], "user_id": 1, "rating": 4})
+
+        wal = db._wal
+        wal.sync()
+        os.close(wal._file.fileno())
+        try:
+            db.create_product(dict(PRODUCT))  # buffered: the flusher hits the closed fd
+            wal.sync()
+        except LogWriteError:
+            pass
+        else:
+            raise AssertionError("the flusher did not fail on the closed file descriptor")
+
+        before = state(db)
+        for name, write in writes(db, product["id"], review["id"]):
+            try:
+                write()
+            except LogWriteError:
+                pass
+            else:
+                raise AssertionError(f"{name} succeeded on a failed log")
+            assert state(db) == before, f"{name} changed memory before it was rejected"
+        db.close_wal()
+        print(f"ok: sync interval {sync_interval}: {len(writes(db, 0, 0))} writes rejected, data unchanged")
+
+
+def main():
+    check(0.0)
+    check(0.01)
+
+
+if __name__ == "__main__":
+    main()